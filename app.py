@@ -4,11 +4,17 @@ A comprehensive workout tracking application built with Streamlit
 """
 
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 from datetime import date, datetime, timedelta
 import time
-import plotly.express as px
-import plotly.graph_objects as go
+
+# Polars is optional: session metrics fall back to a pandas groupby without it
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
 
 # Import authentication module
 from src.auth import (
@@ -20,26 +26,52 @@ from src.auth import (
 
 # Import database and utility modules
 from database.db_manager import (
-    init_database, save_workout, get_previous_workout, get_previous_workout_session,
-    get_exercise_history, get_all_exercises, get_exercises_by_muscle_group,
-    add_custom_exercise, get_todays_workouts, get_all_workouts,
-    get_muscle_group_stats, get_pr_records, import_workout_from_csv,
+    init_database, save_workout, get_previous_workout_session,
+    get_exercise_history_bulk, get_all_exercises, get_exercise_muscle_groups, get_exercises_by_muscle_group,
+    add_custom_exercise, ensure_exercise_library, get_all_workouts,
+    get_muscle_group_stats, get_pr_records, import_workout_from_csv, iter_workout_csv,
     get_exercise_details, update_exercise_steps,
-    update_workout_set, delete_workout_set, delete_workout_session,
-    get_exercise_workout_counts, get_recent_workout_sessions,
-    get_all_exercise_names_from_workouts, get_workout_sessions_by_exercise,
-    rename_workout_sessions, delete_exercise
+    update_workout_set, update_workout_sets, delete_workout_set, delete_workout_session,
+    get_exercise_workout_counts, get_log_page_context,
+    get_workout_sessions_by_exercises, get_exercise_index,
+    rename_workout_sessions, delete_exercise, get_workout_data_version, get_exercise_data_version,
+    IMPORT_MAX_ERROR_MESSAGES
 )
 from utils.calculations import (
     calculate_1rm, convert_unit, standardize_weight,
-    calculate_volume, calculate_total_volume
+    calculate_volume, lttb_downsample_indices,
+    aggregate_volume_by_group, unit_to_kg_factors, aggregate_sessions
 )
 from utils.helpers import (
     get_muscle_groups, get_exercise_types, format_weight,
-    get_default_exercises, validate_input, get_weight_options, get_reps_options,
-    is_assisted_exercise, infer_exercise_type
+    get_default_exercise_rows, validate_sets, get_weight_options, get_reps_options,
+    get_weight_option_index, get_reps_option_index, get_weight_option_labels, get_reps_option_labels,
+    is_assisted_exercise, is_pure_bodyweight_exercise, infer_exercise_type, format_weights
 )
 
+# Unit choices of the set forms; "notch" is the legacy spelling of "notch/plate"
+UNIT_CHOICES = ["kg", "lb", "notch/plate"]
+UNIT_CHOICE_INDEX = {"kg": 0, "lb": 1, "notch/plate": 2, "notch": 2}
+
+# Longest series sent to the browser per exercise; longer ones are LTTB-downsampled
+MAX_CHART_POINTS = 2000
+# Series longer than this are drawn with WebGL (scattergl) instead of SVG
+WEBGL_POINT_THRESHOLD = 500
+
+# Column dtypes of calculate_session_metrics output; identical per exercise so the
+# dashboard's concat never has to promote (and re-copy) a column
+SESSION_METRIC_DTYPES = {
+    'max_weight': 'float32',
+    'max_reps': 'int16',
+    'total_volume': 'float32',
+    'max_1rm': 'float32',
+    'sets': 'int16',
+    'unit': 'object'
+}
+
+# Recent sessions shown (3 per page) on the log workout page
+MAX_RECENT_SESSIONS = 12
+
 # Page configuration
 st.set_page_config(
     page_title="My Gym Tracker",
@@ -49,6 +81,40 @@ st.set_page_config(
 )
 
 
+@st.fragment
+def _login_tab():
+    """Email/password login form (reruns independently of the rest of the page)"""
+    with st.form("login_form", clear_on_submit=False):
+        email = st.text_input("Email", key="login_email")
+        password = st.text_input("Password", type="password", key="login_password")
+        submitted = st.form_submit_button("登入", type="primary", use_container_width=True)
+    
+    if submitted:
+        if login_with_email(email, password):
+            st.success("登入成功！")
+            st.rerun()
+
+
+@st.fragment
+def _signup_tab():
+    """Sign-up form (reruns independently of the rest of the page)"""
+    with st.form("signup_form", clear_on_submit=False):
+        new_email = st.text_input("Email", key="signup_email")
+        new_password = st.text_input("Password", type="password", key="signup_password")
+        confirm_password = st.text_input("確認 Password", type="password", key="signup_confirm_password")
+        submitted = st.form_submit_button("註冊", type="primary", use_container_width=True)
+    
+    if submitted:
+        if new_password != confirm_password:
+            st.error("密碼不一致")
+        elif len(new_password) < 6:
+            st.error("密碼長度至少需要 6 個字元")
+        else:
+            if signup_with_email(new_email, new_password):
+                st.success("註冊成功！您已自動登入。")
+                st.rerun()
+
+
 def render_login_page():
     """Render the login/signup page"""
     st.title("🏋️ My Gym Tracker")
@@ -57,13 +123,7 @@ def render_login_page():
     tab_login, tab_signup = st.tabs(["登入", "註冊"])
     
     with tab_login:
-        email = st.text_input("Email", key="login_email")
-        password = st.text_input("Password", type="password", key="login_password")
-        
-        if st.button("登入", type="primary", use_container_width=True):
-            if login_with_email(email, password):
-                st.success("登入成功！")
-                st.rerun()
+        _login_tab()
         
         # Google OAuth
         st.markdown("---")
@@ -74,316 +134,102 @@ def render_login_page():
             st.warning("Google 登入未設定。請檢查環境變數設定。")
     
     with tab_signup:
-        new_email = st.text_input("Email", key="signup_email")
-        new_password = st.text_input("Password", type="password", key="signup_password")
-        confirm_password = st.text_input("確認 Password", type="password", key="signup_confirm_password")
-        
-        if st.button("註冊", type="primary", use_container_width=True):
-            if new_password != confirm_password:
-                st.error("密碼不一致")
-            elif len(new_password) < 6:
-                st.error("密碼長度至少需要 6 個字元")
-            else:
-                if signup_with_email(new_email, new_password):
-                    st.success("註冊成功！您已自動登入。")
-                    st.rerun()
+        _signup_tab()
 
 # ============================================================================
 # PAGE 1: LOG WORKOUT (記錄訓練)
 # ============================================================================
 
-def render_log_workout_page(user_id: str):
-    """Render the Log Workout page"""
-    st.header("📝 記錄訓練")
-    
-    # Last 7 days workout summary
-    from datetime import timedelta
-    from database.db_manager import get_all_workouts, get_all_exercises
-    
-    st.subheader("📊 過去 7 天訓練摘要")
-    
-    # Get workouts from last 7 days
-    workouts_df = get_all_workouts(user_id, days=7)
-    
-    if not workouts_df.empty:
-        # Get muscle group mapping for exercises
-        all_exercises = get_all_exercises(user_id)
-        exercise_to_muscle = {ex['name']: ex.get('muscle_group', '其他 (Other)') for ex in all_exercises}
-        
-        # Muscle group color mapping
-        muscle_group_colors = {
-            '胸 (Chest)': '#FFE5E5',      # Light red
-            '背 (Back)': '#E5F3FF',       # Light blue
-            '肩 (Shoulders)': '#FFF9E5',  # Light yellow
-            '腿 (Legs)': '#E5FFE5',       # Light green
-            '二頭肌 (Biceps)': '#F0E5FF',  # Light purple
-            '三頭肌 (Triceps)': '#E5D5FF', # Light purple (darker)
-            '核心 (Core)': '#FFE5CC',       # Light orange
-            '其他 (Other)': '#F5F5F5'     # Light grey
-        }
-        
-        # Get unique dates and sort
-        unique_dates = sorted(workouts_df['date'].unique(), reverse=True)
-        
-        # Muscle group emoji/indicator mapping for visual identification
-        muscle_group_indicators = {
-            '胸 (Chest)': '🔴',
-            '背 (Back)': '🔵',
-            '肩 (Shoulders)': '🟡',
-            '腿 (Legs)': '🟢',
-            '二頭肌 (Biceps)': '🟣',
-            '三頭肌 (Triceps)': '🟪',
-            '核心 (Core)': '🟠',
-            '其他 (Other)': '⚪'
-        }
-        
-        # Build summary data - one row per exercise per day
-        summary_rows = []
-        for workout_date in unique_dates:
-            day_workouts = workouts_df[workouts_df['date'] == workout_date]
-            
-            # Format date and weekday
-            date_obj = workout_date if isinstance(workout_date, date) else pd.to_datetime(workout_date).date()
-            weekday_names = ['週一', '週二', '週三', '週四', '週五', '週六', '週日']
-            weekday = weekday_names[date_obj.weekday()]
-            date_str = date_obj.strftime('%Y-%m-%d')
-            date_display = f"{date_str} ({weekday})"
-            
-            # Calculate total volume for the day
-            total_volume = 0
-            for _, row in day_workouts.iterrows():
-                from utils.calculations import calculate_total_volume
-                total_volume += calculate_total_volume(row['weight'], row['reps'], row['unit'])
-            
-            # Group by exercise and create one row per exercise
-            exercises = day_workouts['exercise_name'].unique()
-            for exercise_idx, exercise_name in enumerate(exercises):
-                ex_sets = day_workouts[day_workouts['exercise_name'] == exercise_name].sort_values('set_order')
-                sets_count = len(ex_sets)
-                
-                # Format each set - show reps only for pure bodyweight exercises
-                from utils.helpers import is_pure_bodyweight_exercise
-                is_pure_bodyweight = is_pure_bodyweight_exercise(exercise_name)
-                
-                sets_list = []
-                for _, row in ex_sets.iterrows():
-                    weight = row['weight']
-                    unit = row['unit']
-                    reps = int(row['reps'])
-                    
-                    if is_pure_bodyweight:
-                        # For pure bodyweight exercises, show only reps
-                        sets_list.append(f"x{reps}")
-                    else:
-                        # For other exercises, show weight unit x reps
-                        if weight == int(weight):
-                            weight_str = str(int(weight))
-                        else:
-                            weight_str = f"{weight:.1f}"
-                        sets_list.append(f"{weight_str} {unit} x{reps}")
-                
-                sets_str = ', '.join(sets_list)
-                
-                # Get muscle group indicator
-                muscle_group = exercise_to_muscle.get(exercise_name, '其他 (Other)')
-                indicator = muscle_group_indicators.get(muscle_group, '⚪')
-                
-                # Format: "🔴 exercise name | xx sets | xx kg x12, xx kg x10"
-                exercise_detail = f"{indicator} {exercise_name} | {sets_count} sets | {sets_str}"
-                
-                # Show date only for first exercise of the day, show volume only for first exercise
-                summary_rows.append({
-                    '日期': date_display if exercise_idx == 0 else '',
-                    '動作詳情': exercise_detail,
-                    '總容量 (kg)': f"{total_volume:.1f}" if exercise_idx == 0 else ''
-                })
-        
-        # Create DataFrame with alternating row backgrounds
-        if summary_rows:
-            summary_df = pd.DataFrame(summary_rows)
-            
-            # Determine background color for each row based on date
-            date_to_bg = {}
-            current_date = None
-            date_index = 0
-            
-            for idx, row in summary_df.iterrows():
-                row_date = row['日期']
-                if row_date and row_date != current_date:
-                    current_date = row_date
-                    date_index += 1
-                    date_to_bg[row_date] = '#F5F5F5' if date_index % 2 == 1 else '#FFFFFF'
-                elif not row_date:
-                    # Empty date means same day as previous
-                    date_to_bg[idx] = date_to_bg.get(current_date, '#FFFFFF')
-                else:
-                    date_to_bg[idx] = date_to_bg.get(row_date, '#FFFFFF')
-            
-            def style_row_background(row):
-                """Apply alternating background colors based on date"""
-                row_date = row['日期']
-                if row_date:
-                    bg_color = date_to_bg.get(row_date, '#FFFFFF')
-                else:
-                    # Use the row index to find the background
-                    bg_color = date_to_bg.get(row.name, '#FFFFFF')
-                return [f'background-color: {bg_color}'] * len(row)
-            
-            styled_df = summary_df.style.apply(style_row_background, axis=1)
-            
-            # Display styled dataframe
-            st.dataframe(styled_df, use_container_width=True, hide_index=True)
+def _set_session_value(key: str, value):
+    """on_click callback: assign a session_state value before the triggered rerun"""
+    st.session_state[key] = value
+
+
+def _set_session_item(key: str, item, value):
+    """on_click callback: assign one entry of a dict held in session_state"""
+    st.session_state[key][item] = value
+
+
+def _on_active_row_pick(pick_key: str):
+    """on_change callback: expand the picked set row into its edit/delete layout"""
+    st.session_state.active_row = st.session_state[pick_key]
+
+
+def _session_sets_markdown(session: dict, is_pure_bodyweight: bool) -> str:
+    """Format one recent session (unit, sets, RPE, notes) as a markdown block"""
+    lines = [f"**單位:** {session['unit']}", ""]
+    if is_pure_bodyweight:
+        # For pure bodyweight exercises, show only reps
+        lines += ["| 組數 | 次數 |", "|---:|---|"]
+        lines += [f"| {s['set_order']} | {s['reps']} 次 |" for s in session['sets']]
     else:
-        st.info("過去 7 天沒有訓練記錄")
-    
-    st.divider()
-    
-    # Date selection
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        workout_date = st.date_input("訓練日期", value=date.today())
-    with col2:
-        st.write("")  # Spacing
-    
-    # Muscle group and exercise selection
-    muscle_groups = get_muscle_groups()
-    
-    # Initialize selected muscle group in session state if not set
-    if 'selected_muscle_group' not in st.session_state:
-        st.session_state.selected_muscle_group = muscle_groups[0] if muscle_groups else None
-    
-    # Track previous muscle group to detect changes
-    if 'previous_muscle_group' not in st.session_state:
-        st.session_state.previous_muscle_group = st.session_state.selected_muscle_group
-    
-    # Muscle group selection with buttons
-    st.subheader("選擇肌肉群")
-    
-    # Create button grid (3 columns)
-    num_cols = 3
-    muscle_cols = st.columns(num_cols)
-    
-    selected_muscle_group = st.session_state.selected_muscle_group
-    
-    # Display muscle group buttons
-    for idx, muscle_group in enumerate(muscle_groups):
-        col_idx = idx % num_cols
-        with muscle_cols[col_idx]:
-            is_selected = st.session_state.selected_muscle_group == muscle_group
-            button_type = "primary" if is_selected else "secondary"
-            
-            if st.button(
-                muscle_group,
-                key=f"muscle_group_{muscle_group}",
-                use_container_width=True,
-                type=button_type
-            ):
-                st.session_state.selected_muscle_group = muscle_group
-                st.rerun()
-    
-    # Update selected_muscle_group from session state
-    selected_muscle_group = st.session_state.selected_muscle_group
-    
-    # Get exercises for selected muscle group
-    exercises = get_exercises_by_muscle_group(user_id, selected_muscle_group)
-    if not exercises:
-        st.info(f"「{selected_muscle_group}」目前沒有動作，請先在「動作庫管理」頁面新增動作。")
-        return
-    
-    # Clear selected exercise if muscle group changed or if selected exercise is not in current group
-    if st.session_state.previous_muscle_group != selected_muscle_group:
-        st.session_state.previous_muscle_group = selected_muscle_group
-        # Clear selected exercise when muscle group changes
-        if 'selected_exercise' in st.session_state:
-            st.session_state.selected_exercise = None
-    
-    # Also clear if selected exercise is not in the current muscle group's exercises
-    if 'selected_exercise' in st.session_state and st.session_state.selected_exercise:
-        if st.session_state.selected_exercise not in exercises:
-            st.session_state.selected_exercise = None
-    
-    # Initialize selected exercise in session state if not set
-    if 'selected_exercise' not in st.session_state:
-        st.session_state.selected_exercise = None
-    
-    # Get workout counts for all exercises
-    workout_counts = get_exercise_workout_counts(user_id)
-    
-    # Exercise selection with buttons
-    st.subheader("選擇動作")
-    
-    # Create button grid (3 columns)
-    num_cols = 3
-    exercise_cols = st.columns(num_cols)
-    
-    # Display exercise buttons
-    for idx, exercise_name in enumerate(exercises):
-        col_idx = idx % num_cols
-        with exercise_cols[col_idx]:
-            # Get workout count for this exercise
-            count = workout_counts.get(exercise_name, 0)
-            # Format button label with count
-            button_label = f"{exercise_name} ({count})" if count > 0 else exercise_name
-            
-            # Highlight selected button
-            button_type = "primary" if st.session_state.selected_exercise == exercise_name else "secondary"
-            if st.button(
-                button_label,
-                key=f"ex_btn_{exercise_name}",
-                use_container_width=True,
-                type=button_type
-            ):
-                st.session_state.selected_exercise = exercise_name
-                st.rerun()
-    
-    # Get selected exercise
-    selected_exercise = st.session_state.selected_exercise
+        lines += ["| 組數 | 重量 | 次數 |", "|---:|---|---|"]
+        lines += [
+            f"| {s['set_order']} | {format_weight(s['weight'], session['unit'])} | {s['reps']} 次 |"
+            for s in session['sets']
+        ]
+    if session['sets']:
+        if session.get('rpe'):
+            lines += ["", f"**RPE:** {session['rpe']}/10"]
+        if session.get('notes'):
+            lines += ["", f"**備註:** {session['notes']}"]
+    return "\n".join(lines)
+
+
+@st.fragment
+def _log_entry_fragment(user_id: str, workout_date: date, selected_exercise: str):
+    """Render recent sessions (with copy buttons) and the set entry form for one exercise
     
-    # Display execution steps if exercise is selected
-    if selected_exercise:
-        exercise_data = get_exercise_details(user_id, selected_exercise)
-        if exercise_data and exercise_data.get('execution_steps'):
-            st.info("📋 執行步驟")
-            st.markdown(exercise_data['execution_steps'])
+    Runs as a fragment so copy, pagination and form interactions only rerun this section.
+    """
+    ss = st.session_state
     
-    # Check if exercise is selected before proceeding
-    if not selected_exercise:
-        st.info("請選擇一個動作以繼續")
-        return
+    # Confirmation from a save that triggered a full rerun
+    saved_message = ss.pop('log_workout_saved_message', None)
+    if saved_message:
+        st.success(saved_message)
+        st.balloons()
     
-    # Auto-fill: Get recent workout sessions (fetch more for pagination)
-    all_recent_sessions = get_recent_workout_sessions(user_id, selected_exercise, limit=12)
+    # Recent sessions and the previous workout come from the cached page context
+    context = get_log_page_context(user_id, selected_exercise, workout_date, MAX_RECENT_SESSIONS)
+    all_recent_sessions = context['recent_sessions']
+    total_sessions = len(all_recent_sessions)
     
     # Get previous workout for fallback (used in form defaults)
-    previous_workout = get_previous_workout(user_id, selected_exercise)
+    previous_workout = context['previous_workout']
     
     # Initialize session state for copied workout
     copy_key = f"copied_workout_{selected_exercise}"
-    if copy_key not in st.session_state:
-        st.session_state[copy_key] = None
+    ss.setdefault(copy_key, None)
+    
+    # Stable form widget keys; copying writes the copied values straight into them
+    num_sets_widget_key = f"num_sets_{selected_exercise}"
+    unit_widget_key = f"unit_{selected_exercise}"
+    rpe_widget_key = f"rpe_{selected_exercise}"
+    notes_widget_key = f"notes_{selected_exercise}"
+    # Bumped on every copy so the sets editor starts from the copied rows
+    copy_generation_key = f"{copy_key}_generation"
     
     # Initialize pagination offset for this exercise
     pagination_key = f"recent_sessions_offset_{selected_exercise}"
-    if pagination_key not in st.session_state:
-        st.session_state[pagination_key] = 0
+    ss.setdefault(pagination_key, 0)
     
     # Display recent workout sessions with copy buttons
-    if all_recent_sessions:
+    if total_sessions > 0:
         st.subheader("📊 最近訓練記錄")
         
         # Calculate pagination
-        total_sessions = len(all_recent_sessions)
         sessions_per_page = 3
-        current_offset = st.session_state[pagination_key]
+        current_offset = ss[pagination_key]
         max_offset = max(0, total_sessions - sessions_per_page)
         
         # Clamp offset to valid range
         if current_offset > max_offset:
             current_offset = max_offset
-            st.session_state[pagination_key] = current_offset
+            ss[pagination_key] = current_offset
         if current_offset < 0:
             current_offset = 0
-            st.session_state[pagination_key] = 0
+            ss[pagination_key] = 0
         
         # Get current page of sessions
         recent_sessions = all_recent_sessions[current_offset:current_offset + sessions_per_page]
@@ -393,9 +239,9 @@ def render_log_workout_page(user_id: str):
             nav_col1, nav_col2, nav_col3 = st.columns([1, 3, 1])
             with nav_col1:
                 if current_offset > 0:
-                    if st.button("◀ 前3筆", key=f"prev_sessions_{selected_exercise}", use_container_width=True):
-                        st.session_state[pagination_key] = max(0, current_offset - sessions_per_page)
-                        st.rerun()
+                    st.button("◀ 前3筆", key=f"prev_sessions_{selected_exercise}", use_container_width=True,
+                              on_click=_set_session_value,
+                              args=(pagination_key, max(0, current_offset - sessions_per_page)))
             with nav_col2:
                 # Show current page info
                 current_page = (current_offset // sessions_per_page) + 1
@@ -403,9 +249,11 @@ def render_log_workout_page(user_id: str):
                 st.markdown(f"<div style='text-align: center; padding: 0.5rem;'>{current_page} / {total_pages}</div>", unsafe_allow_html=True)
             with nav_col3:
                 if current_offset < max_offset:
-                    if st.button("後3筆 ▶", key=f"next_sessions_{selected_exercise}", use_container_width=True):
-                        st.session_state[pagination_key] = min(max_offset, current_offset + sessions_per_page)
-                        st.rerun()
+                    st.button("後3筆 ▶", key=f"next_sessions_{selected_exercise}", use_container_width=True,
+                              on_click=_set_session_value,
+                              args=(pagination_key, min(max_offset, current_offset + sessions_per_page)))
+        
+        is_pure_bodyweight = is_pure_bodyweight_exercise(selected_exercise)
         
         # Create columns for side-by-side display (3 columns for 3 workouts)
         num_sessions = len(recent_sessions)
@@ -413,350 +261,188 @@ def render_log_workout_page(user_id: str):
         
         for idx, session in enumerate(recent_sessions):
             with session_cols[idx]:
-                # Format date
-                session_date = session['date']
-                if isinstance(session_date, str):
-                    from datetime import datetime
-                    try:
-                        session_date = datetime.fromisoformat(session_date.replace('Z', '+00:00')).date()
-                    except:
-                        pass
-                
-                # Header with date and copy button
-                st.markdown(f"**{session_date}**")
+                # Header with date and copy button (dates are parsed in the DB layer)
+                st.markdown(f"**{session['date']}**")
                 copy_btn_key = f"copy_btn_{selected_exercise}_{idx}_{session['date']}"
                 if st.button("📋 複製", key=copy_btn_key, use_container_width=True, type="primary"):
-                    st.session_state[copy_key] = session
-                    # Also store unit and num_sets in session state to force update
-                    copied_unit = session['unit']
-                    st.session_state[f"{copy_key}_unit"] = copied_unit
-                    st.session_state[f"{copy_key}_num_sets"] = len(session['sets'])
-                    # Add a copy timestamp to force form widget reset
-                    st.session_state[f"{copy_key}_copied_at"] = time.time()
-                    # Clear old unit widget state to force reset
-                    old_unit_key = f"unit_{selected_exercise}"
-                    if old_unit_key in st.session_state:
-                        del st.session_state[old_unit_key]
-                    # Also clear any old unit keys with timestamps
-                    for key in list(st.session_state.keys()):
-                        if key.startswith(f"unit_{selected_exercise}_") and key != f"unit_{selected_exercise}_{int(st.session_state[f'{copy_key}_copied_at'])}":
-                            del st.session_state[key]
-                    # Clear old num_sets widget state to force reset
-                    old_num_sets_key = f"num_sets_{selected_exercise}"
-                    if old_num_sets_key in st.session_state:
-                        del st.session_state[old_num_sets_key]
-                    # Also clear any old num_sets keys with timestamps
-                    for key in list(st.session_state.keys()):
-                        if key.startswith(f"num_sets_{selected_exercise}_") and key != f"num_sets_{selected_exercise}_{int(st.session_state[f'{copy_key}_copied_at'])}":
-                            del st.session_state[key]
-                    # Clear adjustment states when copying
-                    widget_suffix_for_clear = f"_{selected_exercise}_{int(st.session_state[f'{copy_key}_copied_at'])}"
-                    for j in range(20):  # Clear up to 20 sets worth of adjustments
-                        weight_adj_key = f"weight_adj_{j}{widget_suffix_for_clear}"
-                        reps_adj_key = f"reps_adj_{j}{widget_suffix_for_clear}"
-                        if weight_adj_key in st.session_state:
-                            st.session_state[weight_adj_key] = 0
-                        if reps_adj_key in st.session_state:
-                            st.session_state[reps_adj_key] = 0
+                    ss[copy_key] = session
+                    # Set the form widgets to the copied values
+                    ss[num_sets_widget_key] = min(max(len(session['sets']), 1), 10)
+                    # Database might store "notch" but the radio button uses "notch/plate"
+                    ss[unit_widget_key] = UNIT_CHOICES[UNIT_CHOICE_INDEX.get(session['unit'], 0)]
+                    raw_rpe = session.get('rpe')
+                    ss[rpe_widget_key] = min(max(int(raw_rpe), 1), 10) if isinstance(raw_rpe, (int, float)) and not pd.isna(raw_rpe) else 7
+                    ss[notes_widget_key] = session.get('notes') or ""
+                    ss[copy_generation_key] = ss.get(copy_generation_key, 0) + 1
                     st.success("✅ 已複製訓練數據！")
-                    st.rerun()
-                
-                # Display details directly (no expander)
-                st.write(f"**單位:** {session['unit']}")
-                
-                # Display all sets in a table format
-                from utils.helpers import is_pure_bodyweight_exercise
-                is_pure_bodyweight = is_pure_bodyweight_exercise(selected_exercise)
-                
-                sets_data = []
-                for s in session['sets']:
-                    if is_pure_bodyweight:
-                        # For pure bodyweight exercises, show only reps
-                        sets_data.append({
-                            '組數': s['set_order'],
-                            '次數': f"{s['reps']} 次"
-                        })
-                    else:
-                        sets_data.append({
-                            '組數': s['set_order'],
-                            '重量': format_weight(s['weight'], session['unit']),
-                            '次數': f"{s['reps']} 次"
-                        })
-                
-                if sets_data:
-                    sets_df = pd.DataFrame(sets_data)
-                    st.dataframe(sets_df, use_container_width=True, hide_index=True)
+                    st.rerun(scope="fragment")
                 
-                # Display RPE and Notes if available
-                    if session.get('rpe'):
-                        st.write(f"**RPE:** {session['rpe']}/10")
-                    if session.get('notes'):
-                        st.write(f"**備註:** {session['notes']}")
+                # Unit, sets table, RPE and notes as one markdown block (no Arrow round-trip)
+                st.markdown(_session_sets_markdown(session, is_pure_bodyweight))
     
     # Dynamic sets input table
     st.subheader("輸入訓練組數")
     
     # Check if we have copied workout data
-    copied_data = st.session_state.get(copy_key)
-    
-    # Number of sets selector - use copied data if available
-    num_sets_key = f"{copy_key}_num_sets"
-    copy_timestamp = st.session_state.get(f"{copy_key}_copied_at", 0)
-    # Use timestamp in num_sets key to force reset when copying
-    num_sets_widget_key = f"num_sets_{selected_exercise}_{int(copy_timestamp)}" if copy_timestamp > 0 else f"num_sets_{selected_exercise}"
-    
-    if num_sets_key in st.session_state:
-        default_num_sets = st.session_state[num_sets_key]
-    elif copied_data and 'sets' in copied_data:
-        default_num_sets = len(copied_data['sets'])
-    else:
-        default_num_sets = 3
-    
-    num_sets = st.number_input("組數", min_value=1, max_value=10, value=default_num_sets, step=1, key=num_sets_widget_key)
-    
-    # Unit selection - use copied data if available
-    unit_key = f"{copy_key}_unit"
-    # Use timestamp in unit key to force reset when copying (copy_timestamp already defined above)
-    # This ensures the radio button resets when we copy
-    unit_widget_key = f"unit_{selected_exercise}_{int(copy_timestamp)}" if copy_timestamp > 0 else f"unit_{selected_exercise}"
-    
-    # Determine the correct unit index
-    # Note: Database might store "notch" but radio button uses "notch/plate"
-    unit_map = {"kg": 0, "lb": 1, "notch/plate": 2, "notch": 2}  # Map both "notch" and "notch/plate" to index 2
-    default_unit_index = 0
-    
-    # Priority: 1) stored unit from copy, 2) copied_data unit, 3) default
-    if unit_key in st.session_state:
-        # Use the stored unit from copied data (highest priority)
-        stored_unit = st.session_state[unit_key]
-        # Normalize "notch" to "notch/plate" for radio button matching
-        if stored_unit == "notch":
-            stored_unit = "notch/plate"
-        default_unit_index = unit_map.get(stored_unit, 0)
-    elif copied_data and 'unit' in copied_data:
-        # Use unit from copied data
-        copied_unit = copied_data['unit']
-        # Normalize "notch" to "notch/plate" for radio button matching
-        if copied_unit == "notch":
-            copied_unit = "notch/plate"
-        default_unit_index = unit_map.get(copied_unit, 0)
-    else:
-        # Default to kg
-        default_unit_index = 0
-    
-    # Create radio button with the correct index
-    # If copy_timestamp > 0, the new key will force a reset and create a new widget
-    unit = st.radio("單位", ["kg", "lb", "notch/plate"], index=default_unit_index, horizontal=True, key=unit_widget_key)
-    
-    # If we have copied data, use the copied unit for weight options and calculations
-    # This ensures weights are correctly matched even if radio button hasn't visually updated yet
-    effective_unit = unit
-    if copied_data and 'unit' in copied_data:
-        # When copying, prioritize the copied unit for weight calculations
-        # But still respect user's manual unit selection if they change it
-        if copy_timestamp > 0:  # Recently copied
-            effective_unit = copied_data['unit']
-        else:
-            effective_unit = unit
+    copied_data = ss.get(copy_key)
+    
+    # Number of sets and unit; copying sets these widget values directly
+    ss.setdefault(num_sets_widget_key, 3)
+    num_sets = st.number_input("組數", min_value=1, max_value=10, step=1, key=num_sets_widget_key)
+    
+    ss.setdefault(unit_widget_key, "kg")
+    effective_unit = st.radio("單位", UNIT_CHOICES, horizontal=True, key=unit_widget_key)
     
     # Get weight and reps options based on effective unit
     weight_options = get_weight_options(effective_unit)
     reps_options = get_reps_options()
     
-    # Dynamically add copied weights to options list if they don't exist
+    # Snapshot copied sets once instead of re-reading session state per widget
+    copied_sets = list(copied_data['sets']) if copied_data and 'sets' in copied_data else []
+    copied_unit = copied_data.get('unit', effective_unit) if copied_data else effective_unit
+    
+    reps_idx = get_reps_option_index()
+    
+    # Default weight/reps per set - prioritize copied data, then the previous workout for set 1
+    default_weights = []
+    default_reps_list = []
+    for i in range(num_sets):
+        default_weight = 0.0
+        default_reps = 0
+        if i < len(copied_sets):
+            copied_set = copied_sets[i]
+            # Use the weight directly if units match, otherwise convert
+            if effective_unit == copied_unit:
+                default_weight = copied_set['weight']
+            else:
+                default_weight = convert_unit(copied_set['weight'], copied_unit, effective_unit)
+            default_reps = copied_set['reps']
+        elif previous_workout and i == 0:
+            default_weight = previous_workout['weight']
+            if effective_unit != previous_workout['unit']:
+                default_weight = convert_unit(default_weight, previous_workout['unit'], effective_unit)
+            default_reps = previous_workout['reps']
+        default_weights.append(default_weight)
+        default_reps_list.append(default_reps if default_reps in reps_idx else 0)
+    
+    # Merge copied and default weights into the options in one pass
     # This preserves exact weights like 12, 17, 23 lbs when copying
-    if copied_data and 'sets' in copied_data:
-        copied_weights = set()
-        copied_unit = copied_data.get('unit', effective_unit)
-        
-        # Extract all weights from copied sets
-        for copied_set in copied_data['sets']:
-            weight = copied_set['weight']
-            # Convert to effective unit if needed
-            if copied_unit != effective_unit:
-                weight = convert_unit(weight, copied_unit, effective_unit)
-            if weight > 0:
-                copied_weights.add(weight)
-        
-        # Add missing weights to options list
-        for weight in copied_weights:
-            if weight not in weight_options:
-                weight_options.append(weight)
-        
-        # Sort the combined list to maintain order
-        weight_options = sorted(weight_options)
+    extra_weights = {
+        convert_unit(s['weight'], copied_unit, effective_unit) if copied_unit != effective_unit else s['weight']
+        for s in copied_sets if s['weight'] > 0
+    }
+    extra_weights.update(w for w in default_weights if w > 0)
+    if extra_weights:
+        weight_options = tuple(sorted(set(weight_options) | extra_weights))
+    
+    initial_df = pd.DataFrame({
+        'set': range(1, num_sets + 1),
+        'weight': default_weights,
+        'reps': default_reps_list,
+    })
+    initial_df['1RM'] = calculate_1rm(initial_df['weight'].to_numpy(dtype=float), initial_df['reps'].to_numpy(dtype=float))
+    initial_df.loc[(initial_df['weight'] <= 0) | (initial_df['reps'] <= 0), '1RM'] = None
     
     # Create dynamic input form
     with st.form("workout_form", clear_on_submit=False):
-        sets_data = []
-        
-        # Create columns for better layout
-        col1, col2, col3 = st.columns([1, 1, 2])
-        
-        # Get copy timestamp to make widget keys unique when copying (already defined above for unit)
-        widget_suffix = f"_{selected_exercise}_{int(copy_timestamp)}" if copy_timestamp > 0 else f"_{selected_exercise}"
-        
-        for i in range(num_sets):
-            # Initialize adjustment keys in session state
-            weight_adj_key = f"weight_adj_{i}{widget_suffix}"
-            reps_adj_key = f"reps_adj_{i}{widget_suffix}"
-            if weight_adj_key not in st.session_state:
-                st.session_state[weight_adj_key] = 0
-            if reps_adj_key not in st.session_state:
-                st.session_state[reps_adj_key] = 0
-            
-            with col1:
-                weight_key = f"weight_{i}{widget_suffix}"
-                # Get default weight value - prioritize copied data
-                default_weight = 0.0
-                if copied_data and 'sets' in copied_data and i < len(copied_data['sets']):
-                    # Use copied data if available
-                    copied_set = copied_data['sets'][i]
-                    # Get the unit from copied data
-                    copied_unit = copied_data.get('unit', effective_unit)
-                    # Use the weight directly if units match, otherwise convert
-                    if effective_unit == copied_unit:
-                        default_weight = copied_set['weight']
-                    else:
-                        # Convert weight to current effective unit
-                        default_weight = convert_unit(copied_set['weight'], copied_unit, effective_unit)
-                elif previous_workout and i == 0:
-                    # Fallback to single previous workout value for first set
-                    default_weight = previous_workout['weight']
-                    if effective_unit != previous_workout['unit']:
-                        default_weight = convert_unit(default_weight, previous_workout['unit'], effective_unit)
-                
-                # Note: With expanded weight options (1lb increments) and dynamic merging,
-                # exact matches should be found. But keep this as a safety fallback.
-                if default_weight > 0 and default_weight not in weight_options:
-                    # Add the weight to options if it's not there (shouldn't happen with 1lb increments)
-                    weight_options.append(default_weight)
-                    weight_options = sorted(weight_options)
-                
-                # Find index for default weight
-                try:
-                    default_weight_index = weight_options.index(default_weight) if default_weight > 0 else 0
-                except ValueError:
-                    default_weight_index = 0
-                
-                # Apply adjustment from buttons
-                current_weight_index = default_weight_index + st.session_state[weight_adj_key]
-                # Clamp to valid range
-                current_weight_index = max(0, min(len(weight_options) - 1, current_weight_index))
-                
-                weight = st.selectbox(
-                    f"組 {i+1} - 重量",
-                    options=weight_options,
-                    index=current_weight_index,
-                    key=weight_key,
-                    format_func=lambda x: f"{int(x) if x == int(x) else x:.1f} {effective_unit}" if x > 0 else "選擇重量"
-                )
-            
-            with col2:
-                reps_key = f"reps_{i}{widget_suffix}"
-                # Get default reps value - prioritize copied data
-                default_reps = 0
-                if copied_data and 'sets' in copied_data and i < len(copied_data['sets']):
-                    default_reps = copied_data['sets'][i]['reps']
-                elif previous_workout and i == 0:
-                    default_reps = previous_workout['reps']
-                
-                default_reps = default_reps if default_reps in reps_options else 0
-                
-                # Find index for default reps
-                try:
-                    default_reps_index = reps_options.index(default_reps)
-                except ValueError:
-                    default_reps_index = 0
-                
-                # Apply adjustment from buttons
-                current_reps_index = default_reps_index + st.session_state[reps_adj_key]
-                # Clamp to valid range
-                current_reps_index = max(0, min(len(reps_options) - 1, current_reps_index))
-                
-                reps = st.selectbox(
-                    f"組 {i+1} - 次數",
-                    options=reps_options,
-                    index=current_reps_index,
-                    key=reps_key,
-                    format_func=lambda x: f"{x} 次" if x > 0 else "選擇次數"
-                )
-            
-            with col3:
-                # Calculate and display 1RM estimate
-                if weight > 0 and reps > 0:
-                    estimated_1rm = calculate_1rm(weight, reps)
-                    st.metric(f"組 {i+1} - 預估 1RM", f"{estimated_1rm:.1f} {effective_unit}")
-                else:
-                    st.write("")
-            
-            if weight > 0 and reps > 0:
-                sets_data.append({
-                    'set_order': i + 1,
-                    'weight': weight,
-                    'unit': effective_unit,  # Use effective_unit to match the actual unit used for weights
-                    'reps': reps
-                })
+        # One editor for all sets instead of a pair of selectboxes per set
+        edited_df = st.data_editor(
+            initial_df,
+            column_config={
+                'set': st.column_config.NumberColumn("組", format="%d", disabled=True),
+                'weight': st.column_config.SelectboxColumn(f"重量 ({effective_unit})", options=weight_options, required=True),
+                'reps': st.column_config.SelectboxColumn("次數", options=reps_options, required=True),
+                '1RM': st.column_config.NumberColumn(f"預估 1RM ({effective_unit})", format="%.1f", disabled=True),
+            },
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            key=f"sets_editor_{selected_exercise}_{ss.get(copy_generation_key, 0)}",
+        )
         
-        # RPE and Notes - use copied data if available
+        # RPE and Notes - copying sets these widget values directly
+        ss.setdefault(rpe_widget_key, 7)
+        ss.setdefault(notes_widget_key, "")
         col_rpe, col_notes = st.columns(2)
         with col_rpe:
-            # Safely determine default RPE (handle None / NaN values)
-            raw_rpe = copied_data.get('rpe') if copied_data else None
-            if isinstance(raw_rpe, (int, float)) and not pd.isna(raw_rpe):
-                default_rpe = int(raw_rpe)
-            else:
-                default_rpe = 7
             rpe = st.slider(
                 "RPE (自覺強度)",
                 min_value=1,
                 max_value=10,
-                value=default_rpe,
                 step=1,
                 help="1=非常輕鬆, 10=極限",
-                key=f"rpe{widget_suffix}",
+                key=rpe_widget_key,
             )
         with col_notes:
-            default_notes = copied_data['notes'] if copied_data and copied_data.get('notes') else ""
-            notes = st.text_area("備註 (選填)", height=100, value=default_notes,
-                               placeholder="例如：左肩有點卡、Notch 4 感覺很輕...", key=f"notes{widget_suffix}")
+            notes = st.text_area("備註 (選填)", height=100,
+                               placeholder="例如：左肩有點卡、Notch 4 感覺很輕...", key=notes_widget_key)
         
         # Submit button
         submitted = st.form_submit_button("💾 儲存訓練", type="primary")
         
         if submitted:
-            if not sets_data:
+            # Only sets with both a weight and reps are saved
+            sets_df = edited_df[(edited_df['weight'] > 0) & (edited_df['reps'] > 0)]
+            if sets_df.empty:
                 st.error("請至少輸入一組有效的訓練數據（重量和次數都大於 0）")
             else:
-                # Validate all sets
-                valid = True
-                for set_data in sets_data:
-                    is_valid, error_msg = validate_input(set_data['weight'], set_data['reps'], set_data['unit'])
-                    if not is_valid:
-                        st.error(f"組 {set_data['set_order']}: {error_msg}")
-                        valid = False
-                        break
+                # Validate all sets in one pass
+                valid, error_msg, bad_pos = validate_sets(sets_df['weight'], sets_df['reps'], effective_unit)
+                if not valid:
+                    st.error(f"組 {int(sets_df['set'].iloc[bad_pos])}: {error_msg}")
                 
                 if valid:
+                    sets_data = [
+                        {
+                            'set_order': int(row.set),
+                            'weight': float(row.weight),
+                            'unit': effective_unit,  # Use effective_unit to match the actual unit used for weights
+                            'reps': int(row.reps)
+                        }
+                        for row in sets_df.itertuples(index=False)
+                    ]
                     try:
                         save_workout(user_id, workout_date, selected_exercise, sets_data, rpe, notes)
-                        st.success(f"✅ 已儲存 {len(sets_data)} 組 {selected_exercise} 訓練記錄！")
-                        st.balloons()
                         # Clear copied data after successful save
-                        if copy_key in st.session_state:
-                            st.session_state[copy_key] = None
-                        # Clear adjustment states after successful save
-                        for j in range(num_sets):
-                            weight_adj_key = f"weight_adj_{j}{widget_suffix}"
-                            reps_adj_key = f"reps_adj_{j}{widget_suffix}"
-                            if weight_adj_key in st.session_state:
-                                st.session_state[weight_adj_key] = 0
-                            if reps_adj_key in st.session_state:
-                                st.session_state[reps_adj_key] = 0
+                        if copy_key in ss:
+                            ss[copy_key] = None
+                        # Full rerun so the summary and today's records pick up the new sets
+                        ss['log_workout_saved_message'] = f"✅ 已儲存 {len(sets_data)} 組 {selected_exercise} 訓練記錄！"
+                        st.rerun()
                     except Exception as e:
                         st.error(f"儲存失敗: {str(e)}")
-    
-    # Rest timer (outside form for better functionality)
+
+
+# Client-side countdown; ticks in the browser so the server does no work between seconds
+REST_TIMER_HTML = """
+<div id="rest-timer" style="font-family: 'Source Sans Pro', sans-serif; padding: 0.75rem 1rem;
+     border-radius: 0.5rem; background: #E8F1FB; color: #0B4C8C;"></div>
+<script>
+  const total = __DURATION__;
+  const end = Date.now() + __REMAINING__ * 1000;
+  const box = document.getElementById("rest-timer");
+  const pad = (n) => String(n).padStart(2, "0");
+  function tick() {
+    const remaining = Math.max(0, Math.ceil((end - Date.now()) / 1000));
+    if (remaining > 0) {
+      box.textContent = `⏱️ 剩餘時間: ${pad(Math.floor(remaining / 60))}:${pad(remaining % 60)} (已過 ${total - remaining} 秒)`;
+    } else {
+      box.style.background = "#E6F4EA";
+      box.style.color = "#1E6B34";
+      box.textContent = "✅ 休息時間到！";
+      clearInterval(timer);
+    }
+  }
+  const timer = setInterval(tick, 250);
+  tick();
+</script>
+"""
+
+
+@st.fragment
+def _rest_timer_fragment():
+    """Render the rest timer controls; the countdown itself runs client-side"""
+    ss = st.session_state
     st.subheader("⏱️ 休息計時器")
     timer_col1, timer_col2, timer_col3 = st.columns([2, 1, 1])
     
@@ -765,52 +451,78 @@ def render_log_workout_page(user_id: str):
     
     with timer_col2:
         if st.button("開始計時", key="start_timer_btn"):
-            st.session_state.timer_running = True
-            st.session_state.timer_start = time.time()
-            st.session_state.timer_duration = rest_time
+            ss.timer_running = True
+            ss.timer_start = time.time()
+            ss.timer_duration = rest_time
     
     with timer_col3:
         if st.button("停止計時", key="stop_timer_btn"):
-            st.session_state.timer_running = False
-            st.session_state.timer_start = None
-    
-    # Timer display
-    timer_placeholder = st.empty()
-    if 'timer_running' in st.session_state and st.session_state.timer_running:
-        if 'timer_start' in st.session_state and st.session_state.timer_start:
-            elapsed = int(time.time() - st.session_state.timer_start)
-            duration = st.session_state.get('timer_duration', 60)
-            remaining = max(0, duration - elapsed)
-            if remaining > 0:
-                minutes = remaining // 60
-                seconds = remaining % 60
-                timer_placeholder.info(f"⏱️ 剩餘時間: {minutes:02d}:{seconds:02d} (已過 {elapsed} 秒)")
-            else:
-                timer_placeholder.success("✅ 休息時間到！")
-                st.session_state.timer_running = False
+            ss.timer_running = False
+            ss.timer_start = None
+    
+    # Timer display - resumes from the remaining time whenever the fragment redraws
+    if ss.get('timer_running') and ss.get('timer_start'):
+        duration = ss.get('timer_duration', 60)
+        remaining = max(0.0, duration - (time.time() - ss.timer_start))
+        components.html(
+            REST_TIMER_HTML.replace("__DURATION__", str(int(duration))).replace("__REMAINING__", f"{remaining:.1f}"),
+            height=60
+        )
+
+
+def _set_info_texts(workouts: pd.DataFrame) -> pd.Series:
+    """Build each set's one-line summary (weight × reps | RPE | notes), indexed like workouts"""
+    reps_text = workouts['reps'].astype(int).astype(str) + " 次"
+    weight_text = pd.Series(format_weights(workouts['weight'], workouts['unit']), index=workouts.index)
+    # For pure bodyweight exercises, show only reps
+    pure_bodyweight = workouts['exercise_name'].astype(str).map(is_pure_bodyweight_exercise).astype(bool)
+    text = "組 " + workouts['set_order'].astype(int).astype(str) + ": " + reps_text.where(
+        pure_bodyweight, weight_text + " × " + reps_text
+    )
+    
+    rpe = pd.to_numeric(workouts['rpe'], errors='coerce')
+    has_rpe = rpe.notna() & (rpe != 0)
+    text = text.where(~has_rpe, text + " | RPE: " + rpe.astype('Int64').astype(str) + "/10")
     
-    # Display today's workouts
+    notes = workouts['notes'].fillna("").astype(str)
+    return text.where(notes == "", text + " | 備註: " + notes)
+
+
+@st.fragment
+def _todays_workouts_fragment(user_id: str, workout_date: date, selected_exercise: str):
+    """Render the selected day's records with inline edit/delete controls
+    
+    Toggling edit/confirm states reruns only this fragment; saved edits and
+    deletions rerun the whole app so the 7-day summary and counts stay in sync.
+    """
+    ss = st.session_state
     st.subheader(f"📋 {workout_date} 的訓練記錄")
-    today_workouts = get_todays_workouts(user_id, workout_date)
+    context = get_log_page_context(user_id, selected_exercise, workout_date, MAX_RECENT_SESSIONS)
+    today_workouts = context['todays_workouts']
+    
+    # Option lists and value -> position maps, looked up once for all edit forms
+    weight_options_by_unit = {u: (get_weight_options(u), get_weight_option_index(u)) for u in UNIT_CHOICES}
+    reps_options = get_reps_options()
+    reps_option_index = get_reps_option_index()
     
     if not today_workouts.empty:
         # Group workouts by exercise
         exercises = today_workouts['exercise_name'].unique()
         
         # Initialize session state for edit/delete operations
-        if 'editing_set_id' not in st.session_state:
-            st.session_state.editing_set_id = None
-        if 'confirm_delete_set_id' not in st.session_state:
-            st.session_state.confirm_delete_set_id = None
-        if 'confirm_delete_session' not in st.session_state:
-            st.session_state.confirm_delete_session = None
-        if 'editing_all_sets' not in st.session_state:
-            st.session_state.editing_all_sets = {}
+        ss.setdefault('editing_set_id', None)
+        ss.setdefault('confirm_delete_set_id', None)
+        ss.setdefault('confirm_delete_session', None)
+        ss.setdefault('active_row', None)
+        ss.setdefault('editing_all_sets', {})
         
-        # Display workouts grouped by exercise
+        # Display text of every set, built in one vectorized pass
+        info_texts = _set_info_texts(today_workouts)
+        
+        # Display workouts grouped by exercise (one sort + groupby, in query order)
+        sets_by_exercise = today_workouts.sort_values('set_order', kind='stable').groupby('exercise_name', sort=False)
         for exercise_name in exercises:
-            exercise_workouts = today_workouts[today_workouts['exercise_name'] == exercise_name].copy()
-            exercise_workouts = exercise_workouts.sort_values('set_order')
+            exercise_workouts = sets_by_exercise.get_group(exercise_name)
             
             # Exercise header with edit all and delete session buttons
             col_header1, col_header2, col_header3 = st.columns([3, 1, 1])
@@ -818,20 +530,18 @@ def render_log_workout_page(user_id: str):
                 st.markdown(f"### {exercise_name}")
             with col_header2:
                 edit_all_key = f"edit_all_{exercise_name}_{workout_date}"
-                is_editing_all = st.session_state.editing_all_sets.get(edit_all_key, False)
+                is_editing_all = ss.editing_all_sets.get(edit_all_key, False)
                 button_text = "✅ 完成編輯" if is_editing_all else "✏️ 編輯全部"
                 button_type = "primary" if is_editing_all else "secondary"
-                if st.button(button_text, key=edit_all_key, use_container_width=True, type=button_type):
-                    st.session_state.editing_all_sets[edit_all_key] = not is_editing_all
-                    st.rerun()
+                st.button(button_text, key=edit_all_key, use_container_width=True, type=button_type,
+                          on_click=_set_session_item, args=('editing_all_sets', edit_all_key, not is_editing_all))
             with col_header3:
                 delete_session_key = f"delete_session_{exercise_name}_{workout_date}"
-                if st.button("🗑️ 刪除整個訓練", key=delete_session_key, use_container_width=True, type="secondary"):
-                    st.session_state.confirm_delete_session = (exercise_name, workout_date)
-                    st.rerun()
+                st.button("🗑️ 刪除整個訓練", key=delete_session_key, use_container_width=True, type="secondary",
+                          on_click=_set_session_value, args=('confirm_delete_session', (exercise_name, workout_date)))
             
             # Confirmation dialog for session deletion
-            if st.session_state.confirm_delete_session and st.session_state.confirm_delete_session[0] == exercise_name:
+            if ss.confirm_delete_session and ss.confirm_delete_session[0] == exercise_name:
                 st.warning(f"⚠️ 確定要刪除 {exercise_name} 在 {workout_date} 的所有訓練記錄嗎？")
                 col_confirm1, col_confirm2 = st.columns(2)
                 with col_confirm1:
@@ -839,44 +549,27 @@ def render_log_workout_page(user_id: str):
                         deleted_count = delete_workout_session(user_id, workout_date, exercise_name)
                         if deleted_count > 0:
                             st.success(f"✅ 已刪除 {deleted_count} 組訓練記錄")
-                            st.session_state.confirm_delete_session = None
+                            ss.confirm_delete_session = None
                             st.rerun()
                         else:
                             st.error("刪除失敗")
                 with col_confirm2:
-                    if st.button("❌ 取消", key=f"cancel_delete_session_{exercise_name}"):
-                        st.session_state.confirm_delete_session = None
-                        st.rerun()
+                    st.button("❌ 取消", key=f"cancel_delete_session_{exercise_name}",
+                              on_click=_set_session_value, args=('confirm_delete_session', None))
             
             # Check if editing all sets for this exercise
             edit_all_key = f"edit_all_{exercise_name}_{workout_date}"
-            is_editing_all = st.session_state.editing_all_sets.get(edit_all_key, False)
+            is_editing_all = ss.editing_all_sets.get(edit_all_key, False)
             
             if is_editing_all:
                 # Edit all sets mode - show all sets in a form
                 with st.form(f"edit_all_form_{exercise_name}_{workout_date}", clear_on_submit=False):
                     st.markdown("**編輯所有組數**")
                     
-                    # Create a list to store all set data
-                    sets_data = []
-                    for idx, row in exercise_workouts.iterrows():
-                        set_id = row['id']
-                        set_order = row['set_order']
-                        weight = row['weight']
-                        unit = row['unit']
-                        reps = row['reps']
-                        rpe = row.get('rpe')
-                        notes = row.get('notes')
-                        
-                        sets_data.append({
-                            'id': set_id,
-                            'set_order': set_order,
-                            'weight': weight,
-                            'unit': unit,
-                            'reps': reps,
-                            'rpe': rpe,
-                            'notes': notes
-                        })
+                    # Create a list to store all set data (columns pulled out in one go)
+                    sets_data = exercise_workouts[
+                        ['id', 'set_order', 'weight', 'unit', 'reps', 'rpe', 'notes']
+                    ].to_dict('records')
                     
                     # Display all sets in editable format
                     for set_data in sets_data:
@@ -892,36 +585,31 @@ def render_log_workout_page(user_id: str):
                             col_w1, col_w2, col_w3 = st.columns([2, 2, 1])
                             
                             with col_w1:
-                                weight_options = get_weight_options(unit)
-                                default_weight_idx = 0
-                                if weight in weight_options:
-                                    default_weight_idx = weight_options.index(weight)
+                                weight_options, weight_option_index = weight_options_by_unit.get(unit, weight_options_by_unit["notch/plate"])
+                                default_weight_idx = weight_option_index.get(weight, 0)
                                 st.selectbox(
                                     "重量",
                                     options=weight_options,
                                     index=default_weight_idx,
                                     key=f"edit_all_weight_{set_id}",
-                                    format_func=lambda x: f"{int(x) if x == int(x) else x:.1f} {unit}" if x > 0 else "選擇重量"
+                                    format_func=get_weight_option_labels(unit).__getitem__
                                 )
                             
                             with col_w2:
-                                reps_options = get_reps_options()
-                                default_reps_idx = 0
-                                if reps in reps_options:
-                                    default_reps_idx = reps_options.index(reps)
+                                default_reps_idx = reps_option_index.get(reps, 0)
                                 st.selectbox(
                                     "次數",
                                     options=reps_options,
                                     index=default_reps_idx,
                                     key=f"edit_all_reps_{set_id}",
-                                    format_func=lambda x: f"{x} 次" if x > 0 else "選擇次數"
+                                    format_func=get_reps_option_labels().__getitem__
                                 )
                             
                             with col_w3:
                                 st.radio(
                                     "單位",
-                                    ["kg", "lb", "notch/plate"],
-                                    index=0 if unit == "kg" else (1 if unit == "lb" else 2),
+                                    UNIT_CHOICES,
+                                    index=UNIT_CHOICE_INDEX.get(unit, 2),
                                     horizontal=True,
                                     key=f"edit_all_unit_{set_id}"
                                 )
@@ -961,11 +649,11 @@ def render_log_workout_page(user_id: str):
                             
                             for set_data in sets_data:
                                 set_id = set_data['id']
-                                new_weight = st.session_state.get(f"edit_all_weight_{set_id}", set_data['weight'])
-                                new_reps = st.session_state.get(f"edit_all_reps_{set_id}", set_data['reps'])
-                                new_unit = st.session_state.get(f"edit_all_unit_{set_id}", set_data['unit'])
-                                new_rpe = st.session_state.get(f"edit_all_rpe_{set_id}", set_data.get('rpe', 7))
-                                new_notes = st.session_state.get(f"edit_all_notes_{set_id}", set_data.get('notes', ''))
+                                new_weight = ss.get(f"edit_all_weight_{set_id}", set_data['weight'])
+                                new_reps = ss.get(f"edit_all_reps_{set_id}", set_data['reps'])
+                                new_unit = ss.get(f"edit_all_unit_{set_id}", set_data['unit'])
+                                new_rpe = ss.get(f"edit_all_rpe_{set_id}", set_data.get('rpe', 7))
+                                new_notes = ss.get(f"edit_all_notes_{set_id}", set_data.get('notes', ''))
                                 
                                 if new_weight > 0 and new_reps > 0:
                                     updates.append({
@@ -980,28 +668,20 @@ def render_log_workout_page(user_id: str):
                                     all_valid = False
                             
                             if all_valid and updates:
-                                # Update all sets
-                                success_count = 0
-                                for update in updates:
-                                    success = update_workout_set(
-                                        user_id, update['set_id'], update['weight'],
-                                        update['unit'], update['reps'], update['rpe'], update['notes']
-                                    )
-                                    if success:
-                                        success_count += 1
+                                # Update all sets in one request
+                                success_count = update_workout_sets(user_id, updates)
                                 
                                 if success_count == len(updates):
                                     st.success(f"✅ 已更新 {success_count} 組訓練記錄")
-                                    st.session_state.editing_all_sets[edit_all_key] = False
+                                    ss.editing_all_sets[edit_all_key] = False
                                     st.rerun()
                                 else:
                                     st.warning(f"⚠️ 部分更新失敗 ({success_count}/{len(updates)})")
                             else:
                                 st.error("請確保所有組數都有有效的重量和次數")
                     with col_cancel_all:
-                        if st.form_submit_button("❌ 取消"):
-                            st.session_state.editing_all_sets[edit_all_key] = False
-                            st.rerun()
+                        st.form_submit_button("❌ 取消", on_click=_set_session_item,
+                                              args=('editing_all_sets', edit_all_key, False))
                 
                 # Delete buttons for individual sets (outside form - after form closes)
                 st.markdown("**刪除組數**")
@@ -1022,18 +702,20 @@ def render_log_workout_page(user_id: str):
             else:
                 # Normal display mode - show individual sets
                 # Display each set
-                for idx, row in exercise_workouts.iterrows():
-                    set_id = row['id']
-                    set_order = row['set_order']
-                    weight = row['weight']
-                    unit = row['unit']
-                    reps = row['reps']
-                    rpe = row.get('rpe')
-                    notes = row.get('notes')
-                    
+                # Pull each column out as a plain list once, then zip
+                for idx, set_id, set_order, weight, unit, reps, rpe, notes in zip(
+                    exercise_workouts.index.tolist(),
+                    exercise_workouts['id'].tolist(),
+                    exercise_workouts['set_order'].tolist(),
+                    exercise_workouts['weight'].tolist(),
+                    exercise_workouts['unit'].tolist(),
+                    exercise_workouts['reps'].tolist(),
+                    exercise_workouts['rpe'].tolist(),
+                    exercise_workouts['notes'].tolist()
+                ):
                     # Check if this set is being edited
-                    is_editing = st.session_state.editing_set_id == set_id
-                    is_confirming_delete = st.session_state.confirm_delete_set_id == set_id
+                    is_editing = ss.editing_set_id == set_id
+                    is_confirming_delete = ss.confirm_delete_set_id == set_id
                     
                     if is_editing:
                         # Edit form
@@ -1043,36 +725,31 @@ def render_log_workout_page(user_id: str):
                                 
                                 with col_w1:
                                     # Weight options based on current unit
-                                    weight_options = get_weight_options(unit)
-                                    default_weight_idx = 0
-                                    if weight in weight_options:
-                                        default_weight_idx = weight_options.index(weight)
+                                    weight_options, weight_option_index = weight_options_by_unit.get(unit, weight_options_by_unit["notch/plate"])
+                                    default_weight_idx = weight_option_index.get(weight, 0)
                                     new_weight = st.selectbox(
                                         "重量",
                                         options=weight_options,
                                         index=default_weight_idx,
                                         key=f"edit_weight_{set_id}",
-                                        format_func=lambda x: f"{int(x) if x == int(x) else x:.1f} {unit}" if x > 0 else "選擇重量"
+                                        format_func=get_weight_option_labels(unit).__getitem__
                                     )
                                 
                                 with col_w2:
-                                    reps_options = get_reps_options()
-                                    default_reps_idx = 0
-                                    if reps in reps_options:
-                                        default_reps_idx = reps_options.index(reps)
+                                    default_reps_idx = reps_option_index.get(reps, 0)
                                     new_reps = st.selectbox(
                                         "次數",
                                         options=reps_options,
                                         index=default_reps_idx,
                                         key=f"edit_reps_{set_id}",
-                                        format_func=lambda x: f"{x} 次" if x > 0 else "選擇次數"
+                                        format_func=get_reps_option_labels().__getitem__
                                     )
                                 
                                 with col_w3:
                                     new_unit = st.radio(
                                         "單位",
-                                        ["kg", "lb", "notch/plate"],
-                                        index=0 if unit == "kg" else (1 if unit == "lb" else 2),
+                                        UNIT_CHOICES,
+                                        index=UNIT_CHOICE_INDEX.get(unit, 2),
                                         horizontal=True,
                                         key=f"edit_unit_{set_id}"
                                     )
@@ -1112,16 +789,15 @@ def render_log_workout_page(user_id: str):
                                             )
                                             if success:
                                                 st.success("✅ 已更新訓練記錄")
-                                                st.session_state.editing_set_id = None
+                                                ss.editing_set_id = None
                                                 st.rerun()
                                             else:
                                                 st.error("更新失敗")
                                         else:
                                             st.error("請輸入有效的重量和次數")
                                 with col_cancel:
-                                    if st.form_submit_button("❌ 取消"):
-                                        st.session_state.editing_set_id = None
-                                        st.rerun()
+                                    st.form_submit_button("❌ 取消", on_click=_set_session_value,
+                                                          args=('editing_set_id', None))
                     
                     elif is_confirming_delete:
                         # Delete confirmation
@@ -1132,265 +808,885 @@ def render_log_workout_page(user_id: str):
                                 success = delete_workout_set(user_id, set_id)
                                 if success:
                                     st.success("✅ 已刪除訓練記錄")
-                                    st.session_state.confirm_delete_set_id = None
+                                    ss.confirm_delete_set_id = None
                                     st.rerun()
                                 else:
                                     st.error("刪除失敗")
                         with col_del2:
-                            if st.button("❌ 取消", key=f"cancel_delete_{set_id}"):
-                                st.session_state.confirm_delete_set_id = None
-                                st.rerun()
+                            st.button("❌ 取消", key=f"cancel_delete_{set_id}",
+                                      on_click=_set_session_value, args=('confirm_delete_set_id', None))
                     
-                    else:
-                        # Display set info with edit/delete buttons
+                    elif ss.active_row == set_id:
+                        # Only the selected row expands into info + edit/delete buttons
                         col_info, col_edit, col_delete = st.columns([6, 1, 1])
                         
                         with col_info:
-                            from utils.helpers import is_pure_bodyweight_exercise
-                            is_pure_bodyweight = is_pure_bodyweight_exercise(exercise_name)
-                            
-                            rpe_display = f"RPE: {rpe}/10" if rpe else ""
-                            notes_display = f"備註: {notes}" if notes else ""
-                            
-                            if is_pure_bodyweight:
-                                # For pure bodyweight exercises, show only reps
-                                info_text = f"組 {set_order}: {reps} 次"
-                            else:
-                                weight_display = format_weight(weight, unit)
-                                info_text = f"組 {set_order}: {weight_display} × {reps} 次"
-                            
-                            if rpe_display:
-                                info_text += f" | {rpe_display}"
-                            if notes_display:
-                                info_text += f" | {notes_display}"
-                            st.write(info_text)
+                            st.markdown(f"**{info_texts[idx]}**")
                         
                         with col_edit:
-                            if st.button("✏️", key=f"edit_btn_{set_id}", help="編輯"):
-                                st.session_state.editing_set_id = set_id
-                                st.rerun()
+                            st.button("✏️", key=f"edit_btn_{set_id}", help="編輯",
+                                      on_click=_set_session_value, args=('editing_set_id', set_id))
                         
                         with col_delete:
-                            if st.button("🗑️", key=f"delete_btn_{set_id}", help="刪除"):
-                                st.session_state.confirm_delete_set_id = set_id
-                                st.rerun()
+                            st.button("🗑️", key=f"delete_btn_{set_id}", help="刪除",
+                                      on_click=_set_session_value, args=('confirm_delete_set_id', set_id))
+                    
+                    else:
+                        # Read-only row: a single markdown line, no column layout or buttons
+                        st.markdown(info_texts[idx])
+                
+                # One picker per exercise chooses which row shows its action buttons
+                set_labels = dict(zip(exercise_workouts['id'].tolist(),
+                                      exercise_workouts['set_order'].tolist()))
+                st.pills(
+                    "操作組數",
+                    options=list(set_labels),
+                    format_func=lambda sid: f"組 {set_labels[sid]}",
+                    key=f"active_row_pick_{exercise_name}",
+                    on_change=_on_active_row_pick,
+                    args=(f"active_row_pick_{exercise_name}",),
+                    label_visibility="collapsed"
+                )
             
             st.divider()
         
-        # Calculate total volume
-        total_volume = 0
-        for _, row in today_workouts.iterrows():
-            total_volume += calculate_total_volume(row['weight'], row['reps'], row['unit'])
+        # Total volume is summed in SQL (or once in the DB layer) with the cached context
+        total_volume = context['todays_volume']
         st.metric("今日總訓練容量", f"{total_volume:.1f} kg")
     else:
         st.info("今天還沒有訓練記錄")
 
 
+def render_log_workout_page(user_id: str):
+    """Render the Log Workout page"""
+    ss = st.session_state
+    st.header("📝 記錄訓練")
+    
+    # Last 7 days workout summary
+    from datetime import timedelta
+    from database.db_manager import get_all_workouts
+    
+    st.subheader("📊 過去 7 天訓練摘要")
+    
+    # Get workouts from last 7 days
+    workouts_df = get_all_workouts(user_id, days=7)
+    
+    if not workouts_df.empty:
+        # Get muscle group mapping for exercises
+        exercise_to_muscle = get_exercise_muscle_groups(user_id)
+        
+        # Muscle group color mapping
+        muscle_group_colors = {
+            '胸 (Chest)': '#FFE5E5',      # Light red
+            '背 (Back)': '#E5F3FF',       # Light blue
+            '肩 (Shoulders)': '#FFF9E5',  # Light yellow
+            '腿 (Legs)': '#E5FFE5',       # Light green
+            '二頭肌 (Biceps)': '#F0E5FF',  # Light purple
+            '三頭肌 (Triceps)': '#E5D5FF', # Light purple (darker)
+            '核心 (Core)': '#FFE5CC',       # Light orange
+            '其他 (Other)': '#F5F5F5'     # Light grey
+        }
+        
+        # Get unique dates and sort
+        unique_dates = sorted(workouts_df['date'].unique(), reverse=True)
+        
+        # Muscle group emoji/indicator mapping for visual identification
+        muscle_group_indicators = {
+            '胸 (Chest)': '🔴',
+            '背 (Back)': '🔵',
+            '肩 (Shoulders)': '🟡',
+            '腿 (Legs)': '🟢',
+            '二頭肌 (Biceps)': '🟣',
+            '三頭肌 (Triceps)': '🟪',
+            '核心 (Core)': '🟠',
+            '其他 (Other)': '⚪'
+        }
+        
+        # Total volume per day in one grouped pass
+        day_codes, day_index = pd.factorize(workouts_df['date'])
+        daily_volume = pd.Series(
+            aggregate_volume_by_group(
+                workouts_df['weight'].to_numpy(),
+                workouts_df['reps'].to_numpy(),
+                workouts_df['unit'].to_numpy(),
+                day_codes,
+                len(day_index)
+            ),
+            index=day_index
+        )
+        
+        # Build summary data - one row per exercise per day
+        summary_rows = []
+        for workout_date in unique_dates:
+            day_workouts = workouts_df[workouts_df['date'] == workout_date]
+            
+            # Format date and weekday
+            date_obj = workout_date if isinstance(workout_date, date) else pd.to_datetime(workout_date).date()
+            weekday_names = ['週一', '週二', '週三', '週四', '週五', '週六', '週日']
+            weekday = weekday_names[date_obj.weekday()]
+            date_str = date_obj.strftime('%Y-%m-%d')
+            date_display = f"{date_str} ({weekday})"
+            
+            total_volume = float(daily_volume[workout_date])
+            
+            # Group by exercise and create one row per exercise
+            exercises = day_workouts['exercise_name'].unique()
+            for exercise_idx, exercise_name in enumerate(exercises):
+                ex_sets = day_workouts[day_workouts['exercise_name'] == exercise_name].sort_values('set_order')
+                sets_count = len(ex_sets)
+                
+                # Format each set - show reps only for pure bodyweight exercises
+                is_pure_bodyweight = is_pure_bodyweight_exercise(exercise_name)
+                
+                sets_list = []
+                for row in ex_sets.itertuples(index=False):
+                    weight = row.weight
+                    unit = row.unit
+                    reps = int(row.reps)
+                    
+                    if is_pure_bodyweight:
+                        # For pure bodyweight exercises, show only reps
+                        sets_list.append(f"x{reps}")
+                    else:
+                        # For other exercises, show weight unit x reps
+                        if weight == int(weight):
+                            weight_str = str(int(weight))
+                        else:
+                            weight_str = f"{weight:.1f}"
+                        sets_list.append(f"{weight_str} {unit} x{reps}")
+                
+                sets_str = ', '.join(sets_list)
+                
+                # Get muscle group indicator
+                muscle_group = exercise_to_muscle.get(exercise_name, '其他 (Other)')
+                indicator = muscle_group_indicators.get(muscle_group, '⚪')
+                
+                # Format: "🔴 exercise name | xx sets | xx kg x12, xx kg x10"
+                exercise_detail = f"{indicator} {exercise_name} | {sets_count} sets | {sets_str}"
+                
+                # Show date only for first exercise of the day, show volume only for first exercise
+                summary_rows.append({
+                    '日期': date_display if exercise_idx == 0 else '',
+                    '動作詳情': exercise_detail,
+                    '總容量 (kg)': f"{total_volume:.1f}" if exercise_idx == 0 else ''
+                })
+        
+        # Create DataFrame with alternating row backgrounds
+        if summary_rows:
+            summary_df = pd.DataFrame(summary_rows)
+            
+            # Determine background color for each row based on date
+            date_to_bg = {}
+            current_date = None
+            date_index = 0
+            
+            for idx, row_date in summary_df['日期'].items():
+                if row_date and row_date != current_date:
+                    current_date = row_date
+                    date_index += 1
+                    date_to_bg[row_date] = '#F5F5F5' if date_index % 2 == 1 else '#FFFFFF'
+                elif not row_date:
+                    # Empty date means same day as previous
+                    date_to_bg[idx] = date_to_bg.get(current_date, '#FFFFFF')
+                else:
+                    date_to_bg[idx] = date_to_bg.get(row_date, '#FFFFFF')
+            
+            def style_row_background(row):
+                """Apply alternating background colors based on date"""
+                row_date = row['日期']
+                if row_date:
+                    bg_color = date_to_bg.get(row_date, '#FFFFFF')
+                else:
+                    # Use the row index to find the background
+                    bg_color = date_to_bg.get(row.name, '#FFFFFF')
+                return [f'background-color: {bg_color}'] * len(row)
+            
+            styled_df = summary_df.style.apply(style_row_background, axis=1)
+            
+            # Display styled dataframe
+            st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("過去 7 天沒有訓練記錄")
+    
+    st.divider()
+    
+    # Date selection
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        workout_date = st.date_input("訓練日期", value=date.today())
+    with col2:
+        st.write("")  # Spacing
+    
+    # Muscle group and exercise selection
+    muscle_groups = get_muscle_groups()
+    
+    # Initialize selected muscle group in session state if not set
+    ss.setdefault('selected_muscle_group', muscle_groups[0] if muscle_groups else None)
+    
+    # Track previous muscle group to detect changes
+    ss.setdefault('previous_muscle_group', ss.selected_muscle_group)
+    
+    # Muscle group selection with buttons
+    st.subheader("選擇肌肉群")
+    
+    # Create button grid (3 columns)
+    num_cols = 3
+    muscle_cols = st.columns(num_cols)
+    
+    selected_muscle_group = ss.selected_muscle_group
+    
+    # Display muscle group buttons
+    for idx, muscle_group in enumerate(muscle_groups):
+        col_idx = idx % num_cols
+        with muscle_cols[col_idx]:
+            is_selected = ss.selected_muscle_group == muscle_group
+            button_type = "primary" if is_selected else "secondary"
+            
+            if st.button(
+                muscle_group,
+                key=f"muscle_group_{muscle_group}",
+                use_container_width=True,
+                type=button_type
+            ):
+                ss.selected_muscle_group = muscle_group
+                st.rerun()
+    
+    # Update selected_muscle_group from session state
+    selected_muscle_group = ss.selected_muscle_group
+    
+    # Get exercises for selected muscle group
+    exercises = get_exercises_by_muscle_group(user_id, selected_muscle_group)
+    if not exercises:
+        st.info(f"「{selected_muscle_group}」目前沒有動作，請先在「動作庫管理」頁面新增動作。")
+        return
+    
+    # Clear selected exercise if muscle group changed or if selected exercise is not in current group
+    if ss.previous_muscle_group != selected_muscle_group:
+        ss.previous_muscle_group = selected_muscle_group
+        # Clear selected exercise when muscle group changes
+        if 'selected_exercise' in ss:
+            ss.selected_exercise = None
+    
+    # Also clear if selected exercise is not in the current muscle group's exercises
+    if 'selected_exercise' in ss and ss.selected_exercise:
+        if ss.selected_exercise not in exercises:
+            ss.selected_exercise = None
+    
+    # Initialize selected exercise in session state if not set
+    ss.setdefault('selected_exercise', None)
+    
+    # Counts, recent sessions, exercise details and the day's sets in one cached call
+    context = get_log_page_context(user_id, ss.selected_exercise, workout_date, MAX_RECENT_SESSIONS)
+    
+    # Get workout counts for all exercises
+    workout_counts = context['workout_counts']
+    
+    # Exercise selection with a single pills widget
+    st.subheader("選擇動作")
+    
+    exercise_labels = {
+        name: f"{name} ({workout_counts[name]})" if workout_counts.get(name, 0) > 0 else name
+        for name in exercises
+    }
+    pick_key = f"ex_pick_{selected_muscle_group}"
+    
+    def _on_exercise_pick():
+        # Runs before the rerun, so the context above is fetched for the new exercise
+        ss.selected_exercise = ss[pick_key]
+    
+    st.pills(
+        "動作",
+        options=exercises,
+        format_func=exercise_labels.get,
+        selection_mode="single",
+        default=ss.selected_exercise,
+        key=pick_key,
+        on_change=_on_exercise_pick,
+        label_visibility="collapsed"
+    )
+    
+    # Get selected exercise
+    selected_exercise = ss.selected_exercise
+    
+    # Check if exercise is selected before proceeding
+    if not selected_exercise:
+        st.info("請選擇一個動作以繼續")
+        return
+    
+    # Display execution steps
+    exercise_data = context['exercise_details']
+    if exercise_data and exercise_data.get('execution_steps'):
+        st.info("📋 執行步驟")
+        st.markdown(exercise_data['execution_steps'])
+    
+    _log_entry_fragment(user_id, workout_date, selected_exercise)
+    _rest_timer_fragment()
+    _todays_workouts_fragment(user_id, workout_date, selected_exercise)
+
+
 # ============================================================================
 # PAGE 2: PROGRESS DASHBOARD (進度儀表板)
 # ============================================================================
 
+def _session_metrics_polars(history_df: pd.DataFrame, bodyweight: float = None) -> pd.DataFrame:
+    """
+    Polars version of the calculate_session_metrics aggregation
+    
+    Args:
+        history_df: Sets with normalized date, weight, reps, unit (sorted by date)
+        bodyweight: Bodyweight in lb for an assisted exercise, None otherwise
+    
+    Returns:
+        Session DataFrame (same columns as calculate_session_metrics)
+    """
+    history_df = history_df.assign(factor=unit_to_kg_factors(history_df['unit']))
+    lf = pl.from_pandas(history_df).lazy().with_row_index('_row')
+    
+    # Primary unit per session = most common unit
+    session_units = lf.group_by('date').agg(pl.col('unit').mode().first().alias('session_unit'))
+    
+    if bodyweight:
+        # Effective weight = bodyweight (converted to the session unit) - assisted weight,
+        # with volume in the session unit as well
+        units = history_df['unit'].unique().tolist()
+        bodyweight_by_unit = pl.LazyFrame({
+            'session_unit': units,
+            'bodyweight': [convert_unit(bodyweight, 'lb', u) for u in units],
+            'session_factor': unit_to_kg_factors(units)
+        })
+        lf = lf.join(session_units, on='date', how='left')\
+            .join(bodyweight_by_unit, on='session_unit', how='left')\
+            .sort('_row')\
+            .with_columns(
+                (pl.col('bodyweight') - pl.col('weight')).alias('weight'),
+                pl.col('session_factor').alias('factor')
+            )
+        max_reps = pl.col('reps').gather(pl.col('weight').arg_max()).first()
+    else:
+        # Bodyweight sessions (all weights are 0) use the max reps across all sets
+        max_reps = pl.when((pl.col('weight') == 0).all())\
+            .then(pl.col('reps').max())\
+            .otherwise(pl.col('reps').gather(pl.col('weight').arg_max()).first())
+    
+    sessions = lf.group_by('date').agg(
+        pl.col('weight').max().alias('max_weight'),
+        max_reps.alias('max_reps'),
+        (pl.col('weight') * pl.col('reps') * pl.col('factor')).sum().alias('total_volume'),
+        pl.len().alias('sets')
+    ).join(session_units, on='date', how='left')\
+        .rename({'session_unit': 'unit'})\
+        .sort('date')\
+        .collect()\
+        .to_pandas()
+    
+    # 1RM from the weight and reps of the same set that had max weight
+    sessions['max_1rm'] = calculate_1rm(sessions['max_weight'].to_numpy(), sessions['max_reps'].to_numpy())
+    return sessions[['date', 'max_weight', 'max_reps', 'total_volume', 'max_1rm', 'sets', 'unit']].astype(SESSION_METRIC_DTYPES)
+
+
 def calculate_session_metrics(history_df: pd.DataFrame, exercise_name: str = None, bodyweight: float = None) -> pd.DataFrame:
     """Calculate session metrics from history DataFrame"""
     if history_df.empty:
         return pd.DataFrame()
     
-    # Ensure date is datetime and sort by date
-    history_df = history_df.copy()
-    history_df['date'] = pd.to_datetime(history_df['date'])
-    history_df = history_df.sort_values('date')
+    # One session per calendar day; stable sort keeps the logged set order within a day
+    # (column selection already yields a new frame; dates are parsed only if needed)
+    dates = history_df['date']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    history_df = history_df[['weight', 'reps', 'unit']].assign(date=dates.dt.normalize())
+    history_df = history_df.sort_values('date', kind='stable').reset_index(drop=True)
     
-    session_data = []
-    current_date = None
-    session_sets = []
+    is_assisted = is_assisted_exercise(exercise_name) if exercise_name else False
     
-    for _, row in history_df.iterrows():
-        row_date = row['date']
-        
-        # Normalize date to date only (remove time component if any)
-        if isinstance(row_date, pd.Timestamp):
-            row_date = row_date.date()
-        elif hasattr(row_date, 'date'):
-            row_date = row_date.date()
-        
-        if current_date != row_date:
-            if current_date is not None and session_sets:
-                # Check if this is an assisted exercise
-                is_assisted = is_assisted_exercise(exercise_name) if exercise_name else False
-                
-                # Calculate session metrics
-                if is_assisted and bodyweight:
-                    # For assisted exercises, calculate effective weight
-                    # Effective weight = bodyweight - assisted weight
-                    # Convert bodyweight to same unit as session
-                    session_units = [s['unit'] for s in session_sets]
-                    primary_unit = max(set(session_units), key=session_units.count) if session_units else 'kg'
-                    
-                    # Convert bodyweight to session unit (assuming bodyweight is in lb)
-                    from utils.calculations import convert_unit
-                    bodyweight_in_unit = convert_unit(bodyweight, 'lb', primary_unit)
-                    
-                    # Calculate effective weights and find the set with max weight
-                    max_set = max(session_sets, key=lambda s: bodyweight_in_unit - s['weight'])
-                    max_weight = bodyweight_in_unit - max_set['weight']
-                    max_reps = max_set['reps']  # Use reps from the same set as max weight
-                    total_volume = sum(calculate_total_volume(bodyweight_in_unit - s['weight'], s['reps'], primary_unit) for s in session_sets)
-                    # Calculate 1RM using the weight and reps from the same set that had max weight
-                    max_1rm = calculate_1rm(max_weight, max_reps)
-                else:
-                    # Find the set with max weight
-                    max_set = max(session_sets, key=lambda s: s['weight'])
-                    max_weight = max_set['weight']
-                    
-                    # For bodyweight exercises (all weights are 0), find max reps across all sets
-                    # Otherwise, use reps from the set with max weight
-                    if max_weight == 0 and all(s['weight'] == 0 for s in session_sets):
-                        # Bodyweight exercise: find max reps across all sets
-                        max_reps = max(s['reps'] for s in session_sets)
-                    else:
-                        # Weighted exercise: use reps from the set with max weight
-                        max_reps = max_set['reps']
-                    
-                    total_volume = sum(calculate_total_volume(s['weight'], s['reps'], s['unit']) for s in session_sets)
-                    # Calculate 1RM using the weight and reps from the same set that had max weight
-                    max_1rm = calculate_1rm(max_weight, max_reps)
-                    
-                    # Get primary unit for this session (most common unit)
-                    session_units = [s['unit'] for s in session_sets]
-                    primary_unit = max(set(session_units), key=session_units.count) if session_units else 'kg'
-                
-                session_data.append({
-                    'date': pd.Timestamp(current_date),
-                    'max_weight': max_weight,
-                    'max_reps': max_reps,
-                    'total_volume': total_volume,
-                    'max_1rm': max_1rm,
-                    'sets': len(session_sets),
-                    'unit': primary_unit
-                })
-            current_date = row_date
-            session_sets = []
+    if POLARS_AVAILABLE:
+        return _session_metrics_polars(history_df, bodyweight if is_assisted else None)
+    
+    sessions = pd.DataFrame({'sets': history_df.groupby('date', sort=True).size()})
+    
+    # Primary unit per session = most common unit
+    unit_counts = history_df.groupby(['date', 'unit'], sort=False).size().reset_index(name='n')
+    unit_counts = unit_counts.sort_values('n', ascending=False, kind='stable').drop_duplicates('date')
+    sessions['unit'] = unit_counts.set_index('date')['unit']
+    
+    # Dates are sorted, so each session is a contiguous run of group codes
+    group_ids = pd.factorize(history_df['date'])[0]
+    weights = history_df['weight'].to_numpy(dtype=float)
+    
+    if is_assisted and bodyweight:
+        # For assisted exercises, effective weight = bodyweight - assisted weight,
+        # with bodyweight (in lb) converted to each session's primary unit
+        bodyweight_by_unit = {u: convert_unit(bodyweight, 'lb', u) for u in sessions['unit'].unique()}
+        weights = sessions['unit'].map(bodyweight_by_unit).to_numpy(dtype=float)[group_ids] - weights
+        units = sessions['unit'].to_numpy()[group_ids]
+    else:
+        units = history_df['unit'].to_numpy()
+    
+    # Reps come from the (first) set with the max (effective) weight; bodyweight
+    # sessions (all weights are 0) use the max reps across all sets instead
+    max_weight, max_reps, total_volume = aggregate_sessions(
+        weights, history_df['reps'].to_numpy(), units, group_ids, len(sessions),
+        bodyweight_rule=not (is_assisted and bodyweight)
+    )
+    sessions['max_weight'] = max_weight
+    sessions['max_reps'] = max_reps
+    sessions['total_volume'] = total_volume
+    # 1RM from the weight and reps of the same set that had max weight
+    sessions['max_1rm'] = calculate_1rm(max_weight, max_reps)
+    
+    sessions = sessions.reset_index()[['date', 'max_weight', 'max_reps', 'total_volume', 'max_1rm', 'sets', 'unit']]
+    return sessions.astype(SESSION_METRIC_DTYPES)
+
+
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def _exercise_session_metrics(user_id: str, exercise_name: str, bodyweight: float, data_version: int,
+                              _history_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-session metrics for one exercise, cached so reselecting it skips the recompute
+    
+    Args:
+        user_id: User UUID
+        exercise_name: Exercise to summarize
+        bodyweight: Bodyweight in lb (for assisted exercises)
+        data_version: get_workout_data_version(); changes whenever workout logs change
+        _history_df: The exercise's history rows (not hashed; the other args key the cache)
+    
+    Returns:
+        Session DataFrame with display_value/is_bodyweight columns (empty if no data)
+    """
+    if _history_df.empty:
+        return pd.DataFrame()
+    
+    session_df = calculate_session_metrics(_history_df, exercise_name, bodyweight)
+    if session_df.empty:
+        return session_df
+    
+    session_df['exercise'] = exercise_name
+    # For pure bodyweight exercises, use max_reps instead of max_weight for display
+    is_bodyweight_ex = is_pure_bodyweight_exercise(exercise_name)
+    # Additional check: if unit is 'bodyweight' or all weights are effectively 0
+    if not is_bodyweight_ex:
+        # Check if all weights are 0 or unit is 'bodyweight'
+        if 'unit' in session_df.columns:
+            unique_units = session_df['unit'].unique()
+            if 'bodyweight' in unique_units or (len(unique_units) == 1 and session_df['max_weight'].max() == 0):
+                is_bodyweight_ex = True
+    
+    if is_bodyweight_ex:
+        session_df['display_value'] = session_df['max_reps']
+        session_df['is_bodyweight'] = True
+    else:
+        session_df['display_value'] = session_df['max_weight']
+        session_df['is_bodyweight'] = False
+    return session_df
+
+
+def _build_chart_data(user_id: str, selected_exercises: list, y_col: str, bodyweight: float):
+    """
+    Fetch history and compute per-session metrics for the selected exercises
+    
+    Args:
+        user_id: User UUID
+        selected_exercises: Exercise names to chart
+        y_col: Column the trend charts plot (used to guide downsampling)
+        bodyweight: Bodyweight in lb (for assisted exercises)
+    
+    Returns:
+        Tuple of (combined session DataFrame or None if no data, exercises without data)
+    """
+    all_session_data = []
+    exercises_without_data = []
+    
+    # One query for every selected exercise, split locally
+    history_df = get_exercise_history_bulk(user_id, tuple(sorted(selected_exercises)))
+    history_by_exercise = dict(tuple(history_df.groupby('exercise_name', sort=False)))
+    
+    data_version = get_workout_data_version()
+    for exercise_name in selected_exercises:
+        if exercise_name not in history_by_exercise:
+            exercises_without_data.append(exercise_name)
+            continue
         
-        session_sets.append({
-            'weight': row['weight'],
-            'reps': row['reps'],
-            'unit': row['unit']
-        })
+        session_df = _exercise_session_metrics(user_id, exercise_name, bodyweight, data_version,
+                                               history_by_exercise[exercise_name])
+        if session_df.empty:
+            exercises_without_data.append(exercise_name)
+        else:
+            all_session_data.append(session_df)
+    
+    if not all_session_data:
+        return None, exercises_without_data
     
-    # Add last session
-    if session_sets and current_date is not None:
-        # Check if this is an assisted exercise
-        is_assisted = is_assisted_exercise(exercise_name) if exercise_name else False
+    combined_df = pd.concat(all_session_data, ignore_index=True)
+    # Low-cardinality labels: categorical codes make the per-unit filters and
+    # per-exercise groupbys compare ints instead of strings
+    combined_df = combined_df.astype({'exercise': 'category', 'unit': 'category'})
+    combined_df = _downsample_sessions(combined_df, y_col)
+    return combined_df, exercises_without_data
+
+
+def _drop_unused_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of a filtered slice whose categorical columns only keep the labels it contains"""
+    df = df.copy()
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def _render_mode(chart_df: pd.DataFrame) -> str:
+    """Use WebGL for long series (GPU rendering), SVG otherwise for crisper hover"""
+    return 'webgl' if len(chart_df) > WEBGL_POINT_THRESHOLD else 'svg'
+
+
+def _downsample_sessions(combined_df: pd.DataFrame, y_col: str, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Downsample each exercise's series with LTTB when it exceeds max_points
+    
+    Args:
+        combined_df: Session metrics for all selected exercises
+        y_col: Column whose shape should be preserved
+        max_points: Maximum points per exercise series
+    
+    Returns:
+        DataFrame with at most max_points rows per exercise
+    """
+    if combined_df.groupby('exercise', observed=True).size().max() <= max_points:
+        return combined_df
+    
+    kept = []
+    for _, ex_df in combined_df.groupby('exercise', sort=False, observed=True):
+        if len(ex_df) > max_points:
+            ex_df = ex_df.sort_values('date')
+            x = ex_df['date'].to_numpy(dtype='datetime64[ns]').astype('int64')
+            ex_df = ex_df.iloc[lttb_downsample_indices(x, ex_df[y_col].to_numpy(), max_points)]
+        kept.append(ex_df)
+    return pd.concat(kept, ignore_index=True)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _trend_chart_json(chart_df: pd.DataFrame, y_col: str, y_label: str) -> str:
+    """
+    Build the standardized trend chart (volume / 1RM) and return it as Plotly JSON
+    
+    Caching the serialized figure lets reruns with the same data skip both
+    figure construction and Plotly's datetime serialization.
+    
+    Args:
+        chart_df: Session metrics with 'date', 'exercise' and the y column
+        y_col: Column to plot
+        y_label: Axis label for the y column
+    
+    Returns:
+        Figure JSON string
+    """
+    import plotly.express as px
+    
+    fig = px.line(
+        chart_df,
+        render_mode=_render_mode(chart_df),
+        x='date',
+        y=y_col,
+        color='exercise',
+        markers=True,
+        title=f"{y_label} 趨勢比較",
+        labels={'date': '日期', y_col: y_label, 'exercise': '動作'}
+    )
+    fig.update_layout(height=500, hovermode='x unified')
+    return fig.to_json()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _unit_chart_json(chart_df: pd.DataFrame, unit: str, unit_display: str, y_col: str, y_label: str,
+                     show_combined: bool) -> str:
+    """
+    Build one weight unit's trend chart (max weight, optionally with 1RM) as Plotly JSON
+    
+    Args:
+        chart_df: Session metrics of the weight-based exercises logged in this unit
+        unit: Weight unit of the chart
+        unit_display: Display label of the unit
+        y_col: Column to plot
+        y_label: Axis label for the y column
+        show_combined: Also draw the estimated 1RM as dashed lines
+    
+    Returns:
+        Figure JSON string
+    """
+    import plotly.express as px
+    
+    if show_combined:
+        # Create chart with both max_weight and max_1rm (weight-based exercises only)
+        fig = px.line(
+            chart_df,
+            render_mode=_render_mode(chart_df),
+            x='date',
+            y='max_weight',
+            color='exercise',
+            markers=True,
+            title=f"最大重量 & 預估 1RM 趨勢比較 - {unit_display}",
+            labels={'date': '日期', 'max_weight': f'最大重量 ({unit})', 'exercise': '動作'},
+            custom_data=['max_reps', 'unit']
+        )
+        # Update hovertemplate to show weight and reps
+        for i, trace in enumerate(fig.data):
+            if trace.name and '(1RM)' not in trace.name:
+                exercise_name = trace.name
+                trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
         
-        if is_assisted and bodyweight:
-            # For assisted exercises, calculate effective weight
-            session_units = [s['unit'] for s in session_sets]
-            primary_unit = max(set(session_units), key=session_units.count) if session_units else 'kg'
-            
-            from utils.calculations import convert_unit
-            bodyweight_in_unit = convert_unit(bodyweight, 'lb', primary_unit)
-            
-            # Find the set with max effective weight
-            max_set = max(session_sets, key=lambda s: bodyweight_in_unit - s['weight'])
-            max_weight = bodyweight_in_unit - max_set['weight']
-            max_reps = max_set['reps']  # Use reps from the same set as max weight
-            total_volume = sum(calculate_total_volume(bodyweight_in_unit - s['weight'], s['reps'], primary_unit) for s in session_sets)
-            # Calculate 1RM using the weight and reps from the same set that had max weight
-            max_1rm = calculate_1rm(max_weight, max_reps)
+        # Add 1RM as secondary line with different style for each exercise
+        for exercise_name, ex_df in chart_df.groupby('exercise', sort=False, observed=True):
+            add_line = fig.add_scattergl if len(ex_df) > WEBGL_POINT_THRESHOLD else fig.add_scatter
+            add_line(
+                x=ex_df['date'],
+                y=ex_df['max_1rm'],
+                mode='lines+markers',
+                name=f"{exercise_name} (1RM)",
+                line=dict(dash='dash', width=2),
+                marker=dict(symbol='diamond', size=8),
+                hovertemplate=f'<b>{exercise_name} (1RM)</b><br>日期: %{{x}}<br>預估 1RM: %{{y:.1f}} {unit}<extra></extra>'
+            )
+        
+        fig.update_layout(
+            height=400,
+            hovermode='x unified',
+            yaxis_title=f'重量 / 預估 1RM ({unit})',
+            legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
+        )
+    else:
+        # Single metric view (weight-based exercises only)
+        if y_col == 'display_value':
+            # For weight-based exercises, display_value is max_weight
+            fig = px.line(
+                chart_df,
+                render_mode=_render_mode(chart_df),
+                x='date',
+                y='max_weight',
+                color='exercise',
+                markers=True,
+                title=f"{y_label} 趨勢比較 - {unit_display}",
+                labels={'date': '日期', 'max_weight': f'最大重量 ({unit})', 'exercise': '動作'},
+                custom_data=['max_reps', 'unit']
+            )
+            # Update hovertemplate to show weight and reps
+            for i, trace in enumerate(fig.data):
+                if trace.name:
+                    exercise_name = trace.name
+                    trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
         else:
-            # Find the set with max weight
-            max_set = max(session_sets, key=lambda s: s['weight'])
-            max_weight = max_set['weight']
-            
-            # For bodyweight exercises (all weights are 0), find max reps across all sets
-            # Otherwise, use reps from the set with max weight
-            if max_weight == 0 and all(s['weight'] == 0 for s in session_sets):
-                # Bodyweight exercise: find max reps across all sets
-                max_reps = max(s['reps'] for s in session_sets)
-            else:
-                # Weighted exercise: use reps from the set with max weight
-                max_reps = max_set['reps']
-            
-            total_volume = sum(calculate_total_volume(s['weight'], s['reps'], s['unit']) for s in session_sets)
-            # Calculate 1RM using the weight and reps from the same set that had max weight
-            max_1rm = calculate_1rm(max_weight, max_reps)
-            
-            session_units = [s['unit'] for s in session_sets]
-            primary_unit = max(set(session_units), key=session_units.count) if session_units else 'kg'
+            fig = px.line(
+                chart_df,
+                render_mode=_render_mode(chart_df),
+                x='date',
+                y=y_col,
+                color='exercise',
+                markers=True,
+                title=f"{y_label} 趨勢比較 - {unit_display}",
+                labels={'date': '日期', y_col: f'{y_label} ({unit})', 'exercise': '動作'}
+            )
+        fig.update_layout(height=400, hovermode='x unified')
+    return fig.to_json()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _bodyweight_chart_json(chart_df: pd.DataFrame, y_col: str, y_label: str, show_combined: bool) -> str:
+    """
+    Build the bodyweight (reps) trend chart as Plotly JSON
+    
+    Args:
+        chart_df: Session metrics of the bodyweight exercises
+        y_col: Column to plot
+        y_label: Axis label for the y column
+        show_combined: Combined view selected (bodyweight charts have no 1RM line)
+    
+    Returns:
+        Figure JSON string
+    """
+    import plotly.express as px
+    
+    if show_combined:
+        # Create chart with display_value (reps) - no 1RM for bodyweight
+        fig = px.line(
+            chart_df,
+            render_mode=_render_mode(chart_df),
+            x='date',
+            y='display_value',
+            color='exercise',
+            markers=True,
+            title=f"最大次數趨勢比較",
+            labels={'date': '日期', 'display_value': '最大次數', 'exercise': '動作'},
+            custom_data=['max_reps']
+        )
+        # Update hovertemplate for bodyweight exercises
+        for i, trace in enumerate(fig.data):
+            if trace.name:
+                exercise_name = trace.name
+                trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大次數: %{{y:.0f}} 次<extra></extra>'
         
-        session_data.append({
-            'date': pd.Timestamp(current_date),
-            'max_weight': max_weight,
-            'max_reps': max_reps,
-            'total_volume': total_volume,
-            'max_1rm': max_1rm,
-            'sets': len(session_sets),
-            'unit': primary_unit
-        })
+        fig.update_layout(
+            height=400,
+            hovermode='x unified',
+            yaxis_title='最大次數 (次)',
+            legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
+        )
+    else:
+        # Single metric view for bodyweight
+        if y_col == 'display_value':
+            fig = px.line(
+                chart_df,
+                render_mode=_render_mode(chart_df),
+                x='date',
+                y=y_col,
+                color='exercise',
+                markers=True,
+                title=f"最大次數趨勢比較",
+                labels={'date': '日期', y_col: '最大次數', 'exercise': '動作'},
+                custom_data=['max_reps']
+            )
+            # Update hovertemplate
+            for i, trace in enumerate(fig.data):
+                if trace.name:
+                    exercise_name = trace.name
+                    trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大次數: %{{y:.0f}} 次<extra></extra>'
+        else:
+            fig = px.line(
+                chart_df,
+                render_mode=_render_mode(chart_df),
+                x='date',
+                y=y_col,
+                color='exercise',
+                markers=True,
+                title=f"{y_label} 趨勢比較",
+                labels={'date': '日期', y_col: y_label, 'exercise': '動作'}
+            )
+            fig.update_layout(height=400, hovermode='x unified')
+    return fig.to_json()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _muscle_pie_json(muscle_stats: pd.DataFrame, time_range: int) -> str:
+    """Build the muscle group distribution pie chart and return it as Plotly JSON"""
+    import plotly.express as px
+    
+    fig_pie = px.pie(
+        muscle_stats,
+        values='total_sets',
+        names='muscle_group',
+        title=f"過去 {time_range} 天訓練分布",
+        hole=0.4
+    )
+    fig_pie.update_layout(height=400)
+    return fig_pie.to_json()
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _figure_from_json(fig_json: str):
+    """
+    Rehydrate a Figure from its JSON payload, shared across reruns and sessions
     
-    session_df = pd.DataFrame(session_data)
-    if not session_df.empty:
-        session_df = session_df.sort_values('date')
-    return session_df
+    The JSON already encodes the user's data and filters, so it doubles as the
+    cache key. The returned Figure is shared: render it, never mutate it.
+    """
+    import plotly.io as pio
+    
+    return pio.from_json(fig_json)
+
+
+def _render_chart_json(fig_json: str):
+    """Render a cached Plotly JSON payload"""
+    st.plotly_chart(_figure_from_json(fig_json), use_container_width=True)
+
+
+def _set_exercise_checkboxes(exercise_names: list, value: bool):
+    """on_click callback: select or clear every exercise checkbox of a muscle group"""
+    for ex_name in exercise_names:
+        st.session_state[f"ex_checkbox_{ex_name}"] = value
 
 
+def _format_pr_dates(dates) -> str:
+    """
+    Format PR dates as "first" / "first, second" / "first (+N)"
+    
+    Args:
+        dates: Date strings or date objects (most recent first)
+    
+    Returns:
+        Display string (empty if no dates)
+    """
+    if not dates:
+        return ""
+    # Only the first two dates are ever shown, so only those get formatted
+    shown = list(dates[:2])
+    try:
+        formatted_dates = pd.to_datetime(pd.Series(shown, dtype=str)).dt.strftime('%Y-%m-%d').tolist()
+    except (ValueError, TypeError):
+        formatted_dates = [str(d) for d in shown]
+    
+    if len(dates) <= 2:
+        return ", ".join(formatted_dates)
+    return f"{formatted_dates[0]} (+{len(dates)-1})"
+
+
+PR_CARD_STYLE = """
+<style>
+.pr-card { padding: 12px; border-radius: 8px; margin-bottom: 10px; border: 1px solid #ccc; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+.pr-card h4 { margin: 0 0 8px 0; padding: 0; color: #333; font-size: 1.1em; font-weight: 600; }
+.pr-body { padding: 0 5px; margin-bottom: 16px; }
+.pr-row { display: flex; justify-content: space-between; margin-bottom: 8px; }
+.pr-label { color: #666; font-size: 0.9em; }
+.pr-value { font-weight: bold; color: #333; }
+.pr-dates { color: #888; font-size: 0.75em; margin-left: 8px; }
+</style>
+"""
+
+
+def _pr_card_html(exercise_name: str, color: str, weight_display: str, weight_note: str, weight_dates: str,
+                  best_reps: int, reps_dates: str, best_volume: float, volume_dates: str) -> str:
+    """
+    Build one PR Wall card (colored header + best weight/reps/volume rows) as HTML
+    
+    Returns:
+        HTML string using the PR_CARD_STYLE classes
+    """
+    def row(label: str, value: str, dates: str) -> str:
+        dates_html = f'<span class="pr-dates">({dates})</span>' if dates else ''
+        return (f'<div class="pr-row"><span class="pr-label">{label}:</span>'
+                f'<div style="text-align: right;"><span class="pr-value">{value}</span>{dates_html}</div></div>')
+    
+    return (
+        f'<div class="pr-card" style="background-color: {color};"><h4>{exercise_name}</h4></div>'
+        f'<div class="pr-body">'
+        f'{row(f"最佳重量{weight_note}", weight_display, weight_dates)}'
+        f'{row("最佳次數", str(best_reps), reps_dates)}'
+        f'{row("最佳容量", f"{best_volume:.1f}", volume_dates)}'
+        f'</div>'
+    )
+
+
+@st.fragment
 def render_progress_dashboard_page(user_id: str):
     """Render the Progress Dashboard page"""
-    st.header("📈 進度儀表板")
-    
-    # Get all exercises from exercises table
-    all_exercises = get_all_exercises(user_id)
+    # Plotly is only needed here; importing it lazily keeps it off the login/log paths
+    import plotly.express as px
     
-    # Get all exercise names from workout_logs (including orphaned ones)
-    workout_exercise_names = get_all_exercise_names_from_workouts(user_id)
-    
-    # Create a set of exercise names from exercises table for quick lookup
-    exercise_names_from_table = {ex['name'] for ex in all_exercises}
+    st.header("📈 進度儀表板")
     
-    # Identify orphaned exercises (exist in workout_logs but not in exercises table)
-    orphaned_exercises = [name for name in workout_exercise_names if name not in exercise_names_from_table]
+    # Library + orphaned exercises grouped by muscle group and sorted by count (cached)
+    exercise_index = get_exercise_index(user_id)
+    exercises_by_group = exercise_index['by_group']
+    # Orphaned exercises exist in workout_logs but not in the exercises table
+    orphaned_exercises = exercise_index['orphaned']
     
     # If no exercises at all, show message
-    if not all_exercises and not workout_exercise_names:
+    if not exercises_by_group:
         st.info("還沒有動作記錄，請先在「記錄訓練」頁面開始記錄。")
         return
     
-    workout_counts = get_exercise_workout_counts(user_id)
-    
-    # Group exercises by muscle group
-    exercises_by_group = {}
-    for ex in all_exercises:
-        mg = ex['muscle_group']
-        if mg not in exercises_by_group:
-            exercises_by_group[mg] = []
-        count = workout_counts.get(ex['name'], 0)
-        exercises_by_group[mg].append({
-            'name': ex['name'],
-            'count': count,
-            'is_orphaned': False
-        })
-    
-    # Add orphaned exercises to a separate group or mark them
-    if orphaned_exercises:
-        if '⚠️ 孤立動作 (Orphaned Exercises)' not in exercises_by_group:
-            exercises_by_group['⚠️ 孤立動作 (Orphaned Exercises)'] = []
-        for orphaned_name in orphaned_exercises:
-            # Try to infer muscle group from workout data or use "其他 (Other)"
-            count = workout_counts.get(orphaned_name, 0)
-            exercises_by_group['⚠️ 孤立動作 (Orphaned Exercises)'].append({
-                'name': orphaned_name,
-                'count': count,
-                'is_orphaned': True
-            })
-    
-    # Sort exercises within each group by workout count (descending)
-    for mg in exercises_by_group:
-        exercises_by_group[mg].sort(key=lambda x: x['count'], reverse=True)
-    
     # Display exercise selection by muscle groups
     st.subheader("選擇要分析的動作（可多選）")
     
     selected_exercises = []
+    # One snapshot of session_state for the per-exercise checkbox reads below
+    session_snapshot = st.session_state.to_dict()
     
     # Display exercises grouped by muscle group
     for muscle_group in sorted(exercises_by_group.keys()):
@@ -1407,22 +1703,19 @@ def render_progress_dashboard_page(user_id: str):
             
             # Check if all exercises in this group are selected
             all_selected = all(
-                st.session_state.get(f"ex_checkbox_{ex_name}", False)
+                session_snapshot.get(f"ex_checkbox_{ex_name}", False)
                 for ex_name in group_exercise_names
             )
             
-            # Toggle button for the group
+            # Toggle button for the group (checkbox states are set before the rerun)
             toggle_key = f"group_toggle_{muscle_group}"
-            if st.button(
+            st.button(
                 "取消全選" if all_selected else "全選",
                 key=toggle_key,
-                use_container_width=True
-            ):
-                # Toggle all exercises in this group
-                new_state = not all_selected
-                for ex_name in group_exercise_names:
-                    st.session_state[f"ex_checkbox_{ex_name}"] = new_state
-                st.rerun()
+                use_container_width=True,
+                on_click=_set_exercise_checkboxes,
+                args=(group_exercise_names, not all_selected)
+            )
         
         # Create columns for buttons (3 columns)
         cols = st.columns(3)
@@ -1440,8 +1733,7 @@ def render_progress_dashboard_page(user_id: str):
                 display_name = f"⚠️ {ex_name}" if is_orphaned else ex_name
                 is_checked = st.checkbox(
                     f"{display_name} ({ex_count})",
-                    key=checkbox_key,
-                    value=st.session_state.get(checkbox_key, False)
+                    key=checkbox_key
                 )
                 
                 if is_checked:
@@ -1464,12 +1756,8 @@ def render_progress_dashboard_page(user_id: str):
             
             st.divider()
             
-            # Get workout sessions for selected exercises
-            all_sessions_data = {}
-            for ex_name in selected_exercises:
-                sessions = get_workout_sessions_by_exercise(user_id, ex_name)
-                if sessions:
-                    all_sessions_data[ex_name] = sessions
+            # Get workout sessions for all selected exercises in one query
+            all_sessions_data = get_workout_sessions_by_exercises(user_id, selected_exercises)
             
             if all_sessions_data:
                 # Display workout sessions for each selected exercise
@@ -1512,7 +1800,7 @@ def render_progress_dashboard_page(user_id: str):
                 # Include all exercises from table and all orphaned exercises
                 # Note: We allow selecting an orphaned exercise as target even if it's in selected_exercises
                 # because the user might want to merge other exercises TO an orphaned exercise
-                all_exercise_names = list(exercise_names_from_table) + orphaned_exercises
+                all_exercise_names = exercise_index['library_names'] + orphaned_exercises
                 # Remove duplicates while preserving order
                 seen = set()
                 unique_exercise_names = []
@@ -1575,7 +1863,6 @@ def render_progress_dashboard_page(user_id: str):
                                 errors = []
                                 
                                 # Check if target exercise exists in exercises table, if not create it
-                                from utils.helpers import infer_exercise_type, get_muscle_groups
                                 target_exists = get_exercise_details(user_id, target_exercise)
                                 
                                 if not target_exists:
@@ -1681,46 +1968,17 @@ def render_progress_dashboard_page(user_id: str):
         y_label = '預估 1RM (最大值)'
         show_combined = False
     
-    # Get data for all selected exercises
-    all_session_data = []
-    exercises_with_data = []
-    exercises_without_data = []
-    from utils.helpers import is_pure_bodyweight_exercise
-    
-    for exercise_name in selected_exercises:
-        history_df = get_exercise_history(user_id, exercise_name)
-        
-        if history_df.empty:
-            exercises_without_data.append(exercise_name)
-            continue
-        
-        history_df['date'] = pd.to_datetime(history_df['date'])
-        session_df = calculate_session_metrics(history_df, exercise_name, st.session_state.get('bodyweight', 135.0))
-        
-        if not session_df.empty:
-            session_df['exercise'] = exercise_name
-            # For pure bodyweight exercises, use max_reps instead of max_weight for display
-            is_bodyweight_ex = is_pure_bodyweight_exercise(exercise_name)
-            # Additional check: if unit is 'bodyweight' or all weights are effectively 0
-            if not is_bodyweight_ex:
-                # Check if all weights are 0 or unit is 'bodyweight'
-                if 'unit' in session_df.columns:
-                    unique_units = session_df['unit'].unique()
-                    if 'bodyweight' in unique_units or (len(unique_units) == 1 and session_df['max_weight'].max() == 0):
-                        is_bodyweight_ex = True
-            
-            if is_bodyweight_ex:
-                session_df['display_value'] = session_df['max_reps']
-                session_df['is_bodyweight'] = True
-            else:
-                session_df['display_value'] = session_df['max_weight']
-                session_df['is_bodyweight'] = False
-            all_session_data.append(session_df)
-            exercises_with_data.append(exercise_name)
-        else:
-            exercises_without_data.append(exercise_name)
-    
-    if not all_session_data:
+    # Reuse the last computed chart data while its inputs are unchanged, so reruns
+    # triggered by unrelated widgets (heatmap range, rename checkboxes) skip refetching
+    # every exercise history
+    bodyweight = st.session_state.get('bodyweight', 135.0)
+    chart_filter = (user_id, tuple(selected_exercises), y_col, bodyweight, get_workout_data_version())
+    if st.session_state.get('_chart_filter') != chart_filter:
+        st.session_state._chart_data = _build_chart_data(user_id, selected_exercises, y_col, bodyweight)
+        st.session_state._chart_filter = chart_filter
+    combined_df, exercises_without_data = st.session_state._chart_data
+    
+    if combined_df is None:
         st.info("選取的動作沒有訓練記錄。")
         return
     
@@ -1728,33 +1986,21 @@ def render_progress_dashboard_page(user_id: str):
     if exercises_without_data:
         st.warning(f"以下動作沒有訓練記錄，已從圖表中排除: {', '.join(exercises_without_data)}")
     
-    # Combine all data
-    combined_df = pd.concat(all_session_data, ignore_index=True)
-    
     # Group by unit for separate charts
     # For volume and 1RM, we can show together since they're standardized
     if metric in ["總容量 (Total Volume)", "預估 1RM (Estimated 1RM)"]:
         # These metrics are standardized, show all together
         st.subheader("📊 趨勢圖表")
-        fig = px.line(
-            combined_df,
-            x='date',
-            y=y_col,
-            color='exercise',
-            markers=True,
-            title=f"{y_label} 趨勢比較",
-            labels={'date': '日期', y_col: y_label, 'exercise': '動作'}
-        )
-        fig.update_layout(height=500, hovermode='x unified')
-        st.plotly_chart(fig, use_container_width=True)
+        chart_df = combined_df[['date', y_col, 'exercise']]
+        _render_chart_json(_trend_chart_json(chart_df, y_col, y_label))
     else:
         # For max weight, group by unit and show separate charts
         # If show_combined is True, also show 1RM on the same chart
         st.subheader("📊 趨勢圖表（依單位分組）")
         
         # Separate bodyweight exercises from weight-based exercises
-        bodyweight_df = combined_df[combined_df['is_bodyweight'] == True].copy() if 'is_bodyweight' in combined_df.columns else pd.DataFrame()
-        weight_df = combined_df[combined_df['is_bodyweight'] != True].copy() if 'is_bodyweight' in combined_df.columns else combined_df.copy()
+        bodyweight_df = _drop_unused_categories(combined_df[combined_df['is_bodyweight'] == True]) if 'is_bodyweight' in combined_df.columns else pd.DataFrame()
+        weight_df = _drop_unused_categories(combined_df[combined_df['is_bodyweight'] != True]) if 'is_bodyweight' in combined_df.columns else combined_df.copy()
         
         # First, show bodyweight exercises chart (unit = reps) if unit info is missing
         if 'unit' not in combined_df.columns and not bodyweight_df.empty:
@@ -1762,6 +2008,7 @@ def render_progress_dashboard_page(user_id: str):
             if show_combined:
                 fig = px.line(
                     bodyweight_df,
+                    render_mode=_render_mode(bodyweight_df),
                     x='date',
                     y='display_value',
                     color='exercise',
@@ -1784,6 +2031,7 @@ def render_progress_dashboard_page(user_id: str):
                 if y_col == 'display_value':
                     fig = px.line(
                         bodyweight_df,
+                        render_mode=_render_mode(bodyweight_df),
                         x='date',
                         y=y_col,
                         color='exercise',
@@ -1799,6 +2047,7 @@ def render_progress_dashboard_page(user_id: str):
                 else:
                     fig = px.line(
                         bodyweight_df,
+                        render_mode=_render_mode(bodyweight_df),
                         x='date',
                         y=y_col,
                         color='exercise',
@@ -1816,10 +2065,14 @@ def render_progress_dashboard_page(user_id: str):
         elif 'unit' not in weight_df.columns:
             # Fallback: show all weight-based together if unit info is missing
             st.subheader("📊 趨勢圖表")
+            # Per-exercise rows and first unit, split with one groupby
+            exercise_groups = dict(tuple(weight_df.groupby('exercise', sort=False, observed=True)))
+            first_units = weight_df.groupby('exercise', observed=True)['unit'].first().to_dict() if 'unit' in weight_df.columns else {}
             if show_combined:
                 # Create chart with both max_weight and max_1rm
                 fig = px.line(
                     weight_df,
+                    render_mode=_render_mode(weight_df),
                     x='date',
                     y='max_weight',
                     color='exercise',
@@ -1832,13 +2085,13 @@ def render_progress_dashboard_page(user_id: str):
                 for i, trace in enumerate(fig.data):
                     if trace.name and '(1RM)' not in trace.name:
                         exercise_name = trace.name
-                        unit = weight_df[weight_df['exercise'] == exercise_name].iloc[0]['unit'] if 'unit' in weight_df.columns and not weight_df[weight_df['exercise'] == exercise_name].empty else ''
+                        unit = first_units.get(exercise_name, '')
                         trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
                 
                 # Add 1RM as secondary line
-                for exercise_name in weight_df['exercise'].unique():
-                    ex_df = weight_df[weight_df['exercise'] == exercise_name]
-                    fig.add_scatter(
+                for exercise_name, ex_df in exercise_groups.items():
+                    add_line = fig.add_scattergl if len(ex_df) > WEBGL_POINT_THRESHOLD else fig.add_scatter
+                    add_line(
                         x=ex_df['date'],
                         y=ex_df['max_1rm'],
                         mode='lines+markers',
@@ -1859,6 +2112,7 @@ def render_progress_dashboard_page(user_id: str):
                 if y_col == 'display_value':
                     fig = px.line(
                         weight_df,
+                        render_mode=_render_mode(weight_df),
                         x='date',
                         y='max_weight',
                         color='exercise',
@@ -1871,11 +2125,12 @@ def render_progress_dashboard_page(user_id: str):
                     for i, trace in enumerate(fig.data):
                         if trace.name:
                             exercise_name = trace.name
-                            unit = weight_df[weight_df['exercise'] == exercise_name].iloc[0]['unit'] if 'unit' in weight_df.columns and not weight_df[weight_df['exercise'] == exercise_name].empty else ''
+                            unit = first_units.get(exercise_name, '')
                             trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
                 else:
                     fig = px.line(
                         weight_df,
+                        render_mode=_render_mode(weight_df),
                         x='date',
                         y=y_col,
                         color='exercise',
@@ -1887,8 +2142,8 @@ def render_progress_dashboard_page(user_id: str):
             st.plotly_chart(fig, use_container_width=True)
         else:
             # Separate bodyweight exercises from weight-based exercises
-            bodyweight_df = combined_df[combined_df['is_bodyweight'] == True].copy() if 'is_bodyweight' in combined_df.columns else pd.DataFrame()
-            weight_df = combined_df[combined_df['is_bodyweight'] != True].copy() if 'is_bodyweight' in combined_df.columns else combined_df.copy()
+            bodyweight_df = _drop_unused_categories(combined_df[combined_df['is_bodyweight'] == True]) if 'is_bodyweight' in combined_df.columns else pd.DataFrame()
+            weight_df = _drop_unused_categories(combined_df[combined_df['is_bodyweight'] != True]) if 'is_bodyweight' in combined_df.columns else combined_df.copy()
             
             # First, show bodyweight exercises chart (unit = reps)
             if not bodyweight_df.empty:
@@ -1899,70 +2154,19 @@ def render_progress_dashboard_page(user_id: str):
                 if len(bodyweight_exercises) > 0:
                     st.caption(f"顯示 {len(bodyweight_exercises)} 個動作: {', '.join(bodyweight_exercises)}")
                 
-                if show_combined:
-                    # Create chart with display_value (reps) - no 1RM for bodyweight
-                    fig = px.line(
-                        bodyweight_df,
-                        x='date',
-                        y='display_value',
-                        color='exercise',
-                        markers=True,
-                        title=f"最大次數趨勢比較",
-                        labels={'date': '日期', 'display_value': '最大次數', 'exercise': '動作'},
-                        custom_data=['max_reps']
-                    )
-                    # Update hovertemplate for bodyweight exercises
-                    for i, trace in enumerate(fig.data):
-                        if trace.name:
-                            exercise_name = trace.name
-                            trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大次數: %{{y:.0f}} 次<extra></extra>'
-                    
-                    fig.update_layout(
-                        height=400,
-                        hovermode='x unified',
-                        yaxis_title='最大次數 (次)',
-                        legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    # Single metric view for bodyweight
-                    if y_col == 'display_value':
-                        fig = px.line(
-                            bodyweight_df,
-                            x='date',
-                            y=y_col,
-                            color='exercise',
-                            markers=True,
-                            title=f"最大次數趨勢比較",
-                            labels={'date': '日期', y_col: '最大次數', 'exercise': '動作'},
-                            custom_data=['max_reps']
-                        )
-                        # Update hovertemplate
-                        for i, trace in enumerate(fig.data):
-                            if trace.name:
-                                exercise_name = trace.name
-                                trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大次數: %{{y:.0f}} 次<extra></extra>'
-                    else:
-                        fig = px.line(
-                            bodyweight_df,
-                            x='date',
-                            y=y_col,
-                            color='exercise',
-                            markers=True,
-                            title=f"{y_label} 趨勢比較",
-                            labels={'date': '日期', y_col: y_label, 'exercise': '動作'}
-                        )
-                        fig.update_layout(height=400, hovermode='x unified')
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                chart_cols = ['date', 'exercise', 'display_value', 'max_reps']
+                if y_col not in chart_cols:
+                    chart_cols.append(y_col)
+                _render_chart_json(_bodyweight_chart_json(bodyweight_df[chart_cols], y_col, y_label, show_combined))
             
             # Then, show weight-based exercises grouped by unit
             if not weight_df.empty:
-                unique_units = weight_df['unit'].unique()
+                # Split by unit with one groupby instead of one filter scan per unit
+                unit_frames = dict(tuple(weight_df.groupby('unit', sort=False, observed=True)))
                 
                 # Create a chart for each weight unit
-                for unit in sorted(unique_units):
-                    unit_df = weight_df[weight_df['unit'] == unit]
+                for unit in sorted(unit_frames):
+                    unit_df = _drop_unused_categories(unit_frames[unit])
                     
                     if unit_df.empty:
                         continue
@@ -1983,75 +2187,10 @@ def render_progress_dashboard_page(user_id: str):
                     if len(exercises_in_unit) > 0:
                         st.caption(f"顯示 {len(exercises_in_unit)} 個動作: {', '.join(exercises_in_unit)}")
                     
-                    if show_combined:
-                        # Create chart with both max_weight and max_1rm (weight-based exercises only)
-                        fig = px.line(
-                            unit_df,
-                            x='date',
-                            y='max_weight',
-                            color='exercise',
-                            markers=True,
-                            title=f"最大重量 & 預估 1RM 趨勢比較 - {unit_display}",
-                            labels={'date': '日期', 'max_weight': f'最大重量 ({unit})', 'exercise': '動作'},
-                            custom_data=['max_reps', 'unit']
-                        )
-                        # Update hovertemplate to show weight and reps
-                        for i, trace in enumerate(fig.data):
-                            if trace.name and '(1RM)' not in trace.name:
-                                exercise_name = trace.name
-                                trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
-                        
-                        # Add 1RM as secondary line with different style for each exercise
-                        for exercise_name in unit_df['exercise'].unique():
-                            ex_df = unit_df[unit_df['exercise'] == exercise_name]
-                            fig.add_scatter(
-                                x=ex_df['date'],
-                                y=ex_df['max_1rm'],
-                                mode='lines+markers',
-                                name=f"{exercise_name} (1RM)",
-                                line=dict(dash='dash', width=2),
-                                marker=dict(symbol='diamond', size=8),
-                                hovertemplate=f'<b>{exercise_name} (1RM)</b><br>日期: %{{x}}<br>預估 1RM: %{{y:.1f}} {unit}<extra></extra>'
-                            )
-                        
-                        fig.update_layout(
-                            height=400,
-                            hovermode='x unified',
-                            yaxis_title=f'重量 / 預估 1RM ({unit})',
-                            legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        # Single metric view (weight-based exercises only)
-                        if y_col == 'display_value':
-                            # For weight-based exercises, display_value is max_weight
-                            fig = px.line(
-                                unit_df,
-                                x='date',
-                                y='max_weight',
-                                color='exercise',
-                                markers=True,
-                                title=f"{y_label} 趨勢比較 - {unit_display}",
-                                labels={'date': '日期', 'max_weight': f'最大重量 ({unit})', 'exercise': '動作'},
-                                custom_data=['max_reps', 'unit']
-                            )
-                            # Update hovertemplate to show weight and reps
-                            for i, trace in enumerate(fig.data):
-                                if trace.name:
-                                    exercise_name = trace.name
-                                    trace.hovertemplate = f'<b>{exercise_name}</b><br>日期: %{{x}}<br>最大重量: %{{y:.1f}} {unit} × %{{customdata[0]}}次<extra></extra>'
-                        else:
-                            fig = px.line(
-                                unit_df,
-                                x='date',
-                                y=y_col,
-                                color='exercise',
-                                markers=True,
-                                title=f"{y_label} 趨勢比較 - {unit_display}",
-                                labels={'date': '日期', y_col: f'{y_label} ({unit})', 'exercise': '動作'}
-                            )
-                        fig.update_layout(height=400, hovermode='x unified')
-                        st.plotly_chart(fig, use_container_width=True)
+                    chart_cols = ['date', 'exercise', 'max_weight', 'max_reps', 'max_1rm', 'unit']
+                    if y_col not in chart_cols:
+                        chart_cols.append(y_col)
+                    _render_chart_json(_unit_chart_json(unit_df[chart_cols], unit, unit_display, y_col, y_label, show_combined))
     
     # PR Wall for selected exercises
     st.subheader("🏆 個人紀錄 (PR Wall)")
@@ -2074,121 +2213,59 @@ def render_progress_dashboard_page(user_id: str):
         "#F1F8E9",  # Light lime
     ]
     
+    # Bodyweight (lb) converted once per unit for the assisted-exercise cards
+    bodyweight = st.session_state.get('bodyweight', 135.0)
+    bodyweight_by_unit = {}
+    card_html = [[] for _ in range(num_cols)]
+    
     for idx, exercise_name in enumerate(selected_exercises):
         if exercise_name in pr_records:
             pr = pr_records[exercise_name]
             color = colors[idx % len(colors)]
             col_idx = idx % num_cols
             
-            with pr_cols[col_idx]:
-                # Create a styled container with background color
-                st.markdown(
-                    f"""
-                    <div style="
-                        background-color: {color};
-                        padding: 12px;
-                        border-radius: 8px;
-                        margin-bottom: 10px;
-                        border: 1px solid #ccc;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    ">
-                        <h4 style="
-                            margin: 0 0 8px 0; 
-                            padding: 0;
-                            color: #333;
-                            font-size: 1.1em;
-                            font-weight: 600;
-                        ">
-                            {exercise_name}
-                        </h4>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
-                # Display metrics in a compact format with labels and dates on same line
-                # Format dates
-                def format_dates(dates):
-                    if not dates:
-                        return ""
-                    # Convert to datetime and format
-                    try:
-                        formatted_dates = []
-                        for date_str in dates:
-                            if isinstance(date_str, str):
-                                dt = pd.to_datetime(date_str)
-                                formatted_dates.append(dt.strftime('%Y-%m-%d'))
-                            else:
-                                formatted_dates.append(str(date_str))
-                    except:
-                        formatted_dates = [str(d) for d in dates]
-                    
-                    if len(formatted_dates) == 1:
-                        return formatted_dates[0]
-                    elif len(formatted_dates) <= 2:
-                        return ", ".join(formatted_dates)
-                    else:
-                        return f"{formatted_dates[0]} (+{len(formatted_dates)-1})"
-                
-                best_weight_dates_str = format_dates(pr.get('best_weight_dates', []))
-                best_reps_dates_str = format_dates(pr.get('best_reps_dates', []))
-                best_volume_dates_str = format_dates(pr.get('best_volume_dates', []))
-                
-                # Get unit for best weight
-                best_weight_unit = pr.get('best_weight_unit', 'kg')
-                unit_display_map = {
-                    'kg': 'kg',
-                    'lb': 'lb',
-                    'notch': 'notch',
-                    'notch/plate': 'notch'
-                }
-                unit_display = unit_display_map.get(best_weight_unit, best_weight_unit)
-                
-                # Handle assisted exercises
-                is_assisted = pr.get('is_assisted', False)
-                bodyweight = st.session_state.get('bodyweight', 135.0)
-                
-                if is_assisted:
-                    # Calculate effective weight for display
-                    from utils.calculations import convert_unit
-                    bodyweight_in_unit = convert_unit(bodyweight, 'lb', best_weight_unit)
-                    effective_weight = bodyweight_in_unit - pr['best_weight']
-                    assist_weight = pr['best_weight']
-                    
-                    weight_display = f"{effective_weight:.1f} {unit_display} (輔助: {assist_weight:.1f} {unit_display})"
-                    weight_note = " (較低較好)"
-                else:
-                    weight_display = f"{pr['best_weight']:.1f} {unit_display}"
-                    weight_note = ""
-                
-                st.markdown(
-                    f"""
-                    <div style="padding: 0 5px;">
-                        <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
-                            <span style="color: #666; font-size: 0.9em;">最佳重量{weight_note}:</span>
-                            <div style="text-align: right;">
-                                <span style="font-weight: bold; color: #333;">{weight_display}</span>
-                                {f'<span style="color: #888; font-size: 0.75em; margin-left: 8px;">({best_weight_dates_str})</span>' if best_weight_dates_str else ''}
-                            </div>
-                        </div>
-                        <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
-                            <span style="color: #666; font-size: 0.9em;">最佳次數:</span>
-                            <div style="text-align: right;">
-                                <span style="font-weight: bold; color: #333;">{int(pr['best_reps'])}</span>
-                                {f'<span style="color: #888; font-size: 0.75em; margin-left: 8px;">({best_reps_dates_str})</span>' if best_reps_dates_str else ''}
-                            </div>
-                        </div>
-                        <div style="display: flex; justify-content: space-between;">
-                            <span style="color: #666; font-size: 0.9em;">最佳容量:</span>
-                            <div style="text-align: right;">
-                                <span style="font-weight: bold; color: #333;">{pr['best_volume']:.1f}</span>
-                                {f'<span style="color: #888; font-size: 0.75em; margin-left: 8px;">({best_volume_dates_str})</span>' if best_volume_dates_str else ''}
-                            </div>
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+            # Display metrics in a compact format with labels and dates on same line
+            best_weight_dates_str = _format_pr_dates(pr.get('best_weight_dates', []))
+            best_reps_dates_str = _format_pr_dates(pr.get('best_reps_dates', []))
+            best_volume_dates_str = _format_pr_dates(pr.get('best_volume_dates', []))
+            
+            # Get unit for best weight
+            best_weight_unit = pr.get('best_weight_unit', 'kg')
+            unit_display_map = {
+                'kg': 'kg',
+                'lb': 'lb',
+                'notch': 'notch',
+                'notch/plate': 'notch'
+            }
+            unit_display = unit_display_map.get(best_weight_unit, best_weight_unit)
+            
+            # Handle assisted exercises
+            is_assisted = pr.get('is_assisted', False)
+            
+            if is_assisted:
+                # Calculate effective weight for display
+                if best_weight_unit not in bodyweight_by_unit:
+                    bodyweight_by_unit[best_weight_unit] = convert_unit(bodyweight, 'lb', best_weight_unit)
+                bodyweight_in_unit = bodyweight_by_unit[best_weight_unit]
+                effective_weight = bodyweight_in_unit - pr['best_weight']
+                assist_weight = pr['best_weight']
+            
+                weight_display = f"{effective_weight:.1f} {unit_display} (輔助: {assist_weight:.1f} {unit_display})"
+                weight_note = " (較低較好)"
+            else:
+                weight_display = f"{pr['best_weight']:.1f} {unit_display}"
+                weight_note = ""
+            
+            card_html[col_idx].append(_pr_card_html(
+                exercise_name, color, weight_display, weight_note, best_weight_dates_str,
+                int(pr['best_reps']), best_reps_dates_str, pr['best_volume'], best_volume_dates_str
+            ))
+    
+    # One markdown call per column (styles are shared via PR_CARD_STYLE classes)
+    st.markdown(PR_CARD_STYLE, unsafe_allow_html=True)
+    for col, cards in zip(pr_cols, card_html):
+        if cards:
+            col.markdown("".join(cards), unsafe_allow_html=True)
     
     # Muscle group heatmap
     st.subheader("🔥 訓練分布熱力圖")
@@ -2199,18 +2276,20 @@ def render_progress_dashboard_page(user_id: str):
     
     if not muscle_stats.empty:
         # Create pie chart
-        fig_pie = px.pie(
-            muscle_stats,
-            values='total_sets',
-            names='muscle_group',
-            title=f"過去 {time_range} 天訓練分布",
-            hole=0.4
-        )
-        fig_pie.update_layout(height=400)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        _render_chart_json(_muscle_pie_json(muscle_stats, time_range))
         
-        # Display stats table
-        st.dataframe(muscle_stats, use_container_width=True, hide_index=True)
+        # Display stats table (Arrow table + explicit column types skip dtype inference)
+        import pyarrow as pa
+        st.dataframe(
+            pa.Table.from_pandas(muscle_stats, preserve_index=False),
+            column_config={
+                'muscle_group': st.column_config.TextColumn("肌群"),
+                'total_sets': st.column_config.NumberColumn("總組數", format="%d"),
+                'workout_days': st.column_config.NumberColumn("訓練天數", format="%d")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
     else:
         st.info(f"過去 {time_range} 天沒有訓練記錄。")
 
@@ -2219,6 +2298,120 @@ def render_progress_dashboard_page(user_id: str):
 # PAGE 3: LIBRARY MANAGER (動作庫管理)
 # ============================================================================
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def _library_view(user_id: str, library_version: int, data_version: int) -> dict:
+    """Group the exercise library by muscle group and build each group's browser table
+    
+    Args:
+        user_id: User UUID
+        library_version: get_exercise_data_version(); changes whenever the library changes
+        data_version: get_workout_data_version(); changes whenever workout logs change
+    
+    Returns:
+        Dictionary mapping muscle group (first-seen order) to (exercise rows, table DataFrame)
+    """
+    workout_counts = get_exercise_workout_counts(user_id)
+    
+    # The rows are already dicts, sorted by muscle group then name
+    exercises_by_group = {}
+    for ex in get_all_exercises(user_id):
+        exercises_by_group.setdefault(ex['muscle_group'], []).append(ex)
+    
+    return {
+        mg: (mg_exercises, pd.DataFrame({
+            'name': [ex['name'] for ex in mg_exercises],
+            'exercise_type': [ex['exercise_type'] for ex in mg_exercises],
+            'has_steps': [bool(ex.get('execution_steps') and str(ex['execution_steps']).strip())
+                          for ex in mg_exercises],
+            'workout_count': [workout_counts.get(ex['name'], 0) for ex in mg_exercises]
+        }))
+        for mg, mg_exercises in exercises_by_group.items()
+    }
+
+
+@st.fragment
+def _library_exercise_row(user_id: str, ex: dict, workout_count: int):
+    """Render one library exercise with its edit/delete controls and steps form
+    
+    Runs as a fragment so editing steps only reruns this row, not the whole library.
+    """
+    ex_name = ex['name']
+    ex_type = ex['exercise_type']
+    execution_steps = ex.get('execution_steps')
+    has_steps = execution_steps and str(execution_steps).strip()
+    is_orphaned = workout_count == 0
+    
+    # Create columns for exercise info, edit button, and delete button (if orphaned)
+    if is_orphaned:
+        info_col, edit_col, delete_col = st.columns([3, 1, 1])
+    else:
+        info_col, edit_col = st.columns([4, 1])
+    
+    with info_col:
+        step_indicator = "📋" if has_steps else "📝"
+        orphaned_indicator = " ⚠️ (孤立)" if is_orphaned else ""
+        st.markdown(f"**{ex_name}** ({ex_type}) {step_indicator}{orphaned_indicator}")
+    
+    with edit_col:
+        edit_key = f"edit_steps_{ex_name}"
+        st.button("編輯步驟", key=edit_key, use_container_width=True,
+                  on_click=_set_session_value, args=('editing_exercise', ex_name))
+    
+    # Show delete button for orphaned exercises
+    if is_orphaned:
+        with delete_col:
+            delete_key = f"delete_exercise_{ex_name}"
+            st.button("🗑️ 刪除", key=delete_key, use_container_width=True, type="secondary",
+                      on_click=_set_session_value, args=('confirm_delete_exercise', ex_name))
+    
+    # Show confirmation dialog for deletion
+    if st.session_state.get(f"confirm_delete_exercise") == ex_name:
+        st.warning(f"⚠️ 確定要刪除動作「{ex_name}」嗎？此動作沒有訓練記錄。")
+        col_confirm, col_cancel = st.columns(2)
+        with col_confirm:
+            if st.button("✅ 確認刪除", key=f"confirm_delete_{ex_name}", type="primary"):
+                if delete_exercise(user_id, ex_name):
+                    st.success(f"✅ 已刪除動作: {ex_name}")
+                    st.session_state[f"confirm_delete_exercise"] = None
+                    st.rerun()
+                else:
+                    st.error("刪除失敗")
+        with col_cancel:
+            st.button("❌ 取消", key=f"cancel_delete_{ex_name}",
+                      on_click=_set_session_value, args=('confirm_delete_exercise', None))
+    
+    # Show edit form if editing
+    if st.session_state.editing_exercise == ex_name:
+        with st.form(f"edit_steps_form_{ex_name}", clear_on_submit=False):
+            current_steps = execution_steps or ''
+            new_steps = st.text_area(
+                "執行步驟 (支援 Markdown)",
+                value=current_steps,
+                height=150,
+                key=f"steps_input_{ex_name}",
+                help="使用 Markdown 格式撰寫執行步驟"
+            )
+            
+            col_save, col_cancel = st.columns(2)
+            with col_save:
+                if st.form_submit_button("💾 儲存", type="primary"):
+                    if update_exercise_steps(user_id, ex_name, new_steps.strip() if new_steps.strip() else None):
+                        st.success(f"✅ 已更新 {ex_name} 的執行步驟")
+                        st.session_state.editing_exercise = None
+                        # Fragment reruns reuse this row dict, so keep it current
+                        ex['execution_steps'] = new_steps.strip() or None
+                        st.rerun(scope="fragment")
+                    else:
+                        st.error("更新失敗")
+            
+            with col_cancel:
+                st.form_submit_button("❌ 取消", on_click=_set_session_value,
+                                      args=('editing_exercise', None))
+    
+    st.divider()
+
+
+@st.fragment
 def render_library_manager_page(user_id: str):
     """Render the Library Manager page"""
     st.header("📚 動作庫管理")
@@ -2265,103 +2458,63 @@ def render_library_manager_page(user_id: str):
     # Display exercise library
     st.subheader("動作庫列表")
     
-    all_exercises = get_all_exercises(user_id)
+    # Grouping and table building are cached until the library or the
+    # workout logs change, so unrelated reruns reuse them
+    library_view = _library_view(user_id, get_exercise_data_version(), get_workout_data_version())
     
-    if all_exercises:
+    if library_view:
         # Get workout counts to identify orphaned exercises
         workout_counts = get_exercise_workout_counts(user_id)
         
-        # Group by muscle group
-        exercises_df = pd.DataFrame(all_exercises)
+        # Only one steps form is open at a time: track its exercise name
+        # instead of one editing flag per exercise
+        st.session_state.setdefault('editing_exercise', None)
         
         # Display grouped by muscle group
-        muscle_groups = exercises_df['muscle_group'].unique()
-        
-        for mg in muscle_groups:
-            with st.expander(f"📂 {mg}", expanded=False):
-                mg_exercises = exercises_df[exercises_df['muscle_group'] == mg]
+        for mg, (mg_exercises, mg_table) in library_view.items():
+            # Collapsed groups render only this toggle; their table and
+            # controls are built only while the group is open
+            open_key = f"open_mg_{mg}"
+            is_open = st.session_state.get(open_key, False)
+            st.button(
+                f"{'📂' if is_open else '📁'} {mg} ({len(mg_exercises)})",
+                key=f"toggle_mg_{mg}",
+                use_container_width=True,
+                on_click=_set_session_value,
+                args=(open_key, not is_open)
+            )
+            if not is_open:
+                continue
+            
+            with st.container(border=True):
+                # One virtualized table per group; the browser draws only the
+                # visible rows, and controls are built for the selected one
+                table_event = st.dataframe(
+                    mg_table,
+                    column_config={
+                        'name': st.column_config.TextColumn("動作"),
+                        'exercise_type': st.column_config.TextColumn("類型"),
+                        'has_steps': st.column_config.CheckboxColumn("執行步驟"),
+                        'workout_count': st.column_config.NumberColumn("訓練次數", format="%d")
+                    },
+                    key=f"lib_table_{mg}",
+                    use_container_width=True,
+                    hide_index=True,
+                    on_select="rerun",
+                    selection_mode="single-row"
+                )
                 
-                for _, ex in mg_exercises.iterrows():
-                    ex_name = ex['name']
-                    ex_type = ex['exercise_type']
-                    has_steps = ex.get('execution_steps') and str(ex.get('execution_steps')).strip()
-                    workout_count = workout_counts.get(ex_name, 0)
-                    is_orphaned = workout_count == 0
-                    
-                    # Create columns for exercise info, edit button, and delete button (if orphaned)
-                    if is_orphaned:
-                        info_col, edit_col, delete_col = st.columns([3, 1, 1])
-                    else:
-                        info_col, edit_col = st.columns([4, 1])
-                    
-                    with info_col:
-                        step_indicator = "📋" if has_steps else "📝"
-                        orphaned_indicator = " ⚠️ (孤立)" if is_orphaned else ""
-                        st.markdown(f"**{ex_name}** ({ex_type}) {step_indicator}{orphaned_indicator}")
-                    
-                    with edit_col:
-                        edit_key = f"edit_steps_{ex_name}"
-                        if st.button("編輯步驟", key=edit_key, use_container_width=True):
-                            st.session_state[f"editing_{ex_name}"] = True
-                            st.rerun()
-                    
-                    # Show delete button for orphaned exercises
-                    if is_orphaned:
-                        with delete_col:
-                            delete_key = f"delete_exercise_{ex_name}"
-                            if st.button("🗑️ 刪除", key=delete_key, use_container_width=True, type="secondary"):
-                                st.session_state[f"confirm_delete_exercise"] = ex_name
-                                st.rerun()
-                    
-                    # Show confirmation dialog for deletion
-                    if st.session_state.get(f"confirm_delete_exercise") == ex_name:
-                        st.warning(f"⚠️ 確定要刪除動作「{ex_name}」嗎？此動作沒有訓練記錄。")
-                        col_confirm, col_cancel = st.columns(2)
-                        with col_confirm:
-                            if st.button("✅ 確認刪除", key=f"confirm_delete_{ex_name}", type="primary"):
-                                if delete_exercise(user_id, ex_name):
-                                    st.success(f"✅ 已刪除動作: {ex_name}")
-                                    st.session_state[f"confirm_delete_exercise"] = None
-                                    st.rerun()
-                                else:
-                                    st.error("刪除失敗")
-                        with col_cancel:
-                            if st.button("❌ 取消", key=f"cancel_delete_{ex_name}"):
-                                st.session_state[f"confirm_delete_exercise"] = None
-                                st.rerun()
-                    
-                    # Show edit form if editing
-                    if st.session_state.get(f"editing_{ex_name}", False):
-                        with st.form(f"edit_steps_form_{ex_name}", clear_on_submit=False):
-                            current_steps = ex.get('execution_steps', '') or ''
-                            new_steps = st.text_area(
-                                "執行步驟 (支援 Markdown)",
-                                value=current_steps,
-                                height=150,
-                                key=f"steps_input_{ex_name}",
-                                help="使用 Markdown 格式撰寫執行步驟"
-                            )
-                            
-                            col_save, col_cancel = st.columns(2)
-                            with col_save:
-                                if st.form_submit_button("💾 儲存", type="primary"):
-                                    if update_exercise_steps(user_id, ex_name, new_steps.strip() if new_steps.strip() else None):
-                                        st.success(f"✅ 已更新 {ex_name} 的執行步驟")
-                                        st.session_state[f"editing_{ex_name}"] = False
-                                        st.rerun()
-                                    else:
-                                        st.error("更新失敗")
-                            
-                            with col_cancel:
-                                if st.form_submit_button("❌ 取消"):
-                                    st.session_state[f"editing_{ex_name}"] = False
-                                    st.rerun()
-                    
-                    st.divider()
+                # A stored selection can outlive its row (e.g. after a delete)
+                selected_rows = [row for row in table_event.selection.rows if row < len(mg_exercises)]
+                if selected_rows:
+                    ex = mg_exercises[selected_rows[0]]
+                    _library_exercise_row(user_id, ex, workout_counts.get(ex['name'], 0))
+                else:
+                    st.caption("選擇一列以編輯執行步驟或刪除孤立動作")
         
         # Summary
-        orphaned_count = sum(1 for ex in all_exercises if workout_counts.get(ex['name'], 0) == 0)
-        st.metric("總動作數", len(all_exercises))
+        orphaned_count = sum(int((mg_table['workout_count'] == 0).sum()) for _, mg_table in library_view.values())
+        st.metric("總動作數", sum(len(mg_exercises) for mg_exercises, _ in library_view.values()))
         if orphaned_count > 0:
             st.info(f"⚠️ 發現 {orphaned_count} 個孤立動作（沒有訓練記錄），可以刪除。")
     else:
@@ -2372,6 +2525,7 @@ def render_library_manager_page(user_id: str):
 # PAGE 4: DATA IMPORT (資料匯入)
 # ============================================================================
 
+@st.fragment
 def render_data_import_page(user_id: str):
     """Render the Data Import page"""
     st.header("📥 資料匯入")
@@ -2400,12 +2554,13 @@ def render_data_import_page(user_id: str):
     
     if uploaded_file is not None:
         try:
-            # Read CSV
-            df = pd.read_csv(uploaded_file)
+            # Only the first rows are parsed for the preview and column check;
+            # the import below streams the file in chunks
+            df = next(iter(iter_workout_csv(uploaded_file, chunksize=5)))
             
             # Display preview
             st.subheader("📋 檔案預覽 (前 5 行)")
-            st.dataframe(df.head(5), use_container_width=True)
+            st.dataframe(df, use_container_width=True)
             
             # Check required columns
             required_columns = ['Date', 'Exercise', 'Set Order', 'Weight', 'Unit', 'Reps']
@@ -2415,12 +2570,24 @@ def render_data_import_page(user_id: str):
                 st.error(f"❌ CSV 檔案缺少必要欄位: {', '.join(missing_columns)}")
                 st.info("請確認 CSV 檔案包含以下欄位: Date, Muscle Group, Exercise, Set Order, Weight, Unit, Reps, Note")
             else:
-                st.success(f"✅ 檔案格式正確！共 {len(df)} 筆記錄")
+                st.success("✅ 檔案格式正確！")
                 
                 # Import button
                 if st.button("🚀 開始匯入", type="primary"):
-                    with st.spinner("正在匯入資料..."):
-                        success_count, error_count, error_messages = import_workout_from_csv(user_id, df)
+                    success_count, error_count, error_messages = 0, 0, []
+                    progress = st.progress(0.0, text="正在匯入資料...")
+                    uploaded_file.seek(0)
+                    for chunk in iter_workout_csv(uploaded_file):
+                        chunk_success, chunk_errors, chunk_messages = import_workout_from_csv(
+                            user_id, chunk, max_messages=IMPORT_MAX_ERROR_MESSAGES - len(error_messages)
+                        )
+                        success_count += chunk_success
+                        error_count += chunk_errors
+                        error_messages.extend(chunk_messages)
+                        # Parser position is approximate (read-ahead), so cap at 100%
+                        progress.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0),
+                                          text=f"正在匯入資料... 已處理 {success_count + error_count} 筆")
+                    progress.empty()
                     
                     # Display results
                     if success_count > 0:
@@ -2430,10 +2597,10 @@ def render_data_import_page(user_id: str):
                     if error_count > 0:
                         st.warning(f"⚠️ {error_count} 筆記錄匯入失敗")
                         with st.expander("查看錯誤詳情"):
-                            for msg in error_messages[:20]:  # Show first 20 errors
+                            for msg in error_messages:  # First IMPORT_MAX_ERROR_MESSAGES errors
                                 st.text(msg)
-                            if len(error_messages) > 20:
-                                st.text(f"... 還有 {len(error_messages) - 20} 個錯誤")
+                            if error_count > len(error_messages):
+                                st.text(f"... 還有 {error_count - len(error_messages)} 個錯誤")
                     
                     if success_count == 0 and error_count == 0:
                         st.info("沒有資料被匯入")
@@ -2480,15 +2647,9 @@ def main():
     if 'db_initialized' not in st.session_state:
         init_database(user_id)
         st.session_state.db_initialized = True
-        # Initialize default exercises if database is empty
-        exercises = get_all_exercises(user_id)
-        if not exercises:
-            default_exercises = get_default_exercises()
-            for muscle_group, exercise_list in default_exercises.items():
-                for exercise_name in exercise_list:
-                    # Use infer_exercise_type for better type detection
-                    exercise_type = infer_exercise_type(exercise_name)
-                    add_custom_exercise(user_id, exercise_name, muscle_group, exercise_type)
+        # Initialize default exercises if the library is empty (one-row probe,
+        # skipped entirely for users already seeded in this process)
+        ensure_exercise_library(user_id, list(get_default_exercise_rows()))
     
     # 8. Sidebar navigation
     st.sidebar.title("🏋️ My Gym Tracker")
@@ -2505,8 +2666,7 @@ def main():
     st.sidebar.markdown("### 📍 導航")
     
     # Initialize current page in session state
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = "記錄訓練"
+    st.session_state.setdefault('current_page', "記錄訓練")
     
     # Define pages with icons
     pages = {
@@ -2521,14 +2681,14 @@ def main():
         is_active = st.session_state.current_page == page_name
         button_type = "primary" if is_active else "secondary"
         
-        if st.sidebar.button(
+        st.sidebar.button(
             f"{icon} {page_name}",
             key=f"nav_{page_name}",
             use_container_width=True,
-            type=button_type
-        ):
-            st.session_state.current_page = page_name
-            st.rerun()
+            type=button_type,
+            on_click=_set_session_value,
+            args=('current_page', page_name)
+        )
     
     # Set page from session state
     page = st.session_state.current_page
@@ -2536,17 +2696,16 @@ def main():
     # Bodyweight setting for assisted exercises
     st.sidebar.markdown("---")
     st.sidebar.markdown("### ⚙️ 設定")
-    if 'bodyweight' not in st.session_state:
-        st.session_state.bodyweight = 135.0  # Default 135 lbs
+    st.session_state.setdefault('bodyweight', 135.0)  # Default 135 lbs
     
-    bodyweight = st.sidebar.number_input(
+    # Bound to session_state through its key; pages read st.session_state.bodyweight
+    st.sidebar.number_input(
         "體重 (用於計算輔助動作的有效重量) (lb)",
         min_value=0.0,
-        value=st.session_state.bodyweight,
         step=1.0,
+        key='bodyweight',
         help="此數值用於計算輔助動作的有效重量 (有效重量 = 體重 - 輔助重量)"
     )
-    st.session_state.bodyweight = bodyweight
     
     # 9. Route to appropriate page
     if page == "記錄訓練":
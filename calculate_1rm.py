@@ -39,13 +39,8 @@ def calculate_exercise_1rm(exercise_name: str, user_id: str):
     max_1rm_set = None
     all_1rms = []
     
-    for _, row in history_df.iterrows():
-        weight = row['weight']
-        reps = row['reps']
-        unit = row['unit']
-        date = row['date']
-        set_order = row['set_order']
-        
+    # Plain tuples: no per-row Series construction
+    for date, set_order, weight, unit, reps in history_df[['date', 'set_order', 'weight', 'unit', 'reps']].itertuples(index=False, name=None):
         # Skip if invalid data
         if weight <= 0 or reps <= 0:
             continue
@@ -0,0 +1,82 @@
+"""
+Regression check for CSV import validation
+Feeds a CSV with non-numeric Weight and Reps cells (and a row of empty cells)
+through both CSV readers and verifies the bad rows are reported instead of
+inserted and the empty cells fall back to their defaults
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import _parse_workout_rows, read_workout_csv, iter_workout_csv
+
+CSV_TEXT = """Date,Muscle Group,Exercise,Set Order,Weight,Unit,Reps,Note
+2024-01-01,Chest,Bench Press,1,60,kg,8,
+2024-01-01,Chest,Bench Press,2,abc,kg,8,
+2024-01-01,Chest,Bench Press,3,60,kg,x,
+2024-01-01,Back,Pull-up,1,Bodyweight,kg,10,felt good
+2024-01-02,Back,Pull-up,,,,,
+"""
+
+EXPECTED_ERRORS = [
+    "第 3 行: 無法轉換重量值 'abc' 為數字",
+    "第 4 行: 無法轉換次數 'x' 為數字"
+]
+
+
+def check(label: str, frames) -> bool:
+    """Run every frame through import validation and compare with the expected result"""
+    records, error_count, error_messages = [], 0, []
+    for frame in frames:
+        frame_records, _, frame_errors, frame_messages = _parse_workout_rows("check-user", frame)
+        records.extend(frame_records)
+        error_count += frame_errors
+        error_messages.extend(frame_messages)
+
+    line_numbers = [line_no for line_no, _ in records]
+    ok = (
+        error_messages == EXPECTED_ERRORS
+        and error_count == len(EXPECTED_ERRORS)
+        and line_numbers == [2, 5, 6]
+        and records[0][1]["weight"] == 60.0 and records[0][1]["reps"] == 8
+        and records[1][1]["weight"] == 0.0 and records[1][1]["reps"] == 10
+        # Empty cells: weight 0 (never NaN), set 1, reps 0, unit kg
+        and records[2][1]["weight"] == 0.0 and records[2][1]["set_order"] == 1
+        and records[2][1]["reps"] == 0 and records[2][1]["unit"] == "kg"
+    )
+    print(f"{'✅' if ok else '❌'} {label}: {len(records)} valid rows, errors: {error_messages}")
+    return ok
+
+
+# A file whose category columns (Muscle Group, Unit) are entirely empty
+EMPTY_COLUMNS_CSV_TEXT = """Date,Muscle Group,Exercise,Set Order,Weight,Unit,Reps,Note
+2025-01-02,,Pull-up,,,,,
+"""
+
+
+def check_empty_columns(label: str, frames) -> bool:
+    """Verify all-empty category columns parse and fall back to their defaults"""
+    records = []
+    for frame in frames:
+        records.extend(_parse_workout_rows("check-user", frame)[0])
+
+    ok = len(records) == 1 and records[0][1]["unit"] == "kg" and records[0][1]["weight"] == 0.0
+    print(f"{'✅' if ok else '❌'} {label} (empty columns): {[record for _, record in records]}")
+    return ok
+
+
+def main():
+    results = [
+        check("read_workout_csv", [read_workout_csv(io.BytesIO(CSV_TEXT.encode()))]),
+        check("iter_workout_csv", iter_workout_csv(io.StringIO(CSV_TEXT), chunksize=2)),
+        check_empty_columns("read_workout_csv", [read_workout_csv(io.BytesIO(EMPTY_COLUMNS_CSV_TEXT.encode()))]),
+        check_empty_columns("iter_workout_csv", iter_workout_csv(io.StringIO(EMPTY_COLUMNS_CSV_TEXT)))
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
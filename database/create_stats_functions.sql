@@ -0,0 +1,116 @@
+-- SQL functions that aggregate workout statistics in Postgres
+-- Run this once in Supabase SQL Editor; the app falls back to client-side
+-- aggregation if these functions are not installed
+
+-- Sets and training days per muscle group (optionally since a cutoff date)
+CREATE OR REPLACE FUNCTION public.stats_by_muscle_group(uid UUID, since DATE DEFAULT NULL)
+RETURNS TABLE(muscle_group TEXT, total_sets BIGINT, workout_days BIGINT)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT e.muscle_group, COUNT(*) AS total_sets, COUNT(DISTINCT w.date) AS workout_days
+  FROM public.workout_logs w
+  JOIN public.exercises e
+    ON e.user_id = w.user_id AND e.name = w.exercise_name
+  WHERE w.user_id = uid
+    AND (since IS NULL OR w.date >= since)
+  GROUP BY e.muscle_group
+  ORDER BY total_sets DESC;
+END;
+$$;
+
+-- Workout session count (distinct dates) per exercise
+CREATE OR REPLACE FUNCTION public.exercise_workout_counts(uid UUID)
+RETURNS TABLE(exercise_name TEXT, session_count BIGINT)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT w.exercise_name, COUNT(DISTINCT w.date) AS session_count
+  FROM public.workout_logs w
+  WHERE w.user_id = uid
+  GROUP BY w.exercise_name;
+END;
+$$;
+
+-- Everything the Log Workout page reads, in one round-trip:
+-- recent sessions of the selected exercise, its library entry, the day's
+-- logged sets and their total volume (kg), and per-exercise session counts.
+-- Requires execution_steps (migration_add_execution_steps.sql).
+CREATE OR REPLACE FUNCTION public.log_page_context(uid UUID, exercise TEXT, on_date DATE, session_limit INT DEFAULT 12)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'recent_sessions', COALESCE((
+      SELECT json_agg(s ORDER BY s.date DESC)
+      FROM (
+        SELECT d.date,
+               (array_agg(w.unit ORDER BY w.set_order))[1] AS unit,
+               (array_agg(w.rpe ORDER BY w.set_order))[1] AS rpe,
+               (array_agg(w.notes ORDER BY w.set_order))[1] AS notes,
+               json_agg(json_build_object('set_order', w.set_order, 'weight', w.weight, 'reps', w.reps)
+                        ORDER BY w.set_order) AS sets
+        FROM (
+          SELECT DISTINCT l.date
+          FROM public.workout_logs l
+          WHERE l.user_id = uid AND l.exercise_name = exercise
+          ORDER BY l.date DESC
+          LIMIT session_limit
+        ) d
+        JOIN public.workout_logs w
+          ON w.user_id = uid AND w.exercise_name = exercise AND w.date = d.date
+        GROUP BY d.date
+      ) s
+    ), '[]'::json),
+    'exercise_details', (
+      SELECT row_to_json(e)
+      FROM (
+        SELECT x.id, x.name, x.muscle_group, x.exercise_type, x.execution_steps
+        FROM public.exercises x
+        WHERE x.user_id = uid AND x.name = exercise
+        LIMIT 1
+      ) e
+    ),
+    'todays_workouts', COALESCE((
+      SELECT json_agg(t ORDER BY t.exercise_name, t.set_order)
+      FROM (
+        SELECT l.id, l.exercise_name, l.set_order, l.weight, l.unit, l.reps, l.rpe, l.notes
+        FROM public.workout_logs l
+        WHERE l.user_id = uid AND l.date = on_date
+      ) t
+    ), '[]'::json),
+    'todays_volume', (
+      -- Same kg factors as UNIT_TO_KG in utils/calculations.py
+      SELECT COALESCE(SUM(l.weight * l.reps * CASE l.unit
+                                                 WHEN 'lb' THEN 0.453592
+                                                 WHEN 'notch' THEN 2.5
+                                                 WHEN 'notch/plate' THEN 2.5
+                                                 ELSE 1
+                                               END), 0)
+      FROM public.workout_logs l
+      WHERE l.user_id = uid AND l.date = on_date
+    ),
+    'workout_counts', COALESCE((
+      SELECT json_object_agg(c.exercise_name, c.session_count)
+      FROM (
+        SELECT l.exercise_name, COUNT(DISTINCT l.date) AS session_count
+        FROM public.workout_logs l
+        WHERE l.user_id = uid
+        GROUP BY l.exercise_name
+      ) c
+    ), '{}'::json)
+  );
+$$;
+
+-- Grant execute permission to authenticated users
+GRANT EXECUTE ON FUNCTION public.stats_by_muscle_group(UUID, DATE) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.stats_by_muscle_group(UUID, DATE) TO anon;
+GRANT EXECUTE ON FUNCTION public.exercise_workout_counts(UUID) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.exercise_workout_counts(UUID) TO anon;
+GRANT EXECUTE ON FUNCTION public.log_page_context(UUID, TEXT, DATE, INT) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.log_page_context(UUID, TEXT, DATE, INT) TO anon;
@@ -0,0 +1,29 @@
+-- SQL functions that batch workout log writes into a single statement
+-- Run this once in Supabase SQL Editor; the app falls back to one request
+-- per set if these functions are not installed
+
+-- Update several sets at once; rpe/notes are only changed when provided
+-- Returns the number of rows updated
+CREATE OR REPLACE FUNCTION public.update_workout_sets(uid UUID, updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+VOLATILE
+AS $$
+  WITH changed AS (
+    UPDATE public.workout_logs w
+    SET weight = u.weight,
+        unit = u.unit,
+        reps = u.reps,
+        rpe = COALESCE(u.rpe, w.rpe),
+        notes = COALESCE(u.notes, w.notes)
+    FROM jsonb_to_recordset(updates) AS u(id INTEGER, weight REAL, unit TEXT, reps INTEGER, rpe INTEGER, notes TEXT)
+    WHERE w.id = u.id
+      AND w.user_id = uid
+    RETURNING w.id
+  )
+  SELECT COUNT(*)::INTEGER FROM changed;
+$$;
+
+-- Grant execute permission to authenticated users
+GRANT EXECUTE ON FUNCTION public.update_workout_sets(UUID, JSONB) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.update_workout_sets(UUID, JSONB) TO anon;
@@ -4,24 +4,145 @@ Handles all Supabase PostgreSQL database operations
 """
 
 import os
-from datetime import date, datetime
-from typing import List, Dict, Optional, Tuple
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
+import streamlit as st
 from supabase import Client
 
 from src.auth import get_supabase_client
+from utils.calculations import calculate_total_volume
 
 # Schema name
 # Note: Using 'public' schema for Supabase PostgREST compatibility
 # To use 'gymlog' schema, expose it in Supabase Dashboard: Settings -> API -> Exposed schemas
 SCHEMA = "public"
 
+# PostgREST caps each response (Supabase default max-rows is 1000)
+PAGE_SIZE = 1000
+
+# Bumped by clear_workout_cache(); lets UI-level memoization detect changed data
+_workout_data_version = 0
+# Bumped by clear_exercise_cache(); the same idea for the exercise library
+_exercise_data_version = 0
+
+# Users whose exercise library is known to be seeded (per server process)
+_seeded_users = set()
+
+# Rows per bulk insert / IN (...) lookup when importing CSVs
+IMPORT_BATCH_SIZE = 500
+# Rows parsed per chunk when streaming a CSV upload
+IMPORT_CHUNK_ROWS = 10_000
+# Row-level error messages kept per import (the error count stays exact)
+IMPORT_MAX_ERROR_MESSAGES = 20
+
+# Explicit dtypes for the text columns of workout CSV imports. The low-
+# cardinality ones are dictionary-encoded; numeric columns stay inferred so
+# bad or "Bodyweight" values reach row-level validation instead of failing
+# the parse. Optional columns missing from a file are ignored by read_csv.
+WORKOUT_CSV_DTYPES = {
+    'Date': 'string[pyarrow]',
+    'Exercise': 'category',
+    'Muscle Group': 'category',
+    'Unit': 'category',
+    'Note': 'string[pyarrow]'
+}
+
 
 def get_supabase() -> Client:
     """Get Supabase client"""
     return get_supabase_client()
 
 
+def _fetch_all_rows(build_query: Callable) -> List[Dict]:
+    """
+    Fetch every row of a query, paging past the PostgREST max-rows cap
+    
+    Args:
+        build_query: Callable returning a fresh (unexecuted) query builder
+    
+    Returns:
+        List of row dictionaries
+    """
+    rows = []
+    start = 0
+    while True:
+        result = build_query().range(start, start + PAGE_SIZE - 1).execute()
+        batch = result.data or []
+        rows.extend(batch)
+        if len(batch) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def _downcast_workouts_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert workout log columns to compact dtypes
+    
+    weight is REAL (float4) in Postgres, so float32 loses nothing; reps and
+    set_order are small integers; repeated text columns become categoricals.
+    """
+    dtypes = {
+        'weight': 'float32',
+        'reps': 'int16',
+        'set_order': 'int16',
+        'exercise_name': 'category',
+        'unit': 'category'
+    }
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+
+def get_exercise_data_version() -> int:
+    """Return a counter that changes whenever the exercise library is modified"""
+    return _exercise_data_version
+
+
+def clear_exercise_cache():
+    """Invalidate cached exercise library lookups after the library changes"""
+    global _exercise_data_version
+    _exercise_data_version += 1
+    get_all_exercises.clear()
+    get_exercise_muscle_groups.clear()
+    get_exercises_by_muscle_group.clear()
+    get_exercise_details.clear()
+    # Muscle group stats join workouts to the library
+    get_muscle_group_stats.clear()
+    get_log_page_context.clear()
+    get_exercise_history.clear()
+    get_exercise_history_bulk.clear()
+    get_exercise_index.clear()
+
+
+def _normalize_session_dates(sessions: List[Dict]) -> List[Dict]:
+    """Convert the ISO 'date' strings of session dictionaries to date objects in place"""
+    if sessions:
+        parsed = pd.to_datetime([session['date'] for session in sessions]).date
+        for session, session_date in zip(sessions, parsed):
+            session['date'] = session_date
+    return sessions
+
+
+def get_workout_data_version() -> int:
+    """Return a counter that changes whenever workout logs are modified"""
+    return _workout_data_version
+
+
+def clear_workout_cache():
+    """Invalidate cached workout aggregates after workout logs change"""
+    global _workout_data_version
+    _workout_data_version += 1
+    get_exercise_workout_counts.clear()
+    get_muscle_group_stats.clear()
+    get_recent_workout_sessions.clear()
+    get_previous_workout.clear()
+    get_todays_workouts.clear()
+    get_log_page_context.clear()
+    get_exercise_history.clear()
+    get_exercise_history_bulk.clear()
+    get_exercise_index.clear()
+
+
 def init_database(user_id: str):
     """
     Initialize database and create tables if they don't exist
@@ -56,8 +177,11 @@ def save_workout(user_id: str, workout_date: date, exercise_name: str, sets: Lis
     """
     supabase = get_supabase()
     
-    for set_data in sets:
-        data = {
+    if not sets:
+        return
+    
+    rows = [
+        {
             "user_id": user_id,
             "date": workout_date.isoformat(),
             "exercise_name": exercise_name,
@@ -68,10 +192,16 @@ def save_workout(user_id: str, workout_date: date, exercise_name: str, sets: Lis
             "rpe": rpe,
             "notes": notes
         }
-        
-        supabase.table("workout_logs").insert(data).execute()
+        for set_data in sets
+    ]
+    
+    # One request for all sets (a single INSERT, so it's all-or-nothing)
+    supabase.table("workout_logs").insert(rows).execute()
+    
+    clear_workout_cache()
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_previous_workout(user_id: str, exercise_name: str) -> Optional[Dict]:
     """
     Get the most recent workout for a specific exercise
@@ -162,18 +292,20 @@ def get_previous_workout_session(user_id: str, exercise_name: str) -> Optional[D
     return None
 
 
-def get_recent_workout_sessions(user_id: str, exercise_name: str, limit: int = 3) -> List[Dict]:
+@st.cache_data(ttl=60, show_spinner=False)
+def get_recent_workout_sessions(user_id: str, exercise_name: str, limit: int = 3, offset: int = 0) -> List[Dict]:
     """
-    Get the last N workout sessions for a specific exercise
+    Get one page of recent workout sessions for a specific exercise
     
     Args:
         user_id: User UUID
         exercise_name: Name of the exercise
-        limit: Number of recent sessions to return (default: 3)
+        limit: Number of sessions to return (default: 3)
+        offset: Number of most recent sessions to skip (for pagination)
     
     Returns:
         List of dictionaries, each containing:
-        - 'date': workout date
+        - 'date': workout date (date object)
         - 'unit': unit used
         - 'sets': list of sets with weight, reps, set_order
         - 'rpe': RPE value (if available)
@@ -181,7 +313,7 @@ def get_recent_workout_sessions(user_id: str, exercise_name: str, limit: int = 3
     """
     supabase = get_supabase()
     
-    # Get unique workout dates for this exercise, ordered by date descending
+    # Get workout dates for this exercise, ordered by date descending
     date_result = supabase.table("workout_logs")\
         .select("date")\
         .eq("user_id", user_id)\
@@ -192,37 +324,37 @@ def get_recent_workout_sessions(user_id: str, exercise_name: str, limit: int = 3
     if not date_result.data:
         return []
     
-    # Get unique dates
-    unique_dates = []
-    seen_dates = set()
-    for row in date_result.data:
-        workout_date = row['date']
-        if workout_date not in seen_dates:
-            unique_dates.append(workout_date)
-            seen_dates.add(workout_date)
-            if len(unique_dates) >= limit:
-                break
+    # Unique dates for the requested page
+    unique_dates = list(dict.fromkeys(row['date'] for row in date_result.data))
+    page_dates = unique_dates[offset:offset + limit]
+    if not page_dates:
+        return []
+    
+    # Get all sets for the page's dates in one query
+    result = supabase.table("workout_logs")\
+        .select("date, set_order, weight, unit, reps, rpe, notes")\
+        .eq("user_id", user_id)\
+        .eq("exercise_name", exercise_name)\
+        .in_("date", page_dates)\
+        .order("set_order", desc=False)\
+        .execute()
+    
+    rows_by_date = {}
+    for row in result.data or []:
+        rows_by_date.setdefault(row['date'], []).append(row)
     
-    # Get all sets for each date
     sessions = []
-    for workout_date in unique_dates:
-        result = supabase.table("workout_logs")\
-            .select("set_order, weight, unit, reps, rpe, notes")\
-            .eq("user_id", user_id)\
-            .eq("exercise_name", exercise_name)\
-            .eq("date", workout_date)\
-            .order("set_order", desc=False)\
-            .execute()
-        
-        if result.data:
-            first_set = result.data[0]
+    for workout_date in page_dates:
+        rows = rows_by_date.get(workout_date)
+        if rows:
+            first_set = rows[0]
             sets = [
                 {
                     'set_order': row['set_order'],
                     'weight': row['weight'],
                     'reps': row['reps']
                 }
-                for row in result.data
+                for row in rows
             ]
             
             sessions.append({
@@ -233,9 +365,92 @@ def get_recent_workout_sessions(user_id: str, exercise_name: str, limit: int = 3
                 'notes': first_set.get('notes')
             })
     
-    return sessions
+    return _normalize_session_dates(sessions)
+
+
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def get_log_page_context(user_id: str, exercise_name: Optional[str], workout_date: date,
+                         session_limit: int = 12) -> Dict:
+    """
+    Get everything the Log Workout page reads in one call
+    
+    Uses the log_page_context RPC (database/create_stats_functions.sql) for a
+    single round-trip when installed, otherwise falls back to the individual
+    queries.
+    
+    Args:
+        user_id: User UUID
+        exercise_name: Selected exercise (None if nothing is selected yet)
+        workout_date: Date whose logged sets are shown
+        session_limit: Number of most recent sessions to include
+    
+    Returns:
+        Dictionary with:
+        - 'recent_sessions': newest-first sessions (see get_recent_workout_sessions)
+        - 'previous_workout': first set of the latest session (see get_previous_workout) or None
+        - 'exercise_details': see get_exercise_details
+        - 'todays_workouts': DataFrame as returned by get_todays_workouts
+        - 'todays_volume': total volume of the day's sets in kg
+        - 'workout_counts': see get_exercise_workout_counts
+    """
+    supabase = get_supabase()
+    
+    context = None
+    try:
+        result = supabase.rpc("log_page_context", {
+            "uid": user_id,
+            "exercise": exercise_name,
+            "on_date": workout_date.isoformat(),
+            "session_limit": session_limit
+        }).execute()
+        context = result.data
+    except Exception:
+        # Fallback: RPC not installed yet, query piece by piece
+        pass
+    
+    if context:
+        recent_sessions = _normalize_session_dates(context.get('recent_sessions') or [])
+        exercise_details = context.get('exercise_details')
+        todays_rows = context.get('todays_workouts') or []
+        todays_workouts = pd.DataFrame(todays_rows, columns=['id', 'exercise_name', 'set_order', 'weight',
+                                                             'unit', 'reps', 'rpe', 'notes'])
+        workout_counts = {name: int(count) for name, count in (context.get('workout_counts') or {}).items()}
+        todays_volume = float(context.get('todays_volume') or 0)
+    else:
+        recent_sessions = get_recent_workout_sessions(user_id, exercise_name, limit=session_limit) if exercise_name else []
+        exercise_details = get_exercise_details(user_id, exercise_name) if exercise_name else None
+        todays_workouts = get_todays_workouts(user_id, workout_date)
+        workout_counts = get_exercise_workout_counts(user_id)
+        todays_volume = float(calculate_total_volume(
+            todays_workouts['weight'].to_numpy(),
+            todays_workouts['reps'].to_numpy(),
+            todays_workouts['unit'].to_numpy()
+        ).sum())
+    
+    # The previous workout is the first set of the latest session
+    previous_workout = None
+    if recent_sessions and recent_sessions[0]['sets']:
+        latest = recent_sessions[0]
+        first_set = latest['sets'][0]
+        previous_workout = {
+            'weight': first_set['weight'],
+            'unit': latest['unit'],
+            'reps': first_set['reps'],
+            'rpe': latest.get('rpe'),
+            'date': latest['date']
+        }
+    
+    return {
+        'recent_sessions': recent_sessions,
+        'previous_workout': previous_workout,
+        'exercise_details': exercise_details,
+        'todays_workouts': todays_workouts,
+        'todays_volume': todays_volume,
+        'workout_counts': workout_counts
+    }
 
 
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
 def get_exercise_history(user_id: str, exercise_name: str, days: Optional[int] = None) -> pd.DataFrame:
     """
     Get exercise history as DataFrame
@@ -257,7 +472,6 @@ def get_exercise_history(user_id: str, exercise_name: str, days: Optional[int] =
     
     if days:
         # Calculate cutoff date
-        from datetime import timedelta
         cutoff_date = (date.today() - timedelta(days=days)).isoformat()
         query = query.gte("date", cutoff_date)
     
@@ -268,10 +482,48 @@ def get_exercise_history(user_id: str, exercise_name: str, days: Optional[int] =
     if result.data:
         df = pd.DataFrame(result.data)
         df['date'] = pd.to_datetime(df['date']).dt.date
-        return df
+        return df.astype({'weight': 'float32', 'reps': 'int16', 'set_order': 'int16'})
     return pd.DataFrame(columns=['date', 'set_order', 'weight', 'unit', 'reps', 'rpe', 'notes'])
 
 
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def get_exercise_history_bulk(user_id: str, exercise_names: Tuple[str, ...]) -> pd.DataFrame:
+    """
+    Get the history of several exercises with a single query
+    
+    Args:
+        user_id: User UUID
+        exercise_names: Names of the exercises (a tuple, so the call is cacheable)
+    
+    Returns:
+        DataFrame with exercise_name plus the get_exercise_history columns
+    """
+    columns = ['exercise_name', 'date', 'set_order', 'weight', 'unit', 'reps', 'rpe', 'notes']
+    if not exercise_names:
+        return pd.DataFrame(columns=columns)
+    
+    supabase = get_supabase()
+    
+    try:
+        rows = _fetch_all_rows(lambda: supabase.table("workout_logs")
+                               .select(", ".join(columns))
+                               .eq("user_id", user_id)
+                               .in_("exercise_name", list(exercise_names))
+                               .order("date", desc=True)
+                               .order("set_order")
+                               .order("id"))
+    except Exception as e:
+        print(f"Error getting exercise history for {exercise_names}: {e}")
+        rows = []
+    
+    if rows:
+        df = pd.DataFrame(rows)
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        return df.astype({'weight': 'float32', 'reps': 'int16', 'set_order': 'int16'})
+    return pd.DataFrame(columns=columns)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
 def get_all_exercises(user_id: str) -> List[Dict]:
     """
     Get all exercises from the library for a user
@@ -305,6 +557,30 @@ def get_all_exercises(user_id: str) -> List[Dict]:
     return result.data if result.data else []
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_exercise_muscle_groups(user_id: str) -> Dict[str, str]:
+    """
+    Get the muscle group of every library exercise
+    
+    Selects only the two columns needed, skipping the (possibly long)
+    execution_steps markdown that get_all_exercises returns.
+    
+    Returns:
+        Dictionary mapping exercise name to muscle group, ordered by muscle
+        group then name
+    """
+    supabase = get_supabase()
+    
+    result = supabase.table("exercises")\
+        .select("name, muscle_group")\
+        .eq("user_id", user_id)\
+        .order("muscle_group")\
+        .order("name")\
+        .execute()
+    
+    return {row['name']: row['muscle_group'] for row in (result.data or [])}
+
+
 def get_exercise_entry_counts(user_id: str) -> Dict[str, int]:
     """
     Get entry count for each exercise
@@ -330,37 +606,48 @@ def get_exercise_entry_counts(user_id: str) -> Dict[str, int]:
     return counts
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_exercise_workout_counts(user_id: str) -> Dict[str, int]:
     """
     Get workout session count for each exercise (counts unique dates per exercise)
     
+    Uses the exercise_workout_counts RPC (database/create_stats_functions.sql)
+    when installed, otherwise counts client-side.
+    
     Returns:
         Dictionary with exercise names as keys and workout session counts as values
     """
     supabase = get_supabase()
     
+    try:
+        result = supabase.rpc("exercise_workout_counts", {"uid": user_id}).execute()
+        return {row['exercise_name']: int(row['session_count']) for row in (result.data or [])}
+    except Exception:
+        # Fallback: RPC not installed yet, aggregate in Python
+        pass
+    
     # Get all workout logs with date and exercise_name
-    result = supabase.table("workout_logs")\
-        .select("exercise_name, date")\
-        .eq("user_id", user_id)\
-        .execute()
+    rows = _fetch_all_rows(lambda: supabase.table("workout_logs")
+                           .select("exercise_name, date")
+                           .eq("user_id", user_id)
+                           .order("id"))
     
     # Count unique date+exercise combinations (workout sessions)
     session_counts = {}
-    if result.data:
-        seen_sessions = set()
-        for row in result.data:
-            exercise_name = row['exercise_name']
-            workout_date = row['date']
-            session_key = (exercise_name, workout_date)
-            
-            if session_key not in seen_sessions:
-                seen_sessions.add(session_key)
-                session_counts[exercise_name] = session_counts.get(exercise_name, 0) + 1
+    seen_sessions = set()
+    for row in rows:
+        exercise_name = row['exercise_name']
+        workout_date = row['date']
+        session_key = (exercise_name, workout_date)
+        
+        if session_key not in seen_sessions:
+            seen_sessions.add(session_key)
+            session_counts[exercise_name] = session_counts.get(exercise_name, 0) + 1
     
     return session_counts
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_exercises_by_muscle_group(user_id: str, muscle_group: str) -> List[str]:
     """
     Get exercise names for a specific muscle group
@@ -406,6 +693,7 @@ def add_custom_exercise(user_id: str, name: str, muscle_group: str, exercise_typ
         if execution_steps:
             data["execution_steps"] = execution_steps
         supabase.table("exercises").insert(data).execute()
+        clear_exercise_cache()
         return True
     except Exception as e:
         # Check if it's a unique constraint violation
@@ -414,6 +702,81 @@ def add_custom_exercise(user_id: str, name: str, muscle_group: str, exercise_typ
         raise
 
 
+def add_custom_exercises_bulk(user_id: str, rows: List[Tuple[str, str, str]]) -> bool:
+    """
+    Add many exercises to the library in a single request
+    
+    Names the user already has are skipped rather than failing the batch.
+    
+    Args:
+        user_id: User UUID
+        rows: (name, muscle_group, exercise_type) tuples
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    if not rows:
+        return True
+    
+    supabase = get_supabase()
+    
+    try:
+        data = [
+            {
+                "user_id": user_id,
+                "name": name,
+                "muscle_group": muscle_group,
+                "exercise_type": exercise_type
+            }
+            for name, muscle_group, exercise_type in rows
+        ]
+        supabase.table("exercises")\
+            .upsert(data, on_conflict="user_id,name", ignore_duplicates=True)\
+            .execute()
+        clear_exercise_cache()
+        return True
+    except Exception as e:
+        print(f"Error adding exercises: {e}")
+        return False
+
+
+def ensure_exercise_library(user_id: str, default_rows: List[Tuple[str, str, str]]) -> bool:
+    """
+    Seed a user's exercise library with the defaults if it is empty
+    
+    Existence is probed with a single-row query, and a seeded user is
+    remembered for the life of the process so later sessions skip the probe.
+    
+    Args:
+        user_id: User UUID
+        default_rows: (name, muscle_group, exercise_type) tuples to seed with
+    
+    Returns:
+        True if the library exists or was seeded, False otherwise
+    """
+    if user_id in _seeded_users:
+        return True
+    
+    supabase = get_supabase()
+    
+    try:
+        result = supabase.table("exercises")\
+            .select("id")\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+    except Exception as e:
+        print(f"Error checking exercise library: {e}")
+        return False
+    
+    if not result.data and not add_custom_exercises_bulk(user_id, default_rows):
+        return False
+    
+    _seeded_users.add(user_id)
+    return True
+
+
+@st.cache_data(ttl=300, show_spinner=False)
 def get_exercise_details(user_id: str, exercise_name: str) -> Optional[Dict]:
     """
     Get full exercise details including execution steps
@@ -473,12 +836,14 @@ def update_exercise_steps(user_id: str, exercise_name: str, execution_steps: Opt
             .eq("name", exercise_name)\
             .execute()
         
+        clear_exercise_cache()
         return len(result.data) > 0 if result.data else False
     except Exception as e:
         print(f"Error updating exercise steps: {e}")
         return False
 
 
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
 def get_todays_workouts(user_id: str, workout_date: date) -> pd.DataFrame:
     """
     Get all workouts for a specific date
@@ -501,13 +866,15 @@ def get_todays_workouts(user_id: str, workout_date: date) -> pd.DataFrame:
     return pd.DataFrame(columns=['id', 'exercise_name', 'set_order', 'weight', 'unit', 'reps', 'rpe', 'notes'])
 
 
-def get_all_workouts(user_id: str, days: Optional[int] = None) -> pd.DataFrame:
+def get_all_workouts(user_id: str, days: Optional[int] = None, limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
     """
     Get all workout logs
     
     Args:
         user_id: User UUID
         days: Number of days to look back (None for all)
+        limit: Maximum number of rows to return (None for all)
+        offset: Number of rows to skip, newest first (used with limit)
     
     Returns:
         DataFrame with all workouts
@@ -519,26 +886,33 @@ def get_all_workouts(user_id: str, days: Optional[int] = None) -> pd.DataFrame:
         .eq("user_id", user_id)
     
     if days:
-        from datetime import timedelta
         cutoff_date = (date.today() - timedelta(days=days)).isoformat()
         query = query.gte("date", cutoff_date)
     
-    result = query.order("date", desc=True)\
+    query = query.order("date", desc=True)\
         .order("exercise_name")\
-        .order("set_order")\
-        .execute()
+        .order("set_order")
+    
+    if limit:
+        query = query.range(offset, offset + limit - 1)
+    
+    result = query.execute()
     
     if result.data:
         df = pd.DataFrame(result.data)
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        return df
+        df['date'] = pd.to_datetime(df['date'])
+        return _downcast_workouts_df(df)
     return pd.DataFrame(columns=['date', 'exercise_name', 'set_order', 'weight', 'unit', 'reps', 'rpe', 'notes'])
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def get_muscle_group_stats(user_id: str, days: int = 30) -> pd.DataFrame:
     """
     Get training volume statistics by muscle group
     
+    Uses the stats_by_muscle_group RPC (database/create_stats_functions.sql)
+    when installed, otherwise aggregates client-side.
+    
     Args:
         user_id: User UUID
         days: Number of days to analyze
@@ -546,6 +920,14 @@ def get_muscle_group_stats(user_id: str, days: int = 30) -> pd.DataFrame:
     Returns:
         DataFrame with muscle group statistics
     """
+    try:
+        cutoff_date = (date.today() - timedelta(days=days)).isoformat()
+        result = get_supabase().rpc("stats_by_muscle_group", {"uid": user_id, "since": cutoff_date}).execute()
+        return pd.DataFrame(result.data or [], columns=['muscle_group', 'total_sets', 'workout_days'])
+    except Exception:
+        # Fallback: RPC not installed yet, aggregate in Python
+        pass
+    
     # Get all workouts in the time period
     workouts_df = get_all_workouts(user_id, days)
     
@@ -561,7 +943,7 @@ def get_muscle_group_stats(user_id: str, days: int = 30) -> pd.DataFrame:
     workouts_df = workouts_df.dropna(subset=['muscle_group'])
     
     # Group by muscle group
-    stats = workouts_df.groupby('muscle_group').agg({
+    stats = workouts_df.groupby('muscle_group', observed=True).agg({
         'date': ['count', 'nunique']
     }).reset_index()
     
@@ -571,22 +953,83 @@ def get_muscle_group_stats(user_id: str, days: int = 30) -> pd.DataFrame:
     return stats
 
 
-def import_workout_from_csv(user_id: str, df: pd.DataFrame) -> Tuple[int, int, List[str]]:
+def read_workout_csv(source) -> pd.DataFrame:
     """
-    Import workout data from CSV DataFrame
+    Read a workout CSV export using the PyArrow parser
+    
+    Text columns are typed up front; Weight is left to inference because it
+    may contain values like "Bodyweight".
+    
+    Args:
+        source: File path or file-like object
+    
+    Returns:
+        DataFrame with Arrow-backed columns
+    """
+    # The PyArrow parser types an all-empty column as null, which it cannot
+    # cast to category; parse those columns as strings and encode afterwards
+    category_columns = [col for col, dtype in WORKOUT_CSV_DTYPES.items() if dtype == 'category']
+    df = pd.read_csv(
+        source,
+        engine='pyarrow',
+        dtype_backend='pyarrow',
+        dtype={col: 'string[pyarrow]' if col in category_columns else dtype
+               for col, dtype in WORKOUT_CSV_DTYPES.items()}
+    )
+    return df.astype({col: 'category' for col in category_columns if col in df.columns})
+
+
+def iter_workout_csv(source, chunksize: int = IMPORT_CHUNK_ROWS):
+    """
+    Read a workout CSV export in chunks to bound memory on large uploads
+    
+    Uses the C parser (the PyArrow engine cannot stream chunks) with the same
+    column dtypes as read_workout_csv. Chunk indexes continue across chunks,
+    so CSV line numbers stay correct in import error messages.
+    
+    Args:
+        source: File path or file-like object
+        chunksize: Rows per chunk
+    
+    Returns:
+        Iterator of DataFrames
+    """
+    return pd.read_csv(
+        source,
+        engine='c',
+        dtype_backend='pyarrow',
+        dtype=WORKOUT_CSV_DTYPES,
+        chunksize=chunksize
+    )
+
+
+def _to_float_array(column: pd.Series) -> np.ndarray:
+    """
+    Coerce a CSV column to a float64 numpy array, with NaN for empty or non-numeric cells
+    
+    Arrow-backed columns coerce to double[pyarrow], whose NaN results are not
+    reported by isna(); converting to numpy makes every failure a plain NaN.
+    """
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _parse_workout_rows(user_id: str, df: pd.DataFrame,
+                        max_messages: int = IMPORT_MAX_ERROR_MESSAGES) -> Tuple[List[Tuple[int, Dict]], Dict[str, str], int, List[str]]:
+    """
+    Validate and convert a workout CSV DataFrame into workout_logs rows
     
     Args:
         user_id: User UUID
         df: DataFrame with columns: Date, Muscle Group, Exercise, Set Order, Weight, Unit, Reps, Note
+        max_messages: Maximum number of row-level error messages to return
     
     Returns:
-        Tuple of (success_count, error_count, error_messages)
+        Tuple of (records, new_exercises, error_count, error_messages): records
+        are (CSV line number, workout_logs row) pairs of the valid rows and
+        new_exercises maps each exercise to the muscle group of its first row
     """
-    from utils.helpers import map_muscle_group, infer_exercise_type
+    from utils.helpers import map_muscle_group
     
-    supabase = get_supabase()
-    
-    success_count = 0
     error_count = 0
     error_messages = []
     
@@ -596,115 +1039,168 @@ def import_workout_from_csv(user_id: str, df: pd.DataFrame) -> Tuple[int, int, L
     
     if missing_columns:
         error_messages.append(f"缺少必要欄位: {', '.join(missing_columns)}")
-        return 0, 0, error_messages
+        return [], {}, 0, error_messages
+    
+    # Parse and validate whole columns at once; only invalid rows get a message
+    date_text = df['Date'].astype('string').str.strip()
+    dates = pd.to_datetime(date_text, errors='coerce', format='mixed')
+    
+    exercise_names = df['Exercise'].astype('string').str.strip()
+    
+    muscle_text = df['Muscle Group'].astype('string').str.strip().fillna('Other') \
+        if 'Muscle Group' in df.columns else pd.Series('Other', index=df.index)
+    muscle_groups = muscle_text.map({mg: map_muscle_group(mg) for mg in muscle_text.unique()})
+    
+    # Numeric columns as plain float64 arrays: NaN marks an empty or bad cell.
+    # Empty Set Order defaults to 1 and empty Reps to 0; int() truncation as before
+    set_orders = _to_float_array(df['Set Order'])
+    reps = _to_float_array(df['Reps'])
+    
+    # Weight: empty or "Bodyweight"-like values mean 0
+    weight_text = df['Weight'].astype('string').str.strip()
+    is_bodyweight = weight_text.str.lower().isin(['bodyweight', 'bw', 'body weight', '0', '0.0', '0.00'])\
+        .fillna(False).to_numpy(dtype=bool)
+    weights = _to_float_array(df['Weight'])
+    bad_weights = df['Weight'].notna().to_numpy(dtype=bool) & ~is_bodyweight & np.isnan(weights)
+    weights = np.where(is_bodyweight | df['Weight'].isna().to_numpy(dtype=bool), 0.0, weights)
+    
+    # Unit: normalize anything unrecognized (notch/plate, then lb/pound, else kg)
+    units = df['Unit'].astype('string').str.strip().str.lower().fillna('')
+    fallback_units = pd.Series('kg', index=df.index)
+    fallback_units[units.str.contains('lb|pound')] = 'lb'
+    fallback_units[units.str.contains('notch|plate')] = 'notch/plate'
+    units = units.where(units.isin(['kg', 'lb', 'notch', 'notch/plate']), fallback_units)
+    
+    if 'Note' in df.columns:
+        notes = df['Note'].astype('string').str.strip().replace('', pd.NA)
+    else:
+        notes = pd.Series(pd.NA, index=df.index, dtype='string')
+    
+    # First failing check per row wins, so apply them from lowest to highest priority
+    checks = [
+        (date_text.fillna('').eq(''), "日期為空"),
+        (dates.isna(), "無法解析日期 '" + date_text + "'"),
+        (exercise_names.fillna('').eq(''), "動作名稱為空"),
+        (df['Set Order'].notna().to_numpy(dtype=bool) & np.isnan(set_orders),
+         "無法轉換組數 '" + df['Set Order'].astype('string') + "' 為數字"),
+        (bad_weights, "無法轉換重量值 '" + weight_text + "' 為數字"),
+        (df['Reps'].notna().to_numpy(dtype=bool) & np.isnan(reps),
+         "無法轉換次數 '" + df['Reps'].astype('string') + "' 為數字"),
+        ((np.nan_to_num(weights) < 0) | (np.nan_to_num(reps) < 0), "重量或次數為負數")
+    ]
+    reasons = pd.Series(pd.NA, index=df.index, dtype='string')
+    for failed, message in reversed(checks):
+        failed = pd.Series(failed, index=df.index).fillna(False).to_numpy(dtype=bool)
+        reasons = reasons.mask(failed, message)
+    
+    invalid = reasons.notna().to_numpy(dtype=bool)
+    line_numbers = pd.Series(df.index + 2, index=df.index).astype(str)
+    # Messages are only formatted for the rows that will be shown
+    shown = reasons[invalid].head(max(max_messages, 0))
+    error_messages.extend(("第 " + line_numbers[shown.index] + " 行: " + shown).tolist())
+    error_count += int(invalid.sum())
+    
+    valid = ~invalid
+    if not valid.any():
+        return [], {}, error_count, error_messages
+    
+    valid_rows = pd.DataFrame({
+        "date": dates[valid].dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+        "exercise_name": exercise_names[valid].to_numpy(dtype=object),
+        "set_order": np.where(np.isnan(set_orders), 1.0, set_orders)[valid].astype('int64'),
+        "weight": weights[valid],
+        "unit": units[valid].to_numpy(dtype=object),
+        "reps": np.nan_to_num(reps)[valid].astype('int64'),
+        "notes": notes[valid].astype(object).where(notes[valid].notna(), None).to_numpy(dtype=object)
+    }, index=df.index[valid])
+    # (CSV line number, workout_logs row) pairs; to_dict yields native Python scalars
+    records = [
+        (line_no, {"user_id": user_id, **row, "rpe": None})
+        for line_no, row in zip(line_numbers[valid].astype(int), valid_rows.to_dict('records'))
+    ]
+    
+    # Exercise -> muscle group of its first valid row
+    first_rows = valid_rows['exercise_name'].drop_duplicates()
+    new_exercises = dict(zip(first_rows, muscle_groups[first_rows.index]))
+    
+    return records, new_exercises, error_count, error_messages
+
+
+def import_workout_from_csv(user_id: str, df: pd.DataFrame,
+                            max_messages: int = IMPORT_MAX_ERROR_MESSAGES) -> Tuple[int, int, List[str]]:
+    """
+    Import workout data from CSV DataFrame
     
-    # Process each row
-    for idx, row in df.iterrows():
-        try:
-            # Parse date
-            if pd.isna(row['Date']):
-                error_count += 1
-                error_messages.append(f"第 {idx + 2} 行: 日期為空")
-                continue
-            
-            workout_date = pd.to_datetime(row['Date']).date()
-            
-            # Get exercise name
-            exercise_name = str(row['Exercise']).strip()
-            if not exercise_name:
-                error_count += 1
-                error_messages.append(f"第 {idx + 2} 行: 動作名稱為空")
-                continue
-            
-            # Get muscle group and map it
-            muscle_group = map_muscle_group(str(row.get('Muscle Group', 'Other')).strip())
-            
-            # Get set order
-            set_order = int(row['Set Order']) if pd.notna(row['Set Order']) else 1
-            
-            # Get weight - handle "Bodyweight" string
-            weight_value = row['Weight']
-            if pd.isna(weight_value):
-                weight = 0.0
-            else:
-                # Convert to string and check if it's "Bodyweight" or similar
-                weight_str = str(weight_value).strip()
-                if weight_str.lower() in ['bodyweight', 'bw', 'body weight', '0', '0.0', '0.00']:
-                    weight = 0.0
-                else:
-                    try:
-                        weight = float(weight_value)
-                    except (ValueError, TypeError):
-                        error_count += 1
-                        error_messages.append(f"第 {idx + 2} 行: 無法轉換重量值 '{weight_value}' 為數字")
-                        continue
-            
-            # Get unit
-            unit = str(row['Unit']).strip().lower()
-            if unit not in ['kg', 'lb', 'notch', 'notch/plate']:
-                # Try to normalize
-                if 'notch' in unit or 'plate' in unit:
-                    unit = 'notch/plate'
-                elif 'lb' in unit or 'pound' in unit:
-                    unit = 'lb'
-                else:
-                    unit = 'kg'
-            
-            # Get reps
-            reps = int(row['Reps']) if pd.notna(row['Reps']) else 0
-            
-            # Get notes
-            notes = str(row.get('Note', '')).strip() if pd.notna(row.get('Note', '')) else None
-            if notes == '':
-                notes = None
-            
-            # Validate data
-            if weight < 0 or reps < 0:
-                error_count += 1
-                error_messages.append(f"第 {idx + 2} 行: 重量或次數為負數")
-                continue
-            
-            # Ensure exercise exists in exercises table
-            existing = supabase.table("exercises")\
-                .select("id")\
+    Args:
+        user_id: User UUID
+        df: DataFrame with columns: Date, Muscle Group, Exercise, Set Order, Weight, Unit, Reps, Note
+        max_messages: Maximum number of row-level error messages to return
+    
+    Returns:
+        Tuple of (success_count, error_count, error_messages); error_messages
+        holds the first max_messages errors, error_count counts all of them
+    """
+    from utils.helpers import infer_exercise_type
+    
+    supabase = get_supabase()
+    
+    records, new_exercises, error_count, error_messages = _parse_workout_rows(user_id, df, max_messages)
+    success_count = 0
+    
+    if not records:
+        return success_count, error_count, error_messages
+    
+    # Ensure every imported exercise exists in the library: one lookup per
+    # name chunk, then a single insert of the missing ones
+    names = list(new_exercises)
+    existing_names = set()
+    try:
+        for start in range(0, len(names), IMPORT_BATCH_SIZE):
+            result = supabase.table("exercises")\
+                .select("name")\
                 .eq("user_id", user_id)\
-                .eq("name", exercise_name)\
+                .in_("name", names[start:start + IMPORT_BATCH_SIZE])\
                 .execute()
-            
-            if not existing.data:
-                # Add exercise to library
-                exercise_type = infer_exercise_type(exercise_name)
-                try:
-                    supabase.table("exercises").insert({
-                        "user_id": user_id,
-                        "name": exercise_name,
-                        "muscle_group": muscle_group,
-                        "exercise_type": exercise_type
-                    }).execute()
-                except Exception:
-                    # Exercise might have been added by another row, ignore
-                    pass
-            
-            # Insert workout log
-            supabase.table("workout_logs").insert({
+            existing_names.update(row['name'] for row in (result.data or []))
+        
+        missing = [
+            {
                 "user_id": user_id,
-                "date": workout_date.isoformat(),
-                "exercise_name": exercise_name,
-                "set_order": set_order,
-                "weight": weight,
-                "unit": unit,
-                "reps": reps,
-                "rpe": None,
-                "notes": notes
-            }).execute()
-            
-            success_count += 1
-            
+                "name": name,
+                "muscle_group": muscle_group,
+                "exercise_type": infer_exercise_type(name)
+            }
+            for name, muscle_group in new_exercises.items()
+            if name not in existing_names
+        ]
+        if missing:
+            supabase.table("exercises").insert(missing).execute()
+    except Exception as e:
+        # Workout logs do not depend on the library rows; report and continue
+        print(f"Error adding imported exercises to library: {e}")
+    
+    # Insert workout logs in batches. A failed batch is split in half and
+    # retried until the bad rows are isolated, so errors are still reported
+    # per CSV line without falling back to one request per row.
+    pending = [records[start:start + IMPORT_BATCH_SIZE]
+               for start in range(0, len(records), IMPORT_BATCH_SIZE)]
+    pending.reverse()
+    while pending:
+        batch = pending.pop()
+        try:
+            supabase.table("workout_logs").insert([record for _, record in batch]).execute()
+            success_count += len(batch)
         except Exception as e:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                pending.extend([batch[middle:], batch[:middle]])
+                continue
             error_count += 1
-            error_messages.append(f"第 {idx + 2} 行: {str(e)}")
-            continue
+            if len(error_messages) < max_messages:
+                error_messages.append(f"第 {batch[0][0]} 行: {str(e)}")
     
+    clear_exercise_cache()
+    clear_workout_cache()
     return success_count, error_count, error_messages
 
 
@@ -733,6 +1229,8 @@ def clear_all_data(user_id: str) -> Tuple[int, int]:
     # Delete all data for user
     supabase.table("workout_logs").delete().eq("user_id", user_id).execute()
     supabase.table("exercises").delete().eq("user_id", user_id).execute()
+    clear_exercise_cache()
+    clear_workout_cache()
     
     return workout_count, exercise_count
 
@@ -747,35 +1245,26 @@ def get_pr_records(user_id: str) -> Dict[str, Dict]:
     """
     supabase = get_supabase()
     
-    # Get all exercises for this user
-    result = supabase.table("workout_logs")\
-        .select("exercise_name")\
-        .eq("user_id", user_id)\
-        .execute()
-    
-    exercises = list(set([row['exercise_name'] for row in result.data])) if result.data else []
+    # Fetch all logs in one pass and group per exercise locally
+    rows = _fetch_all_rows(lambda: supabase.table("workout_logs")
+                           .select("exercise_name, date, weight, unit, reps")
+                           .eq("user_id", user_id)
+                           .order("id"))
     
     pr_dict = {}
+    if not rows:
+        return pr_dict
     
     # Import helper function
     from utils.helpers import is_assisted_exercise
     
-    for exercise_name in exercises:
+    all_logs_df = pd.DataFrame(rows)
+    all_logs_df['date'] = pd.to_datetime(all_logs_df['date']).dt.date
+    all_logs_df['volume'] = all_logs_df['weight'] * all_logs_df['reps']
+    
+    for exercise_name, logs_df in all_logs_df.groupby('exercise_name', sort=False):
         is_assisted = is_assisted_exercise(exercise_name)
         
-        # Get all logs for this exercise
-        logs_result = supabase.table("workout_logs")\
-            .select("date, weight, unit, reps")\
-            .eq("user_id", user_id)\
-            .eq("exercise_name", exercise_name)\
-            .execute()
-        
-        if not logs_result.data:
-            continue
-        
-        logs_df = pd.DataFrame(logs_result.data)
-        logs_df['date'] = pd.to_datetime(logs_df['date']).dt.date
-        
         # Get best weight, unit, and its date(s)
         if is_assisted:
             best_weight = logs_df['weight'].min()
@@ -792,7 +1281,6 @@ def get_pr_records(user_id: str) -> Dict[str, Dict]:
         best_reps_dates = sorted(best_reps_rows['date'].unique().tolist(), reverse=True)
         
         # Get best volume and its date(s)
-        logs_df['volume'] = logs_df['weight'] * logs_df['reps']
         best_volume = logs_df['volume'].max()
         best_volume_rows = logs_df[logs_df['volume'] == best_volume]
         best_volume_dates = sorted(best_volume_rows['date'].unique().tolist(), reverse=True)
@@ -850,6 +1338,8 @@ def rename_exercise(user_id: str, old_name: str, new_name: str) -> Tuple[int, in
     except Exception as e:
         print(f"Error renaming exercise: {e}")
     
+    clear_exercise_cache()
+    clear_workout_cache()
     return exercises_updated, workout_logs_updated
 
 
@@ -881,6 +1371,163 @@ def get_all_exercise_names_from_workouts(user_id: str) -> List[str]:
         return []
 
 
+ORPHANED_GROUP = '⚠️ 孤立動作 (Orphaned Exercises)'
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_exercise_index(user_id: str) -> Dict:
+    """
+    Group the exercise library (plus orphaned logged exercises) by muscle group
+    
+    Orphaned exercises exist in workout_logs but not in the exercises table;
+    they are collected under ORPHANED_GROUP. Exercises in each group are sorted
+    by workout session count (descending).
+    
+    Args:
+        user_id: User UUID
+    
+    Returns:
+        Dictionary with 'by_group' (muscle group -> list of {'name', 'count',
+        'is_orphaned'}), 'orphaned' (sorted orphaned names) and 'library_names'
+        (names in the exercises table)
+    """
+    exercise_groups = get_exercise_muscle_groups(user_id)
+    # Every logged exercise has a session count, so the counts double as the
+    # list of exercise names found in workout_logs
+    workout_counts = get_exercise_workout_counts(user_id)
+    
+    library_names = list(exercise_groups)
+    orphaned = sorted(name for name in workout_counts if name not in exercise_groups)
+    
+    by_group = {}
+    for name, muscle_group in exercise_groups.items():
+        by_group.setdefault(muscle_group, []).append({
+            'name': name,
+            'count': workout_counts.get(name, 0),
+            'is_orphaned': False
+        })
+    for name in orphaned:
+        by_group.setdefault(ORPHANED_GROUP, []).append({
+            'name': name,
+            'count': workout_counts.get(name, 0),
+            'is_orphaned': True
+        })
+    
+    for group_exercises in by_group.values():
+        group_exercises.sort(key=lambda x: x['count'], reverse=True)
+    
+    return {
+        'by_group': by_group,
+        'orphaned': orphaned,
+        'library_names': library_names
+    }
+
+
+def _build_session_summaries(rows: List[Dict]) -> List[Dict]:
+    """
+    Group one exercise's workout log rows into per-date session summaries
+    
+    Args:
+        rows: Rows with date, weight, unit, reps (newest date first)
+    
+    Returns:
+        List of session dictionaries (see get_workout_sessions_by_exercise)
+    """
+    # Group by date
+    sessions_by_date = {}
+    for row in rows:
+        workout_date = row['date']
+        # Convert string date to date object if needed
+        if isinstance(workout_date, str):
+            workout_date = datetime.fromisoformat(workout_date).date()
+        elif isinstance(workout_date, datetime):
+            workout_date = workout_date.date()
+        
+        # Use ISO format string as key for consistency
+        date_key = workout_date.isoformat() if isinstance(workout_date, date) else str(workout_date)
+        
+        if date_key not in sessions_by_date:
+            sessions_by_date[date_key] = {
+                'date': workout_date,
+                'sets': []
+            }
+        sessions_by_date[date_key]['sets'].append({
+            'weight': row['weight'],
+            'unit': row['unit'],
+            'reps': row['reps']
+        })
+    
+    # Build session summaries
+    sessions = []
+    for date_key, data in sessions_by_date.items():
+        sets = data['sets']
+        set_count = len(sets)
+        workout_date = data['date']
+        
+        # Build summary
+        weights = [s['weight'] for s in sets]
+        reps_list = [s['reps'] for s in sets]
+        unit = sets[0]['unit'] if sets else ''
+        
+        # One min/max pass per column (each was previously walked twice)
+        min_weight, max_weight = min(weights), max(weights)
+        min_reps, max_reps = min(reps_list), max(reps_list)
+        
+        weight_range = f"{min_weight:.1f}-{max_weight:.1f}" if min_weight != max_weight else f"{weights[0]:.1f}"
+        reps_range = f"{min_reps}-{max_reps}" if min_reps != max_reps else str(reps_list[0])
+        
+        summary = f"{set_count} sets, {reps_range} reps, {weight_range} {unit}"
+        
+        sessions.append({
+            'date': workout_date,
+            'set_count': set_count,
+            'summary': summary
+        })
+    
+    return sessions
+
+
+def get_workout_sessions_by_exercises(user_id: str, exercise_names: List[str]) -> Dict[str, List[Dict]]:
+    """
+    Get workout sessions for several exercises with a single query
+    
+    Args:
+        user_id: User UUID
+        exercise_names: Names of the exercises
+    
+    Returns:
+        Dictionary mapping exercise name to its session list (see
+        get_workout_sessions_by_exercise). Exercises without logs are omitted.
+    """
+    if not exercise_names:
+        return {}
+    
+    supabase = get_supabase()
+    
+    try:
+        rows = _fetch_all_rows(lambda: supabase.table("workout_logs")
+                               .select("exercise_name, date, set_order, weight, unit, reps")
+                               .eq("user_id", user_id)
+                               .in_("exercise_name", list(exercise_names))
+                               .order("date", desc=True)
+                               .order("set_order")
+                               .order("id"))
+        
+        rows_by_exercise = {}
+        for row in rows:
+            rows_by_exercise.setdefault(row['exercise_name'], []).append(row)
+        
+        # Preserve the caller's exercise order
+        return {
+            name: _build_session_summaries(rows_by_exercise[name])
+            for name in exercise_names
+            if name in rows_by_exercise
+        }
+    except Exception as e:
+        print(f"Error getting workout sessions for exercises {exercise_names}: {e}")
+        return {}
+
+
 def get_workout_sessions_by_exercise(user_id: str, exercise_name: str) -> List[Dict]:
     """
     Get workout sessions for an exercise with date, set count, and summary
@@ -895,72 +1542,7 @@ def get_workout_sessions_by_exercise(user_id: str, exercise_name: str) -> List[D
         - 'set_count': number of sets
         - 'summary': summary string (e.g., "3 sets, 10-12 reps, 12-17 lb")
     """
-    supabase = get_supabase()
-    
-    try:
-        # Get all workout logs for this exercise
-        result = supabase.table("workout_logs")\
-            .select("date, set_order, weight, unit, reps")\
-            .eq("user_id", user_id)\
-            .eq("exercise_name", exercise_name)\
-            .order("date", desc=True)\
-            .order("set_order")\
-            .execute()
-        
-        if not result.data:
-            return []
-        
-        # Group by date
-        sessions_by_date = {}
-        for row in result.data:
-            workout_date = row['date']
-            # Convert string date to date object if needed
-            if isinstance(workout_date, str):
-                workout_date = datetime.fromisoformat(workout_date).date()
-            elif isinstance(workout_date, datetime):
-                workout_date = workout_date.date()
-            
-            # Use ISO format string as key for consistency
-            date_key = workout_date.isoformat() if isinstance(workout_date, date) else str(workout_date)
-            
-            if date_key not in sessions_by_date:
-                sessions_by_date[date_key] = {
-                    'date': workout_date,
-                    'sets': []
-                }
-            sessions_by_date[date_key]['sets'].append({
-                'weight': row['weight'],
-                'unit': row['unit'],
-                'reps': row['reps']
-            })
-        
-        # Build session summaries
-        sessions = []
-        for date_key, data in sessions_by_date.items():
-            sets = data['sets']
-            set_count = len(sets)
-            workout_date = data['date']
-            
-            # Build summary
-            weights = [s['weight'] for s in sets]
-            reps_list = [s['reps'] for s in sets]
-            unit = sets[0]['unit'] if sets else ''
-            
-            weight_range = f"{min(weights):.1f}-{max(weights):.1f}" if min(weights) != max(weights) else f"{weights[0]:.1f}"
-            reps_range = f"{min(reps_list)}-{max(reps_list)}" if min(reps_list) != max(reps_list) else str(reps_list[0])
-            
-            summary = f"{set_count} sets, {reps_range} reps, {weight_range} {unit}"
-            
-            sessions.append({
-                'date': workout_date,
-                'set_count': set_count,
-                'summary': summary
-            })
-        
-        return sessions
-    except Exception as e:
-        print(f"Error getting workout sessions for exercise '{exercise_name}': {e}")
-        return []
+    return get_workout_sessions_by_exercises(user_id, [exercise_name]).get(exercise_name, [])
 
 
 def rename_workout_sessions(
@@ -996,6 +1578,7 @@ def rename_workout_sessions(
         
         result = query.execute()
         
+        clear_workout_cache()
         return len(result.data) if result.data else 0
     except Exception as e:
         print(f"Error renaming workout sessions: {e}")
@@ -1021,16 +1604,6 @@ def update_workout_set(user_id: str, set_id: int, weight: float, unit: str, reps
     supabase = get_supabase()
     
     try:
-        # First verify the set exists and belongs to the user
-        check_result = supabase.table("workout_logs")\
-            .select("id")\
-            .eq("id", set_id)\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        if not check_result.data:
-            return False
-        
         # Update the set
         update_data = {
             "weight": weight,
@@ -1043,18 +1616,66 @@ def update_workout_set(user_id: str, set_id: int, weight: float, unit: str, reps
         if notes is not None:
             update_data["notes"] = notes
         
+        # Filtering on id + user_id both verifies ownership and updates in one round trip
         result = supabase.table("workout_logs")\
             .update(update_data)\
             .eq("id", set_id)\
             .eq("user_id", user_id)\
             .execute()
         
+        clear_workout_cache()
         return len(result.data) > 0 if result.data else False
     except Exception as e:
         print(f"Error updating workout set: {e}")
         return False
 
 
+def update_workout_sets(user_id: str, updates: List[Dict]) -> int:
+    """
+    Update several workout sets in one request
+    
+    Uses the update_workout_sets RPC (database/create_workout_write_functions.sql)
+    when installed, otherwise updates the sets one by one.
+    
+    Args:
+        user_id: User UUID
+        updates: List of dictionaries with keys: set_id, weight, unit, reps, rpe, notes
+    
+    Returns:
+        Number of sets updated
+    """
+    if not updates:
+        return 0
+    
+    supabase = get_supabase()
+    
+    payload = [
+        {
+            "id": int(update['set_id']),
+            "weight": float(update['weight']),
+            "unit": update['unit'],
+            "reps": int(update['reps']),
+            "rpe": int(update['rpe']) if update.get('rpe') is not None else None,
+            "notes": update.get('notes')
+        }
+        for update in updates
+    ]
+    
+    try:
+        result = supabase.rpc("update_workout_sets", {"uid": user_id, "updates": payload}).execute()
+        clear_workout_cache()
+        return int(result.data or 0)
+    except Exception:
+        # Fallback: RPC not installed yet, one request per set
+        pass
+    
+    updated = 0
+    for row in payload:
+        if update_workout_set(user_id, row['id'], row['weight'], row['unit'], row['reps'], row['rpe'], row['notes']):
+            updated += 1
+    return updated
+
+
 def delete_workout_set(user_id: str, set_id: int) -> bool:
     """
     Delete a single workout set by ID
@@ -1069,23 +1690,17 @@ def delete_workout_set(user_id: str, set_id: int) -> bool:
     supabase = get_supabase()
     
     try:
-        # First verify the set exists and belongs to the user
-        check_result = supabase.table("workout_logs")\
-            .select("id")\
-            .eq("id", set_id)\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        if not check_result.data:
-            return False
-        
-        # Delete the set
+        # Filtering on id + user_id both verifies ownership and deletes in one round trip
         result = supabase.table("workout_logs")\
             .delete()\
             .eq("id", set_id)\
             .eq("user_id", user_id)\
             .execute()
         
+        if not result.data:
+            return False
+        
+        clear_workout_cache()
         return True
     except Exception as e:
         print(f"Error deleting workout set: {e}")
@@ -1147,6 +1762,7 @@ def delete_workout_session(user_id: str, workout_date: date, exercise_name: str)
             .eq("exercise_name", exercise_name)\
             .execute()
         
+        clear_workout_cache()
         return len(set_ids)
     except Exception as e:
         print(f"Error deleting workout session: {e}")
@@ -1174,6 +1790,7 @@ def update_workout_date(user_id: str, old_date: date, new_date: date) -> int:
             .eq("date", old_date.isoformat())\
             .execute()
         
+        clear_workout_cache()
         return len(result.data) if result.data else 0
     except Exception as e:
         print(f"Error updating workout date: {e}")
@@ -1213,6 +1830,7 @@ def delete_all_exercise_workouts(user_id: str, exercise_name: str) -> int:
             .eq("exercise_name", exercise_name)\
             .execute()
 
+        clear_workout_cache()
         return len(set_ids)
     except Exception as e:
         print(f"Error deleting all workouts for exercise '{exercise_name}': {e}")
@@ -1239,6 +1857,7 @@ def delete_exercise(user_id: str, exercise_name: str) -> bool:
             .eq("name", exercise_name)\
             .execute()
         
+        clear_exercise_cache()
         # Check if any rows were deleted
         return result.data is not None and len(result.data) > 0
     except Exception as e:
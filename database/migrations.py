@@ -3,9 +3,8 @@ Migration script to import data from CSV to Supabase
 Reads from CSV file and imports to Supabase with a hardcoded user_id
 """
 
-import pandas as pd
 import sys
-from database.db_manager import import_workout_from_csv
+from database.db_manager import import_workout_from_csv, read_workout_csv
 
 def migrate_from_csv(csv_file_path: str, user_id: str):
     """
@@ -19,7 +18,7 @@ def migrate_from_csv(csv_file_path: str, user_id: str):
     
     try:
         # Read CSV
-        df = pd.read_csv(csv_file_path)
+        df = read_workout_csv(csv_file_path)
         print(f"Found {len(df)} rows in CSV")
         
         # Import data
@@ -35,10 +34,10 @@ def migrate_from_csv(csv_file_path: str, user_id: str):
         
         if error_messages:
             print("Error details:")
-            for msg in error_messages[:20]:  # Show first 20 errors
+            for msg in error_messages:  # First IMPORT_MAX_ERROR_MESSAGES errors
                 print(f"  - {msg}")
-            if len(error_messages) > 20:
-                print(f"  ... and {len(error_messages) - 20} more errors")
+            if error_count > len(error_messages):
+                print(f"  ... and {error_count - len(error_messages)} more errors")
         
         return success_count, error_count
         
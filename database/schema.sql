@@ -40,3 +40,5 @@ CREATE INDEX IF NOT EXISTS idx_workout_logs_date ON public.workout_logs(date);
 CREATE INDEX IF NOT EXISTS idx_workout_logs_exercise_name ON public.workout_logs(exercise_name);
 CREATE INDEX IF NOT EXISTS idx_exercises_user_id ON public.exercises(user_id);
 CREATE INDEX IF NOT EXISTS idx_exercises_muscle_group ON public.exercises(muscle_group);
+-- Serves the library listing (WHERE user_id = ? ORDER BY muscle_group, name) straight from the index
+CREATE INDEX IF NOT EXISTS idx_exercises_user_muscle_group_name ON public.exercises(user_id, muscle_group, name);
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Tuple
 
 import streamlit as st
+from streamlit.connections import BaseConnection
 from supabase import create_client, Client
 from supabase.client import ClientOptions
 from dotenv import load_dotenv
@@ -22,6 +23,9 @@ load_dotenv()
 ACCESS_TOKEN_COOKIE = "gym_access_token"
 REFRESH_TOKEN_COOKIE = "gym_refresh_token"
 
+# PostgREST request timeout for the shared client
+POSTGREST_TIMEOUT_SECONDS = 10
+
 # Check if CookieManager is available
 try:
     COOKIE_MANAGER_AVAILABLE = True
@@ -29,8 +33,12 @@ except ImportError:
     COOKIE_MANAGER_AVAILABLE = False
 
 
-def get_supabase_client() -> Client:
-    """Initialize and return Supabase client"""
+def _create_supabase_client() -> Client:
+    """Create a new Supabase client
+
+    Auth flows (sign in, sign up, session restore) mutate the client's auth
+    state, so they use their own short-lived client instead of the shared one.
+    """
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_key = os.getenv("SUPABASE_KEY")
     
@@ -40,10 +48,33 @@ def get_supabase_client() -> Client:
     # Use public schema (Supabase PostgREST default)
     # Note: To use 'gymlog' schema, you need to expose it in Supabase Dashboard:
     # Settings -> API -> Exposed schemas -> Add 'gymlog'
-    options = ClientOptions(schema="public")
+    options = ClientOptions(schema="public", postgrest_client_timeout=POSTGREST_TIMEOUT_SECONDS)
     return create_client(supabase_url, supabase_key, options=options)
 
 
+class SupabaseConnection(BaseConnection[Client]):
+    """Streamlit connection wrapping the shared Supabase client"""
+    
+    def _connect(self, **kwargs) -> Client:
+        client = _create_supabase_client()
+        # Warm up the HTTP connection so the first real query skips the TLS handshake
+        try:
+            client.table("exercises").select("id").limit(1).execute()
+        except Exception as e:
+            print(f"Warning: Supabase warm-up query failed: {e}")
+        return client
+    
+    @property
+    def client(self) -> Client:
+        """Underlying Supabase client"""
+        return self._instance
+
+
+def get_supabase_client() -> Client:
+    """Return the shared Supabase client (one per server process, reused across reruns)"""
+    return st.connection("supabase", type=SupabaseConnection).client
+
+
 def get_cookie_manager():
     """Get or create CookieManager instance (cached in session_state)"""
     if not COOKIE_MANAGER_AVAILABLE:
@@ -247,6 +278,30 @@ def ensure_cookies_loaded() -> bool:
         return True
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _resolve_user(access_token: str) -> Optional[Dict]:
+    """
+    Resolve an access token to user info (cached, keyed by the opaque JWT)
+    
+    Lets page reloads and extra tabs reuse a recently validated token without
+    another round trip to Supabase Auth.
+    
+    Returns:
+        User dictionary (id, email, user_metadata) or None if the token is invalid
+    """
+    try:
+        response = get_supabase_client().auth.get_user(access_token)
+        if response and response.user:
+            return {
+                "id": response.user.id,
+                "email": response.user.email,
+                "user_metadata": response.user.user_metadata or {}
+            }
+    except Exception as e:
+        print(f"Error resolving user from access token: {e}")
+    return None
+
+
 def restore_session_from_cookies() -> bool:
     """Restore session from cookies (called on page load)"""
     access_token, refresh_token = _get_tokens_from_cookies()
@@ -254,11 +309,20 @@ def restore_session_from_cookies() -> bool:
     if not access_token:
         return False
     
+    # Fast path: token was validated recently, skip set_session/refresh
+    if refresh_token:
+        cached_user = _resolve_user(access_token)
+        if cached_user:
+            st.session_state.user = cached_user
+            st.session_state.access_token = access_token
+            st.session_state.refresh_token = refresh_token
+            return True
+    
     if not refresh_token:
         print("⚠️ Refresh token missing from cookies, attempting to restore with access token only...")
         # Try to restore with access token only
         try:
-            supabase = get_supabase_client()
+            supabase = _create_supabase_client()
             supabase.auth.set_session(access_token, "")
             session = supabase.auth.get_session()
             
@@ -273,7 +337,7 @@ def restore_session_from_cookies() -> bool:
             return False
     
     try:
-        supabase = get_supabase_client()
+        supabase = _create_supabase_client()
         supabase.auth.set_session(access_token, refresh_token)
         session = supabase.auth.get_session()
         
@@ -295,7 +359,7 @@ def restore_session_from_cookies() -> bool:
         print(f"Error restoring session from cookies: {e}")
         # Try to refresh expired tokens
         try:
-            supabase = get_supabase_client()
+            supabase = _create_supabase_client()
             supabase.auth.set_session(access_token, refresh_token)
             supabase.auth.refresh_session()
             session = supabase.auth.get_session()
@@ -327,7 +391,7 @@ def set_session_state(user, session):
 
 def login_with_email(email: str, password: str) -> bool:
     """Sign in with email and password"""
-    supabase = get_supabase_client()
+    supabase = _create_supabase_client()
     
     try:
         response = supabase.auth.sign_in_with_password({
@@ -353,7 +417,7 @@ def login_with_email(email: str, password: str) -> bool:
 
 def signup_with_email(email: str, password: str) -> bool:
     """Sign up with email and password"""
-    supabase = get_supabase_client()
+    supabase = _create_supabase_client()
     
     try:
         response = supabase.auth.sign_up({
@@ -379,7 +443,7 @@ def signup_with_email(email: str, password: str) -> bool:
 
 def login_with_google() -> Optional[str]:
     """Initiate Google OAuth login"""
-    supabase = get_supabase_client()
+    supabase = _create_supabase_client()
     redirect_url = os.getenv('REDIRECT_URL', 'http://localhost:8502')
     
     try:
@@ -460,6 +524,9 @@ def handle_auth_callback() -> bool:
 
 def logout():
     """Log out and clear session"""
+    # Read before session state is cleared so only this token's cache entry is dropped
+    access_token = st.session_state.get("access_token")
+    
     # Clear session state
     if "user" in st.session_state:
         del st.session_state.user
@@ -470,6 +537,11 @@ def logout():
     if "refresh_token" in st.session_state:
         del st.session_state.refresh_token
     
+    # Drop this token's cached lookup so it is not accepted again; other
+    # users' cached tokens stay valid
+    if access_token:
+        _resolve_user.clear(access_token)
+    
     # Clear cookies
     _clear_cookies()
     
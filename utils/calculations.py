@@ -3,26 +3,51 @@ Calculation utilities for Gym Tracker App
 Includes 1RM calculation, unit conversion, and volume calculations
 """
 
+from functools import lru_cache
 
-def calculate_1rm(weight: float, reps: int) -> float:
+import numpy as np
+
+# Numba is optional: large aggregations fall back to np.bincount without it
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Conversion factors to kilograms (standard unit)
+UNIT_TO_KG = {
+    'kg': 1.0,
+    'lb': 0.453592,  # 1 lb = 0.453592 kg
+    'notch': 2.5,  # Assume 1 notch ≈ 2.5 kg
+    'notch/plate': 2.5
+}
+
+
+def calculate_1rm(weight, reps):
     """
     Calculate estimated 1RM using Epley formula
     
     Formula: Weight × (1 + Reps/30)
     
     Args:
-        weight: Weight lifted
-        reps: Number of repetitions
+        weight: Weight lifted (scalar or array)
+        reps: Number of repetitions (scalar or array)
     
     Returns:
-        Estimated 1RM
+        Estimated 1RM (float for scalar input, ndarray for array input)
     """
-    if reps <= 0:
-        return weight
-    if reps == 1:
-        return weight
+    if np.ndim(weight) == 0 and np.ndim(reps) == 0:
+        if reps <= 0:
+            return weight
+        if reps == 1:
+            return weight
+        
+        return weight * (1 + reps / 30)
     
-    return weight * (1 + reps / 30)
+    weight = np.asarray(weight, dtype=np.float64)
+    reps = np.asarray(reps)
+    # Sets of 0 or 1 rep are already a 1RM
+    return np.where(reps > 1, weight * (1 + reps / 30), weight)
 
 
 def convert_unit(value: float, from_unit: str, to_unit: str) -> float:
@@ -95,20 +120,51 @@ def calculate_volume(weight: float, reps: int) -> float:
     return weight * reps
 
 
-def calculate_total_volume(weight: float, reps: int, unit: str) -> float:
+def unit_to_kg_factors(units) -> np.ndarray:
+    """
+    Get per-row kg conversion factors for an array of units
+    
+    Args:
+        units: Array-like of unit strings
+    
+    Returns:
+        Array of factors (unknown units map to 1.0, matching convert_unit)
+    """
+    unique_units, inverse = np.unique(np.asarray(units, dtype=object).astype(str), return_inverse=True)
+    lookup = np.array([UNIT_TO_KG.get(u, 1.0) for u in unique_units])
+    return lookup[inverse]
+
+
+@lru_cache(maxsize=1024)
+def _scalar_total_volume(weight: float, reps: int, unit: str) -> float:
+    """Memoized scalar path of calculate_total_volume (logged weights repeat a lot)"""
+    weight_kg = standardize_weight(weight, unit)
+    return calculate_volume(weight_kg, reps)
+
+
+def calculate_total_volume(weight, reps, unit):
     """
     Calculate total volume in standardized units (kg)
     
+    Accepts scalars or equal-length arrays (e.g. DataFrame columns); array
+    input is converted with a single vectorized multiply.
+    
     Args:
         weight: Weight lifted
         reps: Number of repetitions
         unit: Weight unit
     
     Returns:
-        Total volume in kg
+        Total volume in kg (float for scalar input, per-row ndarray for array input)
     """
-    weight_kg = standardize_weight(weight, unit)
-    return calculate_volume(weight_kg, reps)
+    if np.ndim(weight) == 0 and np.ndim(reps) == 0 and np.ndim(unit) == 0:
+        return _scalar_total_volume(weight, reps, unit)
+    
+    if np.ndim(unit) == 0:
+        factors = UNIT_TO_KG.get(unit, 1.0)
+    else:
+        factors = unit_to_kg_factors(unit)
+    return np.asarray(weight, dtype=np.float64) * factors * np.asarray(reps)
 
 
 def calculate_session_volume(sets: list) -> float:
@@ -121,11 +177,164 @@ def calculate_session_volume(sets: list) -> float:
     Returns:
         Total session volume in kg
     """
-    total_volume = 0.0
-    for set_data in sets:
-        weight = set_data.get('weight', 0)
-        reps = set_data.get('reps', 0)
-        unit = set_data.get('unit', 'kg')
-        total_volume += calculate_total_volume(weight, reps, unit)
-    return total_volume
+    if not sets:
+        return 0.0
+    
+    weights = [set_data.get('weight', 0) for set_data in sets]
+    reps = [set_data.get('reps', 0) for set_data in sets]
+    units = [set_data.get('unit', 'kg') for set_data in sets]
+    return float(calculate_total_volume(weights, reps, units).sum())
 
+
+def lttb_downsample_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Pick indices of points to keep using Largest-Triangle-Three-Buckets
+    
+    LTTB keeps the first and last points and, for each bucket in between, the
+    point forming the largest triangle with its neighbours, so peaks and the
+    overall shape of a long series survive downsampling.
+    
+    Args:
+        x: Numeric x values (sorted ascending)
+        y: Numeric y values
+        n_out: Number of points to keep
+    
+    Returns:
+        Sorted array of indices into x/y
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # n_out - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    
+    return indices
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _volume_by_group_kernel(weights, reps, factors, group_ids, n_groups):
+        # Single fused pass: weight × kg factor × reps accumulated per group
+        out = np.zeros(n_groups)
+        for i in range(weights.shape[0]):
+            out[group_ids[i]] += weights[i] * factors[i] * reps[i]
+        return out
+
+
+def aggregate_volume_by_group(weights, reps, units, group_ids, n_groups: int) -> np.ndarray:
+    """
+    Sum standardized (kg) training volume per group
+    
+    Args:
+        weights: Weight per set
+        reps: Reps per set
+        units: Unit per set
+        group_ids: Integer group code per set (e.g. from pd.factorize)
+        n_groups: Number of groups
+    
+    Returns:
+        Array of length n_groups with total volume in kg
+    """
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    reps = np.ascontiguousarray(reps, dtype=np.float64)
+    factors = unit_to_kg_factors(units)
+    group_ids = np.ascontiguousarray(group_ids, dtype=np.int64)
+    
+    if NUMBA_AVAILABLE:
+        return _volume_by_group_kernel(weights, reps, factors, group_ids, n_groups)
+    return np.bincount(group_ids, weights=weights * factors * reps, minlength=n_groups)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _session_reduce_kernel(weights, reps, factors, group_ids, n_groups, bodyweight_rule):
+        # Single pass over date-sorted sets: first max-weight set, max reps,
+        # all-zero flag and kg volume per session
+        max_weight = np.full(n_groups, -np.inf)
+        max_set_reps = np.zeros(n_groups, dtype=np.int64)
+        max_reps = np.zeros(n_groups, dtype=np.int64)
+        all_zero = np.ones(n_groups, dtype=np.bool_)
+        volume = np.zeros(n_groups)
+        seen = np.zeros(n_groups, dtype=np.bool_)
+        for i in range(weights.shape[0]):
+            g = group_ids[i]
+            w = weights[i]
+            r = reps[i]
+            if not seen[g] or w > max_weight[g]:
+                max_weight[g] = w
+                max_set_reps[g] = r
+            if not seen[g] or r > max_reps[g]:
+                max_reps[g] = r
+            if w != 0:
+                all_zero[g] = False
+            seen[g] = True
+            volume[g] += w * factors[i] * r
+        if bodyweight_rule:
+            for g in range(n_groups):
+                if all_zero[g]:
+                    max_set_reps[g] = max_reps[g]
+        return max_weight, max_set_reps, volume
+
+
+def aggregate_sessions(weights, reps, units, group_ids, n_groups: int, bodyweight_rule: bool = True):
+    """
+    Reduce per-set arrays to per-session max weight, its reps and total volume
+    
+    Args:
+        weights: Weight per set (already the effective weight for assisted exercises)
+        reps: Reps per set
+        units: Unit per set (used for the kg volume)
+        group_ids: Session code per set; sets of a session must be contiguous,
+            in logged order (e.g. pd.factorize of the sorted dates)
+        n_groups: Number of sessions
+        bodyweight_rule: Use the max reps across all sets for sessions whose
+            weights are all 0
+    
+    Returns:
+        Tuple of (max_weight, max_reps, total_volume) arrays of length n_groups;
+        max_reps comes from the first set with the max weight
+    """
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    reps = np.ascontiguousarray(reps, dtype=np.int64)
+    factors = unit_to_kg_factors(units)
+    group_ids = np.ascontiguousarray(group_ids, dtype=np.int64)
+    
+    if NUMBA_AVAILABLE:
+        return _session_reduce_kernel(weights, reps, factors, group_ids, n_groups, bodyweight_rule)
+    
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+    max_weight = np.maximum.reduceat(weights, starts)
+    
+    # First set per session that reaches the session max
+    at_max = np.flatnonzero(weights == max_weight[group_ids])
+    _, first = np.unique(group_ids[at_max], return_index=True)
+    max_reps = reps[at_max[first]]
+    
+    if bodyweight_rule:
+        all_zero = np.logical_and.reduceat(weights == 0, starts)
+        max_reps = np.where(all_zero, np.maximum.reduceat(reps, starts), max_reps)
+    
+    volume = np.bincount(group_ids, weights=weights * factors * reps, minlength=n_groups)
+    return max_weight, max_reps, volume
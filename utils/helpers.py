@@ -3,10 +3,41 @@ Helper utilities for Gym Tracker App
 Includes common helper functions
 """
 
+import re
 from datetime import date, datetime
+from functools import lru_cache
 from typing import List, Tuple
 
+import numpy as np
+import streamlit as st
 
+
+# Keyword tuples used by the exercise classifiers below
+ASSISTED_KEYWORDS = ('assisted', 'assist', '減重', '輔助')
+PURE_BODYWEIGHT_KEYWORDS = ('pull-up', 'push-up', 'dip', 'plank', 'sit-up', 'crunch')
+
+VALID_UNITS = frozenset({'kg', 'lb', 'notch', 'notch/plate'})
+
+# Exercise type -> name keywords, in priority order (first matching type wins)
+EXERCISE_TYPE_KEYWORDS = (
+    ('Barbell', ('barbell', 'bb ')),
+    ('Dumbbell', ('dumbbell', 'db ', 'single-arm')),
+    ('Cable', ('cable', 'pulley')),
+    ('Machine', ('machine', 'seated')),
+    ('Bodyweight', ('pull-up', 'push-up', 'dip', 'plank', 'bodyweight')),
+)
+# One anchored alternation of lookaheads: the regex engine tries the types in
+# order, and the empty named group of the first one found becomes lastgroup
+_EXERCISE_TYPE_RE = re.compile(
+    '^(?:' + '|'.join(
+        f"(?=.*(?:{'|'.join(map(re.escape, keywords))}))(?P<{exercise_type}>)"
+        for exercise_type, keywords in EXERCISE_TYPE_KEYWORDS
+    ) + ')',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
 def get_muscle_groups() -> List[str]:
     """
     Get list of muscle groups
@@ -69,6 +100,7 @@ def map_muscle_group(csv_muscle_group: str) -> str:
     return '其他 (Other)'
 
 
+@lru_cache(maxsize=512)
 def infer_exercise_type(exercise_name: str) -> str:
     """
     Infer exercise type from exercise name
@@ -79,22 +111,11 @@ def infer_exercise_type(exercise_name: str) -> str:
     Returns:
         Exercise type (Barbell, Dumbbell, Machine, Cable, Bodyweight, Other)
     """
-    name_lower = exercise_name.lower()
-    
-    if any(keyword in name_lower for keyword in ['barbell', 'bb ']):
-        return 'Barbell'
-    elif any(keyword in name_lower for keyword in ['dumbbell', 'db ', 'single-arm']):
-        return 'Dumbbell'
-    elif any(keyword in name_lower for keyword in ['cable', 'pulley']):
-        return 'Cable'
-    elif any(keyword in name_lower for keyword in ['machine', 'seated', 'press machine']):
-        return 'Machine'
-    elif any(keyword in name_lower for keyword in ['pull-up', 'push-up', 'dip', 'plank', 'bodyweight']):
-        return 'Bodyweight'
-    else:
-        return 'Other'
+    match = _EXERCISE_TYPE_RE.match(exercise_name)
+    return match.lastgroup if match else 'Other'
 
 
+@lru_cache(maxsize=512)
 def is_assisted_exercise(exercise_name: str) -> bool:
     """
     Check if an exercise is an assisted exercise
@@ -105,11 +126,11 @@ def is_assisted_exercise(exercise_name: str) -> bool:
     Returns:
         True if the exercise is assisted (lower weight = better performance)
     """
-    assisted_keywords = ['assisted', 'assist', '減重', '輔助']
     exercise_lower = exercise_name.lower()
-    return any(keyword in exercise_lower for keyword in assisted_keywords)
+    return any(keyword in exercise_lower for keyword in ASSISTED_KEYWORDS)
 
 
+@lru_cache(maxsize=512)
 def is_pure_bodyweight_exercise(exercise_name: str) -> bool:
     """
     Check if an exercise is a pure bodyweight exercise (not assisted)
@@ -121,17 +142,16 @@ def is_pure_bodyweight_exercise(exercise_name: str) -> bool:
     Returns:
         True if the exercise is pure bodyweight (e.g., Pull-up, Push-up)
     """
-    # Pure bodyweight exercises (not assisted)
-    pure_bodyweight_keywords = ['pull-up', 'push-up', 'dip', 'plank', 'sit-up', 'crunch']
     exercise_lower = exercise_name.lower()
     
     # Must contain a bodyweight keyword but NOT be assisted
-    has_bodyweight_keyword = any(keyword in exercise_lower for keyword in pure_bodyweight_keywords)
+    has_bodyweight_keyword = any(keyword in exercise_lower for keyword in PURE_BODYWEIGHT_KEYWORDS)
     is_assisted = is_assisted_exercise(exercise_name)
     
     return has_bodyweight_keyword and not is_assisted
 
 
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
 def get_exercise_types() -> List[str]:
     """
     Get list of exercise types
@@ -175,6 +195,7 @@ def parse_date(date_str: str) -> date:
     return datetime.strptime(date_str, '%Y-%m-%d').date()
 
 
+@lru_cache(maxsize=1024)
 def validate_input(weight: float, reps: int, unit: str) -> Tuple[bool, str]:
     """
     Validate workout input data
@@ -196,12 +217,48 @@ def validate_input(weight: float, reps: int, unit: str) -> Tuple[bool, str]:
     if reps == 0 and weight > 0:
         return False, "次數不能為 0"
     
-    if unit not in ['kg', 'lb', 'notch', 'notch/plate']:
+    if unit not in VALID_UNITS:
         return False, "不支援的單位"
     
     return True, ""
 
 
+def validate_sets(weights, reps, unit: str) -> Tuple[bool, str, int]:
+    """
+    Validate a batch of sets in one vectorised pass (same rules as validate_input)
+    
+    Args:
+        weights: Weight values (array-like)
+        reps: Repetition counts (array-like)
+        unit: Weight unit shared by all sets
+    
+    Returns:
+        Tuple of (is_valid, error_message, position of the first invalid set or -1)
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    reps = np.asarray(reps)
+    
+    if unit not in VALID_UNITS:
+        return (False, "不支援的單位", 0) if weights.size else (True, "", -1)
+    
+    # Rules in validate_input order; the first failing rule names the error
+    rules = (
+        (weights < 0, "重量不能為負數"),
+        (reps < 0, "次數不能為負數"),
+        ((reps == 0) & (weights > 0), "次數不能為 0"),
+    )
+    bad = np.zeros(weights.shape, dtype=bool)
+    for mask, _ in rules:
+        bad |= mask
+    if not bad.any():
+        return True, "", -1
+    
+    first = int(np.argmax(bad))
+    message = next(msg for mask, msg in rules if mask[first])
+    return False, message, first
+
+
+@lru_cache(maxsize=512)
 def format_weight(weight: float, unit: str) -> str:
     """
     Format weight with unit for display
@@ -219,7 +276,30 @@ def format_weight(weight: float, unit: str) -> str:
         return f"{weight:.1f} {unit}"
 
 
-def get_weight_options(unit: str) -> List[float]:
+def format_weights(weights, units) -> np.ndarray:
+    """
+    Vectorised format_weight for equal-length weight/unit arrays
+    
+    Args:
+        weights: Weight values (array-like)
+        units: Weight units (array-like)
+    
+    Returns:
+        Array of formatted weight strings
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    units = np.asarray(units).astype(str)
+    is_notch = np.isin(units, ('notch', 'notch/plate'))
+    numbers = np.where(
+        is_notch,
+        np.char.mod('%d', np.trunc(weights).astype(np.int64)),
+        np.char.mod('%.1f', weights)
+    )
+    return np.char.add(np.char.add(numbers, ' '), units)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_weight_options(unit: str) -> Tuple[float, ...]:
     """
     Get weight options for dropdown based on unit
     
@@ -227,35 +307,89 @@ def get_weight_options(unit: str) -> List[float]:
         unit: Weight unit (kg, lb, or notch/plate)
     
     Returns:
-        List of weight values
+        Sorted tuple of weight values
     """
     if unit == "kg":
         # Common kg weights: 0, 2.5, 5, 7.5, 10, 12.5, 15, 17.5, 20, then by 5kg up to 200kg
         weights = [0.0]
         weights.extend([2.5, 5.0, 7.5, 10.0, 12.5, 15.0, 17.5, 20.0])
         weights.extend([i * 5.0 for i in range(5, 41)])  # 25 to 200 in 5kg steps
-        return weights
+        return tuple(weights)
     elif unit == "lb":
         # Generate weights from 0 to 500 in 1lb increments
         # This allows exact weights like 12, 17, 23 lbs to be preserved
-        weights = [float(i) for i in range(501)]  # 0 to 500 in 1lb steps
-        return weights
+        return tuple(float(i) for i in range(501))  # 0 to 500 in 1lb steps
     else:  # notch/plate
         # Notch/plate: 0 to 30
-        return [float(i) for i in range(31)]
+        return tuple(float(i) for i in range(31))
 
 
-def get_reps_options() -> List[int]:
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_reps_options() -> Tuple[int, ...]:
     """
     Get reps options for dropdown
     
     Returns:
-        List of rep values
+        Tuple of rep values
     """
     # Common rep ranges: 0, then 1-30
-    return [0] + list(range(1, 31))
+    return tuple(range(31))
+
 
+@lru_cache(maxsize=8)
+def get_weight_option_index(unit: str) -> dict:
+    """
+    Get a value -> position map for the weight options of a unit
+    
+    Args:
+        unit: Weight unit (kg, lb, or notch/plate)
+    
+    Returns:
+        Dictionary mapping weight value to its index in get_weight_options(unit)
+    """
+    return {w: i for i, w in enumerate(get_weight_options(unit))}
 
+
+@lru_cache(maxsize=8)
+def get_weight_option_labels(unit: str) -> dict:
+    """
+    Get display labels for the weight options of a unit
+    
+    Args:
+        unit: Weight unit (kg, lb, or notch/plate)
+    
+    Returns:
+        Dictionary mapping weight value to its dropdown label
+    """
+    return {
+        w: f"{int(w) if w == int(w) else w:.1f} {unit}" if w > 0 else "選擇重量"
+        for w in get_weight_options(unit)
+    }
+
+
+@lru_cache(maxsize=1)
+def get_reps_option_labels() -> dict:
+    """
+    Get display labels for the reps options
+    
+    Returns:
+        Dictionary mapping rep count to its dropdown label
+    """
+    return {r: f"{r} 次" if r > 0 else "選擇次數" for r in get_reps_options()}
+
+
+@lru_cache(maxsize=1)
+def get_reps_option_index() -> dict:
+    """
+    Get a value -> position map for the reps options
+    
+    Returns:
+        Dictionary mapping rep count to its index in get_reps_options()
+    """
+    return {r: i for i, r in enumerate(get_reps_options())}
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
 def get_default_exercises() -> dict:
     """
     Get default exercise library organized by muscle group
@@ -333,3 +467,17 @@ def get_default_exercises() -> dict:
         '其他 (Other)': []
     }
 
+
+@lru_cache(maxsize=1)
+def get_default_exercise_rows() -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Get the default exercise library flattened with exercise types resolved
+    
+    Returns:
+        Tuple of (name, muscle_group, exercise_type) rows, computed once per process
+    """
+    return tuple(
+        (exercise_name, muscle_group, infer_exercise_type(exercise_name))
+        for muscle_group, exercise_list in get_default_exercises().items()
+        for exercise_name in exercise_list
+    )